@@ -8,7 +8,6 @@
 # Author: Valeska Blank
 # ==========================================================
 
-import pandas as pd
 from sentence_transformers import SentenceTransformer
 from sklearn.cluster import KMeans
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -19,6 +18,7 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 import os
 import sys
+from src.storage import load_compact_job_table
 
 def run_semantic_clustering(input_file_path: Path, output_csv_path: Path, output_plot_path: Path):
 
@@ -47,7 +47,7 @@ def run_semantic_clustering(input_file_path: Path, output_csv_path: Path, output
     # Load dataset
     # ----------------------------------------------------------
     try:
-        df = pd.read_csv(input_file_path, sep=';')
+        df = load_compact_job_table(input_file_path, stage="Semantic Clustering")
     except FileNotFoundError:
         print(f"CLUSTERING FAILED: Input file not found at {input_file_path}")
         return False
@@ -15,12 +15,15 @@ from collections import Counter
 import os
 import sys
 from pathlib import Path
+from src.storage import load_compact_job_table
 
 def run_skills_analysis(input_file_path: Path, output_dir_path: Path):
 
     # Load cleaned dataset
     try:
-        df = pd.read_csv(input_file_path, sep=';')
+        # Python strings: the phrase / skill counts below rely on re's Unicode-aware \b
+        df = load_compact_job_table(input_file_path, columns=["Tasks", "Skills", "Job_Location"],
+                                    stage="Skills Analysis", python_strings=True)
     except FileNotFoundError:
         print(f"SKILLS ANALYSIS FAILED: Input file not found at {input_file_path}")
         return False
@@ -177,6 +180,7 @@ def run_skills_analysis(input_file_path: Path, output_dir_path: Path):
     # Count number of job ads per location
     geo_counts = (
         df["Job_Location"]
+        .astype(object)
         .fillna("Unknown")
         .value_counts()
         .reset_index()
@@ -12,6 +12,7 @@ from nltk.corpus import stopwords
 import os
 from pathlib import Path
 import sys
+from src.storage import load_compact_job_table
 
 
 nltk.download("punkt")
@@ -27,7 +28,9 @@ def run_task_analysis(input_file_path, output_dir_path):
     # Load cleaned dataset
     # ----------------------------------------------------------
     try:
-        df = pd.read_csv(input_file_path, sep=';')
+        # Python strings: the keyword counts below rely on re's Unicode-aware \b
+        df = load_compact_job_table(input_file_path, columns=["Tasks"], stage="Tasks Analysis",
+                                    python_strings=True)
     except FileNotFoundError:
         print(f"TASK ANALYSIS FAILED: Input file not found at {input_file_path}")
         return False
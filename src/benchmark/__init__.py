@@ -0,0 +1,3 @@
+from .browser_profile_benchmark import run_browser_profile_benchmark
+from .mock_jobs_server import start_mock_server
+from .scraper_benchmark import run_scraper_benchmark
@@ -0,0 +1,155 @@
+# ==========================================================
+# Browser Profile Benchmark
+# ==========================================================
+# Goal:
+#   Compare the Chrome profiles of get_driver ('default' vs. 'performance')
+#   on the pages the scraper actually visits.
+# Key Functionality:
+#   - Loads the start page and a search result page several times per profile
+#     with the browser cache disabled.
+#   - Page-ready latency: time from driver.get() until the job links are present.
+#   - Bytes transferred and request count from the DevTools network events
+#     (Network.loadingFinished.encodedDataLength, read from the performance log):
+#     counts third-party resources too, which the Resource Timing API reports
+#     as 0 bytes without a Timing-Allow-Origin header. Blocked requests never finish.
+#   - Prints p50 / p95 per profile and page and optionally saves them as CSV.
+# Execution:
+#   python -m src.benchmark.browser_profile_benchmark --runs 5
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from pathlib import Path
+import argparse
+import json
+import time
+import pandas as pd
+
+from src.scraping.jobs_ch_base import get_driver, accept_cookies_and_close_banner, BROWSER_PROFILES
+from src.scraping.jobs_scraping import JOBS_CH_BASE_URL, JOB_LINK_XPATH, SEARCH_BAR_XPATH, build_search_page_url
+from src.scraping.scrape_timing import percentile
+
+# Navigation timing of the document
+PAGE_METRICS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+return {dom_content_loaded_ms: nav ? nav.domContentLoadedEventEnd : null};
+"""
+# The page counts as done loading once no network event arrived for this long (late trackers, lazy assets)
+NETWORK_IDLE_SECONDS = 1.0
+NETWORK_IDLE_TIMEOUT_SECONDS = 15.0
+
+
+def network_events(driver) -> list:
+    """Drains the performance log and returns its DevTools 'Network.*' messages."""
+    events = []
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message.get("method", "").startswith("Network."):
+            events.append(message)
+    return events
+
+
+def collect_network_until_idle(driver) -> list:
+    events = []
+    deadline = time.monotonic() + NETWORK_IDLE_TIMEOUT_SECONDS
+    last_event = time.monotonic()
+    while time.monotonic() < deadline and time.monotonic() - last_event < NETWORK_IDLE_SECONDS:
+        new_events = network_events(driver)
+        if new_events:
+            events.extend(new_events)
+            last_event = time.monotonic()
+        time.sleep(0.1)
+    return events
+
+
+def measure_page(driver, url: str, ready_xpath: str, timeout: float = 20) -> dict:
+    """Loads one page and returns its ready latency, DOMContentLoaded time, bytes on the wire and finished requests."""
+    # Events of the previous page must not be counted for this one
+    network_events(driver)
+    start = time.perf_counter()
+    driver.get(url)
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.05).until(
+            EC.presence_of_element_located((By.XPATH, ready_xpath)))
+        ready_ms = (time.perf_counter() - start) * 1000
+    except TimeoutException:
+        ready_ms = float("nan")
+
+    metrics = driver.execute_script(PAGE_METRICS_JS) or {}
+    # Encoded (compressed) bytes incl. headers of every finished request, same-origin or not
+    finished = [event for event in collect_network_until_idle(driver) if event["method"] == "Network.loadingFinished"]
+    return {"Ready_ms": ready_ms,
+            "DOMContentLoaded_ms": metrics.get("dom_content_loaded_ms"),
+            "KB": sum(event["params"].get("encodedDataLength", 0) for event in finished) / 1024,
+            "Requests": len(finished)}
+
+
+def run_browser_profile_benchmark(profiles=BROWSER_PROFILES, runs: int = 5, job_search_term: str = "Data Scientist"):
+    # Pages visited by the scraper and the element that marks them as ready to scrape
+    pages = {
+        "start_page": (JOBS_CH_BASE_URL, SEARCH_BAR_XPATH),
+        "search_results": (build_search_page_url(job_search_term, 1), JOB_LINK_XPATH),
+    }
+
+    samples = []
+    for profile in profiles:
+        print(f"\n--- Benchmarking browser profile '{profile}' ({runs} runs) ---")
+        driver = get_driver(profile=profile, network_log=True)
+        try:
+            driver.get(JOBS_CH_BASE_URL)
+            accept_cookies_and_close_banner(driver)
+
+            # Every run should download the page again instead of serving it from the cache
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+
+            for run in range(1, runs + 1):
+                for page_name, (url, ready_xpath) in pages.items():
+                    result = measure_page(driver, url, ready_xpath)
+                    samples.append({"Profile": profile, "Page": page_name, "Run": run, **result})
+                    print(f"  run {run} {page_name:15} ready {result['Ready_ms']:8.0f} ms | {result['KB']:8.0f} KB")
+        finally:
+            driver.quit()
+
+    df_samples = pd.DataFrame(samples)
+    return summarize_samples(df_samples)
+
+
+def summarize_samples(df_samples: pd.DataFrame) -> pd.DataFrame:
+    rows = []
+    for (profile, page_name), group in df_samples.groupby(["Profile", "Page"], sort=False):
+        ready = sorted(group["Ready_ms"].dropna())
+        rows.append({"Profile": profile,
+                     "Page": page_name,
+                     "Runs": len(group),
+                     "Ready_p50_ms": round(percentile(ready, 50), 0),
+                     "Ready_p95_ms": round(percentile(ready, 95), 0),
+                     "DOMContentLoaded_p50_ms": round(group["DOMContentLoaded_ms"].median(), 0),
+                     "KB_p50": round(group["KB"].median(), 0),
+                     "Requests_p50": group["Requests"].median()})
+    return pd.DataFrame(rows)
+
+
+# --- STANDALONE EXECUTION BLOCK ---
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compare page-ready latency and bytes of the browser profiles.")
+    parser.add_argument("--runs", type=int, default=5, help="Page loads per profile and page.")
+    parser.add_argument("--term", default="Data Scientist", help="Search term for the result page.")
+    parser.add_argument("--output", type=Path, default=None, help="Optional CSV path for the summary.")
+    args = parser.parse_args()
+
+    df_summary = run_browser_profile_benchmark(runs=args.runs, job_search_term=args.term)
+
+    print("\n" + "=" * 50)
+    print("--- Browser Profile Benchmark ---")
+    print(df_summary.to_string(index=False))
+    print("=" * 50)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        df_summary.to_csv(args.output, index=False, sep=";")
+        print(f"Summary saved to: {args.output}")
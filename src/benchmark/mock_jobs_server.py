@@ -0,0 +1,232 @@
+# ==========================================================
+# Local Mock jobs.ch Server
+# ==========================================================
+# Goal:
+#   Serve search result and job ad pages that match the scraper XPaths
+#   (data-cy='job-link', paginator-next, li-t_disc lists), so scraping
+#   throughput can be measured offline and without load on jobs.ch.
+# Key Functionality:
+#   - Start page with cookie banner, smart search banner and search bar.
+#   - Paged result lists; clicking a card loads the ad into a detail pane (like the live site).
+#   - Standalone detail pages for the HTTP / async fetchers.
+#   - Synthetic ads, or recorded ads from the raw HTML cache (--cache-dir).
+#   - Configurable response latency and jitter.
+# Execution:
+#   python -m src.benchmark.mock_jobs_server --port 8765 --latency-ms 80 --jitter-ms 40
+#   JOBS_CH_BASE_URL=http://127.0.0.1:8765/de/ python -m src.main_jobs ...
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, quote_plus
+from html import escape
+from pathlib import Path
+import argparse
+import random
+import re
+import threading
+import time
+
+DEFAULT_TOTAL_ADS = 200
+DEFAULT_ADS_PER_PAGE = 20
+DEFAULT_LATENCY_MS = 80
+DEFAULT_JITTER_MS = 40
+
+SYNTHETIC_TITLES = ["Data Scientist", "Machine Learning Engineer", "Data Analyst", "Business Analyst",
+                    "Data Engineer", "BI Developer", "AI Researcher", "Analytics Consultant"]
+SYNTHETIC_COMPANIES = ["Helvetia Data AG", "Alpina Analytics", "Zurich Insights GmbH", "Basel Pharma Lab",
+                       "Bern Mobility SA", "Lakeside Finance", "Geneva Retail Group", "Ticino Energy"]
+SYNTHETIC_LOCATIONS = ["Zürich", "Basel", "Bern", "Genève", "Lausanne", "Luzern", "St. Gallen", "Lugano"]
+SYNTHETIC_TASKS = ["Build and deploy machine learning models", "Analyse large data sets with Python and SQL",
+                   "Develop dashboards for business stakeholders", "Design data pipelines in the cloud",
+                   "Present insights to management", "Run A/B tests and evaluate experiments"]
+SYNTHETIC_SKILLS = ["Python", "SQL", "Machine Learning", "Power BI", "Azure", "Spark", "Statistics",
+                    "German and English", "Master's degree in a quantitative field", "Git"]
+
+PAGE_TEMPLATE = "<!DOCTYPE html><html lang='de'><head><meta charset='utf-8'><title>{title}</title></head><body>{body}</body></html>"
+
+# Loads the clicked ad into the detail pane instead of navigating away (same behaviour as the live site)
+DETAIL_PANE_SCRIPT = """
+<script>
+document.addEventListener('click', async (event) => {
+    const link = event.target.closest("a[data-cy='job-link']");
+    if (!link) return;
+    event.preventDefault();
+    const response = await fetch(link.href + '?fragment=1');
+    document.getElementById('job-detail').innerHTML = await response.text();
+});
+</script>
+"""
+
+
+class MockJobsSite:
+
+    def __init__(self, total_ads: int = DEFAULT_TOTAL_ADS, ads_per_page: int = DEFAULT_ADS_PER_PAGE,
+                 latency_ms: float = DEFAULT_LATENCY_MS, jitter_ms: float = DEFAULT_JITTER_MS,
+                 seed: int = 42, cache_dir: Path = None):
+        self.ads_per_page = ads_per_page
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.ads = self._recorded_ads(cache_dir, total_ads) if cache_dir else self._synthetic_ads(total_ads)
+
+    # --- AD DATA ---
+    def _synthetic_ads(self, total_ads: int) -> list:
+        ads = []
+        pick = self._random.sample
+        for ad_id in range(1, total_ads + 1):
+            ads.append({"id": ad_id,
+                        "title": f"{SYNTHETIC_TITLES[ad_id % len(SYNTHETIC_TITLES)]} #{ad_id}",
+                        "company": SYNTHETIC_COMPANIES[ad_id % len(SYNTHETIC_COMPANIES)],
+                        "location": SYNTHETIC_LOCATIONS[ad_id % len(SYNTHETIC_LOCATIONS)],
+                        "tasks": pick(SYNTHETIC_TASKS, 4),
+                        "skills": pick(SYNTHETIC_SKILLS, 5),
+                        "html": None})
+        return ads
+
+    # Recorded ads: card data and page HTML from the raw HTML cache of earlier scrapes
+    def _recorded_ads(self, cache_dir: Path, total_ads: int) -> list:
+        from src.scraping.html_cache import HtmlCache, read_cached_html
+        from src.scraping.jobs_http_fetcher import parse_job_detail_html
+
+        with HtmlCache(cache_dir) as html_cache:
+            entries = html_cache.latest_entries()[:total_ads]
+
+        ads = []
+        for ad_id, entry in enumerate(entries, start=1):
+            html = read_cached_html(cache_dir, entry["content_hash"])
+            tasks, skills = parse_job_detail_html(html)
+            metadata = entry["metadata"]
+            ads.append({"id": ad_id,
+                        "title": metadata.get("Job_Title") or f"Recorded ad #{ad_id}",
+                        "company": metadata.get("Company_Name") or "Unknown company",
+                        "location": metadata.get("Job_Location") or "",
+                        "tasks": tasks,
+                        "skills": skills,
+                        "html": html})
+        print(f"Serving {len(ads)} recorded ads from {cache_dir}.")
+        return ads
+
+    def simulate_latency(self):
+        with self._random_lock:
+            delay_ms = self._random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+        time.sleep(max(0.0, delay_ms) / 1000)
+
+    # --- PAGES ---
+    def start_page(self) -> str:
+        body = """
+        <div id="cookie-banner"><button onclick="this.parentNode.remove()">Alle Cookies akzeptieren</button></div>
+        <div id="smart-search"><button onclick="this.parentNode.remove()">Schliessen</button></div>
+        <form action="/de/stellenangebote/" method="get">
+            <input id="synonym-typeahead-text-field" name="term" type="text">
+        </form>
+        """
+        return PAGE_TEMPLATE.format(title="Mock jobs.ch", body=body)
+
+    def job_card(self, ad: dict) -> str:
+        # Structure mirrors JOB_TITLE_XPATH, JOB_LOCATION_XPATH and COMPANY_NAME_XPATH (relative to the link)
+        return (f"<a data-cy='job-link' href='/de/stellenangebote/detail/{ad['id']}/'><div>"
+                f"<div><span class='textStyle_h6'>{escape(ad['title'])}</span></div>"
+                f"<div><p>Heute</p></div>"
+                f"<div><div><p>{escape(ad['location'])}</p></div></div>"
+                f"<div><p><strong>{escape(ad['company'])}</strong></p></div>"
+                f"</div></a>")
+
+    def results_page(self, term: str, page: int) -> str:
+        first = (page - 1) * self.ads_per_page
+        page_ads = self.ads[first:first + self.ads_per_page]
+        cards = "\n".join(self.job_card(ad) for ad in page_ads)
+        paginator = ""
+        if first + self.ads_per_page < len(self.ads):
+            paginator = f"<a data-cy='paginator-next' href='/de/stellenangebote/?term={quote_plus(term)}&page={page + 1}'>Weiter</a>"
+        body = (f"<div id='job-list'>{cards}</div>{paginator}"
+                f"<div id='job-detail'></div>{DETAIL_PANE_SCRIPT}")
+        return PAGE_TEMPLATE.format(title=f"{escape(term)} - Seite {page}", body=body)
+
+    def detail_fragment(self, ad: dict) -> str:
+        def bullet_list(items):
+            return "<ul class='li-t_disc'>" + "".join(f"<li>{escape(item)}</li>" for item in items) + "</ul>"
+        return f"<h1>{escape(ad['title'])}</h1><div>{bullet_list(ad['tasks'])}{bullet_list(ad['skills'])}</div>"
+
+    def detail_page(self, ad: dict) -> str:
+        if ad["html"]:
+            return ad["html"]
+        return PAGE_TEMPLATE.format(title=escape(ad["title"]), body=self.detail_fragment(ad))
+
+
+def make_request_handler(site: MockJobsSite):
+
+    class MockJobsHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            site.simulate_latency()
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+
+            if url.path in ("/", "/de", "/de/"):
+                return self._send(site.start_page())
+
+            if url.path.rstrip("/") == "/de/stellenangebote":
+                term = query.get("term", [""])[0]
+                page = int(query.get("page", ["1"])[0])
+                return self._send(site.results_page(term, page))
+
+            detail_match = re.fullmatch(r"/de/stellenangebote/detail/(\d+)/?", url.path)
+            if detail_match:
+                ad_id = int(detail_match.group(1))
+                if 1 <= ad_id <= len(site.ads):
+                    ad = site.ads[ad_id - 1]
+                    fragment = query.get("fragment", ["0"])[0] == "1"
+                    return self._send(site.detail_fragment(ad) if fragment else site.detail_page(ad))
+
+            self._send("<h1>Not found</h1>", status=404)
+
+        def _send(self, html: str, status: int = 200):
+            payload = html.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            # Keep benchmark output readable
+            pass
+
+    return MockJobsHandler
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **site_options):
+    """Starts the server in a background thread. Returns (server, base_url); stop it with server.shutdown()."""
+    site = MockJobsSite(**site_options)
+    server = ThreadingHTTPServer((host, port), make_request_handler(site))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-jobs-server", daemon=True).start()
+    base_url = f"http://{host}:{server.server_address[1]}/de/"
+    return server, base_url
+
+
+# --- STANDALONE EXECUTION BLOCK ---
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for jobs.ch.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ads", type=int, default=DEFAULT_TOTAL_ADS, help="Number of ads in the result list.")
+    parser.add_argument("--ads-per-page", type=int, default=DEFAULT_ADS_PER_PAGE)
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS, help="Mean response latency.")
+    parser.add_argument("--jitter-ms", type=float, default=DEFAULT_JITTER_MS, help="Uniform +/- jitter around the latency.")
+    parser.add_argument("--cache-dir", type=Path, default=None, help="Serve recorded ads from this raw HTML cache.")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(args.host, args.port, total_ads=args.ads, ads_per_page=args.ads_per_page,
+                                         latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                         cache_dir=args.cache_dir)
+    print(f"Mock jobs.ch running at {base_url} ({args.ads} ads, {args.latency_ms:.0f} +/- {args.jitter_ms:.0f} ms). "
+          f"Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,172 @@
+# ==========================================================
+# Scraper Throughput Benchmark (offline, against the mock server)
+# ==========================================================
+# Goal:
+#   Catch scraping throughput regressions without touching jobs.ch.
+# Key Functionality:
+#   - Starts the local mock jobs.ch server (configurable latency / jitter).
+#   - Runs the Selenium, HTTP and async fetch paths against it, each in its
+#     own process (JOBS_CH_BASE_URL points the scrapers at the mock) with
+#     an empty master file in a temporary directory.
+#   - Reports ads/sec, p50 / p95 latency per ad and peak RSS per fetch path.
+#   - Optional: compares ads/sec with a saved baseline CSV and fails on a regression.
+# Execution:
+#   python -m src.benchmark.scraper_benchmark --ads 100 --output report/benchmark.csv
+#   python -m src.benchmark.scraper_benchmark --baseline report/benchmark.csv
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import pandas as pd
+
+from src.benchmark.mock_jobs_server import start_mock_server, DEFAULT_LATENCY_MS, DEFAULT_JITTER_MS
+
+# Not available on Windows: peak RSS is reported as NaN there
+try:
+    import resource
+except ImportError:
+    resource = None
+
+FETCH_MODES = ("selenium", "http", "async")
+DEFAULT_BENCHMARK_ADS = 100
+DEFAULT_MAX_REGRESSION = 0.2
+BENCHMARK_SEARCH_TERM = "Data Scientist"
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def peak_rss_mb(who) -> float:
+    """Peak resident set size in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    if resource is None:
+        return float("nan")
+    max_rss = resource.getrusage(who).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+
+# --- CHILD PROCESS: ONE FETCH PATH ---
+def run_fetch_mode(fetch_mode: str, max_ads: int, browser_profile: str, work_dir: Path) -> dict:
+    # Imported here: JOBS_CH_BASE_URL is read from the environment when the scraping package is loaded
+    from src.scraping import scrape_jobs, scrape_jobs_http, scrape_jobs_async, LatencyProfile
+    from src.scraping.scrape_timing import AD_LATENCY_STEP, percentile
+
+    scrapers = {"selenium": scrape_jobs, "http": scrape_jobs_http, "async": scrape_jobs_async}
+    profile = LatencyProfile()
+
+    start = time.perf_counter()
+    df_scraped = scrapers[fetch_mode](BENCHMARK_SEARCH_TERM, max_ads,
+                                      work_dir / f"session_{fetch_mode}.csv", work_dir / "master.csv",
+                                      browser_profile=browser_profile, latency_profile=profile)
+    elapsed = time.perf_counter() - start
+
+    ad_latencies = sorted(profile.samples(AD_LATENCY_STEP))
+    return {"Mode": fetch_mode,
+            "Ads": len(df_scraped),
+            "Elapsed_s": round(elapsed, 2),
+            "Ads_per_s": round(len(df_scraped) / elapsed, 2) if elapsed > 0 else 0.0,
+            "p50_ms": round(percentile(ad_latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(ad_latencies, 95) * 1000, 1),
+            "Peak_RSS_MB": round(peak_rss_mb(resource.RUSAGE_SELF) if resource else float("nan"), 1),
+            "Peak_RSS_Children_MB": round(peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else float("nan"), 1)}
+
+
+# --- PARENT PROCESS: SERVER + ONE SUBPROCESS PER FETCH PATH ---
+def run_scraper_benchmark(modes=FETCH_MODES, max_ads: int = DEFAULT_BENCHMARK_ADS,
+                          latency_ms: float = DEFAULT_LATENCY_MS, jitter_ms: float = DEFAULT_JITTER_MS,
+                          browser_profile: str = "performance", cache_dir: Path = None) -> pd.DataFrame:
+    server, base_url = start_mock_server(total_ads=max_ads, latency_ms=latency_ms, jitter_ms=jitter_ms,
+                                         cache_dir=cache_dir)
+    print(f"Mock jobs.ch running at {base_url} ({max_ads} ads, {latency_ms:.0f} +/- {jitter_ms:.0f} ms)")
+
+    rows = []
+    try:
+        for fetch_mode in modes:
+            print("\n" + "-" * 50)
+            print(f"--- Benchmarking fetch mode '{fetch_mode}' ---")
+            with tempfile.TemporaryDirectory(prefix=f"bench_{fetch_mode}_") as work_dir:
+                result_path = Path(work_dir) / "result.json"
+                command = [sys.executable, "-m", "src.benchmark.scraper_benchmark",
+                           "--child-mode", fetch_mode, "--ads", str(max_ads),
+                           "--browser-profile", browser_profile,
+                           "--work-dir", work_dir, "--result-json", str(result_path)]
+                env = {**os.environ, "JOBS_CH_BASE_URL": base_url}
+                completed = subprocess.run(command, cwd=PROJECT_ROOT, env=env)
+
+                if completed.returncode != 0 or not result_path.exists():
+                    print(f"ERROR: Fetch mode '{fetch_mode}' failed (exit code {completed.returncode}).")
+                    rows.append({"Mode": fetch_mode, "Ads": 0})
+                    continue
+                rows.append(json.loads(result_path.read_text(encoding="utf-8")))
+    finally:
+        server.shutdown()
+
+    return pd.DataFrame(rows)
+
+
+def check_regression(df_results: pd.DataFrame, baseline_path: Path, max_regression: float) -> list:
+    """Returns the fetch modes whose ads/sec dropped more than max_regression below the baseline."""
+    df_baseline = pd.read_csv(baseline_path, sep=";")
+    baseline_rates = dict(zip(df_baseline["Mode"], df_baseline["Ads_per_s"]))
+
+    regressions = []
+    for _, row in df_results.iterrows():
+        baseline_rate = baseline_rates.get(row["Mode"])
+        if not baseline_rate or pd.isna(row.get("Ads_per_s")):
+            continue
+        change = row["Ads_per_s"] / baseline_rate - 1
+        status = "REGRESSION" if change < -max_regression else "ok"
+        print(f"  {row['Mode']:9} {row['Ads_per_s']:7.2f} ads/s vs. baseline {baseline_rate:7.2f} ({change:+.0%}) {status}")
+        if change < -max_regression:
+            regressions.append(row["Mode"])
+    return regressions
+
+
+# --- STANDALONE EXECUTION BLOCK ---
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Offline scraper throughput benchmark against a mock jobs.ch.")
+    parser.add_argument("--modes", nargs="+", choices=FETCH_MODES, default=list(FETCH_MODES))
+    parser.add_argument("--ads", type=int, default=DEFAULT_BENCHMARK_ADS, help="Ads served and scraped per mode.")
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=DEFAULT_JITTER_MS)
+    parser.add_argument("--browser-profile", default="performance", help="Chrome profile for the Selenium parts.")
+    parser.add_argument("--cache-dir", type=Path, default=None, help="Serve recorded ads from this raw HTML cache.")
+    parser.add_argument("--output", type=Path, default=None, help="Save the results as CSV (usable as baseline).")
+    parser.add_argument("--baseline", type=Path, default=None, help="Fail if ads/sec dropped below this baseline.")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="Allowed ads/sec drop against the baseline (default: 0.2 = 20%%).")
+    # Internal: used by the parent process to run one fetch path in a fresh process
+    parser.add_argument("--child-mode", choices=FETCH_MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--result-json", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_mode:
+        result = run_fetch_mode(args.child_mode, args.ads, args.browser_profile, args.work_dir)
+        args.result_json.write_text(json.dumps(result), encoding="utf-8")
+        sys.exit(0)
+
+    df_results = run_scraper_benchmark(args.modes, args.ads, args.latency_ms, args.jitter_ms,
+                                       args.browser_profile, args.cache_dir)
+
+    print("\n" + "=" * 50)
+    print("--- Scraper Throughput Benchmark ---")
+    print(df_results.to_string(index=False))
+    print("=" * 50)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        df_results.to_csv(args.output, index=False, sep=";")
+        print(f"Results saved to: {args.output}")
+
+    if args.baseline:
+        regressions = check_regression(df_results, args.baseline, args.max_regression)
+        if regressions:
+            print(f"ERROR: Throughput regression in: {', '.join(regressions)}")
+            sys.exit(1)
+        print("No throughput regression against the baseline.")
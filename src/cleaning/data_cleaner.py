@@ -8,19 +8,52 @@
 #   - Excludes records missing both Tasks AND Skills descriptions.
 #   - Refines data quality by excluding specific, non-relevant jobs based on an indexed inspection list.
 #   - Filters data using an extensive keyword list across Title, Tasks, and Skills
-#     to eliminate non-Data Science roles (e.g., Legal, HR, Logistics).
+#     to eliminate non-Data Science roles (e.g., Legal, HR, Logistics), with one
+#     compiled multi-keyword scan per row (see keyword_matcher.py).
+#   - Incremental mode: cleans only rows added since the last run and appends them;
+#     rebuilds automatically when the cleaning rules change.
+#   - Streaming mode: processes the master in chunks, so memory does not grow with its size.
+#   - Optional near-duplicate filter (MinHash / LSH on Tasks + Skills, see near_duplicates.py).
 # Author: Stefan Dreyfus
 # ==========================================================
 
 
 import pandas as pd
 import os
-import re
 from pathlib import Path
 import sys
+from functools import lru_cache
+import hashlib
+import json
+from collections import Counter
+from src.storage import load_job_table, load_compact_job_table, iter_job_table, write_arrow_table, arrow_sidecar_path, PYARROW_AVAILABLE
+from src.cleaning.keyword_matcher import KeywordMatcher
+from src.cleaning.near_duplicates import (NearDuplicateIndex, near_duplicate_cache_path, write_near_duplicate_report,
+                                          REPORT_COLUMNS, TEXT_COLUMNS)
+
+# resource (peak memory report) only exists on Unix
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+# The matcher is compiled once per keyword list and reused by later calls
+@lru_cache(maxsize=8)
+def get_keyword_matcher(keywords: tuple) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+#    One scan per row over all columns; the result is the keyword that fired per row (None = keep the row)
+def keyword_exclusions(df: pd.DataFrame, keywords: list, columns: list) -> pd.Series:
+    matcher = get_keyword_matcher(tuple(keywords))
+    return pd.Series(matcher.first_match_in_rows(df, columns), index=df.index, dtype=object)
+
 
 #    Filters a DataFrame by excluding rows where any of the specified columns
 #    contain any of the defined exclusion keywords.
+#    Keywords are matched case-insensitively as literals; r'\bWord\b' only matches the whole word.
 def apply_keyword_filter(df: pd.DataFrame, keywords: list, columns: list):
 
     if not keywords or not columns:
@@ -29,24 +62,8 @@ def apply_keyword_filter(df: pd.DataFrame, keywords: list, columns: list):
 
     rows_before_filter = len(df)
 
-    # Building the case-insensitive regex pattern
-    # Escape special characters in keywords (like '.' in 'PH.D') and join them with an OR operator '|'
-    regex_pattern = '|'.join([re.escape(k) for k in keywords])
-    regex_pattern_with_flags = f'(?i){regex_pattern}'
-
-    # Creating the combined boolean exclusion mask. Initializing the mask to all False
-    exclusion_mask = pd.Series([False] * rows_before_filter, index=df.index)
-
-    # Iterating over the columns and update the exclusion mask using the logical OR operator
-    for col in columns:
-        # Calculate the mask for the current column
-        col_mask = df[col].astype(str).str.contains(
-            regex_pattern_with_flags,
-            na=False,
-            regex=True
-        )
-        # The job is excluded if it matches the pattern in ANY of the columns
-        exclusion_mask = exclusion_mask | col_mask
+    fired_keywords = keyword_exclusions(df, keywords, columns)
+    exclusion_mask = fired_keywords.notna()
 
     # Apply the filter. Keep only the rows where the mask is False
     df_filtered = df[~exclusion_mask].copy()
@@ -59,28 +76,261 @@ def apply_keyword_filter(df: pd.DataFrame, keywords: list, columns: list):
     print(f"Keywords used: {', '.join(keywords[:5])}...")
     print(f"Total rows before filter: {rows_before_filter}")
     print(f"Rows excluded by keyword filter: {rows_excluded}")
+    # Each excluded row is counted for the first keyword found in it
+    for keyword, count in fired_keywords[exclusion_mask].value_counts().items():
+        print(f"  {keyword}: {count}")
     print(f"Total rows after filter: {len(df_filtered)}")
     print("-" * 30)
 
     return df_filtered
 
 
+# --- CLEANING RULES ---
+# Strings indicating missing data
+MISSING_TASK_STRING = 'no tasks found on this job ad'
+MISSING_SKILL_STRING = 'no skills found on this job ad'
+
+#Exclusion of Specific Jobs by Job_Index
+JOB_INDICES_TO_EXCLUDE = [
+    4, 14, 17, 23, 24, 26, 39, 43, 45, 46, 47, 49, 51, 52,
+    54, 57, 58, 62, 63, 64, 66, 77, 80, 82, 90, 91, 95, 100,
+    101, 102, 103, 104, 105, 106, 107, 108, 110, 113, 114, 115, 116, 117,
+    118, 119, 120, 122, 125, 126, 127, 128, 129, 132, 134, 138, 139, 146,
+    148, 152, 154, 155, 157, 158, 159, 160, 161, 163, 166, 167, 168, 169,
+    170, 171, 173, 177, 178, 182, 185, 186, 188, 189, 190, 191, 193, 194,
+    195, 198, 202, 210, 220, 221, 224, 237, 241, 243, 245, 247, 249, 250,
+    252, 253, 254, 255, 256, 259, 260, 261, 262, 264, 265, 266, 267, 274,
+    276, 283, 287, 290, 293, 294, 298, 308, 310, 327, 342, 348, 351, 378,
+    379, 382, 385, 392, 394, 396, 400, 401
+]
+
+# Define the keywords for exclusion. Keywords will be searched in 'Title', 'Tasks', and 'Skills' columns.
+EXCLUSION_KEYWORDS = [
+    # ACADEMIC / HIGHLY SPECIALIZED SCIENCE
+    r'PH\.D',
+    'Doktor',
+    'Dozent',
+    'Chemie',
+    'Biologie',
+    'Laborant',
+    'Food process',
+    'Food engineering',
+    # SOCIAL SCIENCES / HUMANITIES / LEGAL
+    r'\bRecht\b',
+    'Psychologie',
+    'Sozialwissenschaften',
+    'Geisteswissenschaften',
+    # MEDICAL / HEALTHCARE / PHARMACEUTICAL
+    r'\bMedizin\b',
+    'Infirmières',
+    'Infirmier',
+    'Pflegeexpert',
+    # TRADES / MANUAL / ENGINEERING / LOGISTICS
+    'Montage',
+    'Monteur',
+    'Servicetechniker',
+    'Technicien',
+    'Mechanical',
+    'Manufacturing',
+    'Bauingenieur',
+    'Lager',
+    # BUSINESS SUPPORT / ADMIN / FINANCE
+    'HR-Manager',
+    'Treuhand',
+    'Buchhaltung',
+]
+
+# Columns to check for the exclusion keywords
+KEYWORD_COLUMNS = ['Job_Title', 'Tasks', 'Skills']
+
+# Part of the rule hash: raise it when the filter logic itself changes, so incremental runs rebuild once
+CLEANING_LOGIC_VERSION = 2
+
 # Define the delimiter used for all CSV operations
 CSV_DELIMITER = ';'
-def run_data_cleaning(input_file_path: Path, intermediate_output_path: Path, final_output_path: Path):
+
+
+# --- INCREMENTAL CLEANING STATE ---
+# Fingerprint of everything that decides whether a row survives the cleaning
+def cleaning_rules_hash(near_duplicate_threshold: float = None) -> str:
+    rules = {"version": CLEANING_LOGIC_VERSION,
+             "near_duplicate_threshold": near_duplicate_threshold,
+             "missing": [MISSING_TASK_STRING, MISSING_SKILL_STRING],
+             "excluded_indices": sorted(JOB_INDICES_TO_EXCLUDE),
+             "keywords": EXCLUSION_KEYWORDS,
+             "keyword_columns": KEYWORD_COLUMNS}
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def cleaning_state_path(final_output_path: Path) -> Path:
+    return Path(final_output_path).with_suffix(".cleaning_state.json")
+
+
+#    Returns the last cleaned Job_Index if the outputs can be extended, otherwise None (full rebuild):
+#    the rules must be unchanged and both output files exactly as the last run left them.
+def last_cleaned_job_index(intermediate_output_path: Path, final_output_path: Path, rules_hash: str):
+    state_path = cleaning_state_path(final_output_path)
+    if not state_path.exists():
+        return None
+    try:
+        with open(state_path, encoding="utf-8") as state_file:
+            state = json.load(state_file)
+    except (json.JSONDecodeError, OSError):
+        return None
+
+    if state.get("rules_hash") != rules_hash:
+        print("Cleaning rules changed since the last run. Rebuilding the cleaned files from scratch.")
+        return None
+    for output_path, size_key in ((intermediate_output_path, "intermediate_size"), (final_output_path, "final_size")):
+        if not Path(output_path).exists() or Path(output_path).stat().st_size != state.get(size_key):
+            print(f"{Path(output_path).name} changed since the last cleaning run. Rebuilding from scratch.")
+            return None
+    return state.get("last_job_index")
+
+
+def write_cleaning_state(intermediate_output_path: Path, final_output_path: Path, rules_hash: str, last_job_index: int):
+    state = {"last_job_index": int(last_job_index),
+             "rules_hash": rules_hash,
+             "intermediate_size": Path(intermediate_output_path).stat().st_size,
+             "final_size": Path(final_output_path).stat().st_size}
+    state_path = cleaning_state_path(final_output_path)
+    tmp_path = state_path.with_name(state_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as state_file:
+        json.dump(state, state_file, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+# Highest resident memory of this process so far in MB (None where the resource module is missing, e.g. Windows)
+def peak_memory_mb():
+    if not RESOURCE_AVAILABLE:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return max_rss / 1024 / 1024 if sys.platform == "darwin" else max_rss / 1024
+
+
+def print_peak_memory():
+    peak_mb = peak_memory_mb()
+    if peak_mb is not None:
+        print(f"Peak memory (max RSS of this process): {peak_mb:.0f} MB")
+
+
+#    Streaming mode: reads the input in chunks of chunk_size rows and applies the missing-content,
+#    index and keyword filters per chunk, writing both CSVs as it goes. Memory stays bounded by the
+#    chunk size (plus the near-duplicate signatures); only the Job_Index column of the result is returned.
+def run_streaming_cleaning(input_file_path: Path, intermediate_output_path: Path, final_output_path: Path,
+                           chunk_size: int, last_job_index: int = None, rules_hash: str = None,
+                           near_duplicate_threshold: float = None):
+
+    append_outputs = last_job_index is not None
+    filters = [("Job_Index", ">", last_job_index)] if append_outputs else None
+    os.makedirs(intermediate_output_path.parent, exist_ok=True)
+    os.makedirs(final_output_path.parent, exist_ok=True)
+
+    near_duplicates = None
+    if near_duplicate_threshold:
+        near_duplicates = NearDuplicateIndex(near_duplicate_cache_path(final_output_path), near_duplicate_threshold)
+        # Reposts of ads that are already in the cleaned output must be caught as well
+        if append_outputs:
+            for df_previous in iter_job_table(final_output_path, chunk_size, columns=["Job_Index"] + TEXT_COLUMNS):
+                near_duplicates.add_rows(df_previous)
+        write_near_duplicate_report(pd.DataFrame(columns=REPORT_COLUMNS), final_output_path, append=append_outputs)
+
+    rows_total = rows_missing = rows_by_index = rows_near_duplicates = rows_final = 0
+    keyword_counts = Counter()
+    max_job_index = last_job_index or 0
+    write_header = not append_outputs
+    file_mode = "a" if append_outputs else "w"
+
+    print(f"Streaming cleaning in chunks of {chunk_size} rows...")
+    if append_outputs:
+        print(f"Incremental cleaning: only rows after Job_Index {last_job_index}.")
+    with open(intermediate_output_path, file_mode, encoding="utf-8", newline="") as intermediate_file, \
+            open(final_output_path, file_mode, encoding="utf-8", newline="") as final_file:
+        for chunk_number, df in enumerate(iter_job_table(input_file_path, chunk_size, filters=filters), start=1):
+            if df.empty:
+                continue
+            rows_total += len(df)
+            max_job_index = max(max_job_index, int(df["Job_Index"].max()))
+
+            # Same filters as the in-memory run, as masks without intermediate copies
+            missing_mask = (df["Tasks"] == MISSING_TASK_STRING) & (df["Skills"] == MISSING_SKILL_STRING)
+            df_cleaned_and = df[~missing_mask]
+            df_cleaned_and.to_csv(intermediate_file, sep=CSV_DELIMITER, index=False, header=write_header)
+
+            index_mask = df_cleaned_and["Job_Index"].isin(JOB_INDICES_TO_EXCLUDE)
+            fired_keywords = keyword_exclusions(df_cleaned_and[~index_mask], EXCLUSION_KEYWORDS, KEYWORD_COLUMNS)
+            df_final = df_cleaned_and[~index_mask][fired_keywords.isna()]
+            if near_duplicates is not None:
+                df_final, df_report = near_duplicates.remove_duplicates(df_final)
+                write_near_duplicate_report(df_report, final_output_path, append=True)
+                rows_near_duplicates += len(df_report)
+            df_final.to_csv(final_file, sep=CSV_DELIMITER, index=False, header=write_header)
+            write_header = False
+
+            rows_missing += int(missing_mask.sum())
+            rows_by_index += int(index_mask.sum())
+            keyword_counts.update(fired_keywords.dropna().tolist())
+            rows_final += len(df_final)
+            print(f"Chunk {chunk_number}: {len(df)} rows read, {len(df_final)} kept.")
+
+    print("-" * 30)
+    print(f"Total rows in original data: {rows_total}")
+    print(f"Rows excluded (Missing Tasks AND Missing Skills): {rows_missing}")
+    print(f"Data refinement: {rows_total - rows_missing} records processed; {rows_by_index} jobs removed.")
+    print(f"Rows excluded by keyword filter: {sum(keyword_counts.values())}")
+    for keyword, count in keyword_counts.most_common():
+        print(f"  {keyword}: {count}")
+    if near_duplicates is not None:
+        print(f"Rows excluded as near-duplicates: {rows_near_duplicates} "
+              f"(signatures computed: {near_duplicates.hashed}, others from the cache)")
+        near_duplicates.save()
+    print(f"Total rows after filter: {rows_final}")
+    print("-" * 30)
+    print(f"File saved successfully at: {final_output_path}")
+
+    # No Arrow copy in streaming mode (it would need the whole table): drop the stale one, later stages read the CSV
+    arrow_sidecar_path(final_output_path).unlink(missing_ok=True)
+    if rules_hash is not None:
+        try:
+            write_cleaning_state(intermediate_output_path, final_output_path, rules_hash, max_job_index)
+        except Exception as e:
+            print(f"WARNING: Cleaning state could not be saved, the next incremental run will rebuild: {e}")
+    print_peak_memory()
+
+    return load_job_table(final_output_path, columns=["Job_Index"])
+
+
+#    incremental: only clean the rows with a Job_Index above the last run and append the survivors to
+#    the intermediate and final CSVs. Falls back to a full rebuild if the rules or the outputs changed.
+#    chunk_size: stream the input in chunks of this many rows (see run_streaming_cleaning).
+#    near_duplicate_threshold: also drop ads whose Tasks + Skills are this similar (Jaccard) to an earlier ad.
+def run_data_cleaning(input_file_path: Path, intermediate_output_path: Path, final_output_path: Path,
+                      incremental: bool = False, chunk_size: int = None, near_duplicate_threshold: float = None):
 #return will be pd.DataFrame
 
     # --- Configuration ---
-    # Data Loading
-    df = pd.read_csv(input_file_path, sep = CSV_DELIMITER)
+    rules_hash = cleaning_rules_hash(near_duplicate_threshold)
+    last_job_index = None
+    if incremental:
+        last_job_index = last_cleaned_job_index(intermediate_output_path, final_output_path, rules_hash)
+
+    if chunk_size:
+        return run_streaming_cleaning(input_file_path, intermediate_output_path, final_output_path,
+                                      chunk_size, last_job_index, rules_hash, near_duplicate_threshold)
+
+    # Data Loading (master CSV, Parquet store or SQLite job store)
+    if last_job_index is not None:
+        df = load_compact_job_table(input_file_path, filters=[("Job_Index", ">", last_job_index)], stage="Cleaning")
+        print(f"Incremental cleaning: {len(df)} new rows since Job_Index {last_job_index}.")
+    else:
+        df = load_compact_job_table(input_file_path, stage="Cleaning")
+    append_outputs = last_job_index is not None
+    max_job_index = int(df["Job_Index"].max()) if not df.empty else (last_job_index or 0)
 
 
     # --- Filtering No Tasks AND No Skills ---
 
-    # Define the specific strings to filter for, indicating missing data
-    MISSING_TASK_STRING = 'no tasks found on this job ad'
-    MISSING_SKILL_STRING = 'no skills found on this job ad'
-
     # Create a boolean Series for rows where the Tasks and Skills column matches the missing string.
     missing_tasks_mask = (df["Tasks"] == MISSING_TASK_STRING)
     missing_skills_mask = (df["Skills"]) == MISSING_SKILL_STRING
@@ -105,7 +355,8 @@ def run_data_cleaning(input_file_path: Path, intermediate_output_path: Path, fin
     # Creating an intermediate CSV with the cleaned dataset for inspection and debugging.
     try:
         os.makedirs(intermediate_output_path.parent, exist_ok=True)
-        df_cleaned_and.to_csv(intermediate_output_path, sep=CSV_DELIMITER, index=False)
+        df_cleaned_and.to_csv(intermediate_output_path, sep=CSV_DELIMITER, index=False,
+                              mode="a" if append_outputs else "w", header=not append_outputs)
         print(f"Intermediate file saved successfully at: {intermediate_output_path}")
     except Exception as e:
         print(f"WARNING: Intermediate save failed: {e}")
@@ -157,20 +408,6 @@ def run_data_cleaning(input_file_path: Path, intermediate_output_path: Path, fin
 
     rows_before_index_exclusion = len(df_cleaned)
 
-    #Exclusion of Specific Jobs by Job_Index
-    JOB_INDICES_TO_EXCLUDE = [
-        4, 14, 17, 23, 24, 26, 39, 43, 45, 46, 47, 49, 51, 52,
-        54, 57, 58, 62, 63, 64, 66, 77, 80, 82, 90, 91, 95, 100,
-        101, 102, 103, 104, 105, 106, 107, 108, 110, 113, 114, 115, 116, 117,
-        118, 119, 120, 122, 125, 126, 127, 128, 129, 132, 134, 138, 139, 146,
-        148, 152, 154, 155, 157, 158, 159, 160, 161, 163, 166, 167, 168, 169,
-        170, 171, 173, 177, 178, 182, 185, 186, 188, 189, 190, 191, 193, 194,
-        195, 198, 202, 210, 220, 221, 224, 237, 241, 243, 245, 247, 249, 250,
-        252, 253, 254, 255, 256, 259, 260, 261, 262, 264, 265, 266, 267, 274,
-        276, 283, 287, 290, 293, 294, 298, 308, 310, 327, 342, 348, 351, 378,
-        379, 382, 385, 392, 394, 396, 400, 401
-    ]
-
     # Create a boolean mask: True for rows where Job_Index is IN the exclusion list
     exclusion_mask = df_cleaned['Job_Index'].isin(JOB_INDICES_TO_EXCLUDE)
 
@@ -187,58 +424,56 @@ def run_data_cleaning(input_file_path: Path, intermediate_output_path: Path, fin
     # --- Filtering by Keywords ---
     "As the further step, a keyword-based exclusion filter was applied across the job Title, Tasks, and Skills columns to remove roles that clearly fell outside the scope of Data Science, such as those explicitly mentioning Lager, Recht, or Chemie. The keywords were indentified meanwhile going through the data set"
 
-    # Define the keywords for exclusion. Keywords will be searched in 'Title', 'Tasks', and 'Skills' columns.
-    EXCLUSION_KEYWORDS = [
-        # ACADEMIC / HIGHLY SPECIALIZED SCIENCE
-        'PH\.D',
-        'Doktor',
-        'Dozent',
-        'Chemie',
-        'Biologie',
-        'Laborant',
-        'Food process',
-        'Food engineering',
-        # SOCIAL SCIENCES / HUMANITIES / LEGAL
-        r'\bRecht\b',
-        'Psychologie',
-        'Sozialwissenschaften',
-        'Geisteswissenschaften',
-        # MEDICAL / HEALTHCARE / PHARMACEUTICAL
-        r'\bMedizin\b',
-        'Infirmières',
-        'Infirmier',
-        'Pflegeexpert',
-        # TRADES / MANUAL / ENGINEERING / LOGISTICS
-        'Montage',
-        'Monteur',
-        'Servicetechniker',
-        'Technicien',
-        'Mechanical',
-        'Manufacturing',
-        'Bauingenieur',
-        'Lager',
-        # BUSINESS SUPPORT / ADMIN / FINANCE
-        'HR-Manager',
-        'Treuhand',
-        'Buchhaltung',
-    ]
-
-    # Columns to check for the exclusion keywords
-    columns_to_check = ['Job_Title', 'Tasks', 'Skills']
-
     # Apply the keyword filtering using the new abstracted function
     df_cleaned_final = apply_keyword_filter(
         df=df_cleaned,
         keywords=EXCLUSION_KEYWORDS,
-        columns=columns_to_check
+        columns=KEYWORD_COLUMNS
     )
 
-    # --- CREATING FINAL CSV WITH THE CLEANED DATASET ---
-    os.makedirs(os.path.dirname(final_output_path), exist_ok=True)
+    # --- Filtering Near-Duplicate Ads ---
+    "The same ad is sometimes posted again with a slightly changed title or by a recruiting agency. Ads whose Tasks and Skills are nearly identical to an earlier ad are removed, so they are not counted twice in the analysis."
 
-    df_cleaned_final.to_csv(final_output_path, index=False, sep=CSV_DELIMITER) # Save to CSV (without the index column)
+    os.makedirs(os.path.dirname(final_output_path), exist_ok=True)
+    # Previous result (memory-mapped Arrow copy if up to date), needed when appending
+    df_previous_final = load_job_table(final_output_path) if append_outputs else None
+
+    if near_duplicate_threshold:
+        near_duplicates = NearDuplicateIndex(near_duplicate_cache_path(final_output_path), near_duplicate_threshold)
+        if append_outputs:
+            near_duplicates.add_rows(df_previous_final)
+        rows_before_near_duplicates = len(df_cleaned_final)
+        df_cleaned_final, df_near_duplicates = near_duplicates.remove_duplicates(df_cleaned_final)
+        near_duplicates.print_summary(rows_before_near_duplicates, df_near_duplicates)
+        report_path = write_near_duplicate_report(df_near_duplicates, final_output_path, append=append_outputs)
+        print(f"Near-duplicate pairs saved at: {report_path}")
+        near_duplicates.save()
 
-    print(f"File saved successfully at: {final_output_path}")
+    # --- CREATING FINAL CSV WITH THE CLEANED DATASET ---
+    if append_outputs:
+        # Previous result plus the new survivors
+        df_cleaned_final.to_csv(final_output_path, index=False, sep=CSV_DELIMITER, mode="a", header=False)
+        print(f"{len(df_cleaned_final)} new rows appended to: {final_output_path}")
+        df_cleaned_final = pd.concat([df_previous_final, df_cleaned_final], ignore_index=True)
+    else:
+        df_cleaned_final.to_csv(final_output_path, index=False, sep=CSV_DELIMITER) # Save to CSV (without the index column)
+        print(f"File saved successfully at: {final_output_path}")
+
+    # Arrow copy for the analysis stages (memory-mapped instead of parsing the CSV again); written after the CSV,
+    # so it counts as up to date. Without pyarrow the stages read the CSV.
+    if PYARROW_AVAILABLE:
+        try:
+            arrow_path = write_arrow_table(df_cleaned_final, arrow_sidecar_path(final_output_path))
+            print(f"Arrow hand-off file saved at: {arrow_path}")
+        except Exception as e:
+            print(f"WARNING: Arrow hand-off file could not be written, later stages will read the CSV: {e}")
+
+    # Remember how far the outputs go (only once both CSVs are written)
+    try:
+        write_cleaning_state(intermediate_output_path, final_output_path, rules_hash, max_job_index)
+    except Exception as e:
+        print(f"WARNING: Cleaning state could not be saved, the next incremental run will rebuild: {e}")
+    print_peak_memory()
 
     return df_cleaned_final
 
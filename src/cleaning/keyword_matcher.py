@@ -0,0 +1,104 @@
+# ==========================================================
+# Multi-Keyword Matcher for the Exclusion Filter
+# ==========================================================
+# Goal:
+#   Find exclusion keywords in the job texts with one matcher built once
+#   per keyword list, whose cost per text position depends on the keyword
+#   length and not on the number of keywords.
+# Key Functionality:
+#   - The keywords are merged into a prefix tree and compiled into one regex
+#     (shared prefixes are tested once); the lowercased text is scanned in C.
+#   - Word boundaries: r'\bRecht\b' only matches the whole word 'Recht';
+#     escaped characters (e.g. 'PH\.D') are matched literally.
+#   - Returns the keyword that fired first, so the filter can report
+#     exclusion counts per keyword.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+import re
+import pandas as pd
+
+WORD_BOUNDARY = r'\b'
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def parse_keyword(keyword: str):
+    """Splits a keyword into (lowercase literal, word boundary at start, word boundary at end)."""
+    word_start = keyword.startswith(WORD_BOUNDARY)
+    word_end = keyword.endswith(WORD_BOUNDARY) and len(keyword) > len(WORD_BOUNDARY)
+    literal = keyword[len(WORD_BOUNDARY) if word_start else 0:len(keyword) - len(WORD_BOUNDARY) if word_end else None]
+    # Remaining backslash escapes ('PH\.D') stand for the character itself
+    literal = re.sub(r'\\(.)', r'\1', literal)
+    return literal.lower(), word_start, word_end
+
+
+# Prefix tree node: {char: child node, ...}; the key None marks the end of a keyword
+# and holds whether a word boundary must follow
+def _trie_to_regex(node: dict) -> str:
+    alternatives = [re.escape(char) + _trie_to_regex(child)
+                    for char, child in sorted(node.items(), key=lambda item: item[0] or "") if char is not None]
+    if None in node:
+        # Longer keywords first, the end of this one last
+        alternatives.append(WORD_BOUNDARY if node[None] else "")
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+class KeywordMatcher:
+
+    def __init__(self, keywords: list):
+        self.keywords = list(keywords)
+        self._rules = [parse_keyword(keyword) for keyword in self.keywords]
+        # Keywords that are identical after lowering share one literal
+        self._ids_by_literal = {}
+        for keyword_id, (literal, _, _) in enumerate(self._rules):
+            if literal:
+                self._ids_by_literal.setdefault(literal, []).append(keyword_id)
+
+        # Keywords with a leading word boundary go into their own tree behind a single '\b'
+        tries = {True: {}, False: {}}
+        for literal, word_start, word_end in self._rules:
+            if not literal:
+                continue
+            node = tries[word_start]
+            for char in literal:
+                node = node.setdefault(char, {})
+            # A trailing boundary is only required if every keyword ending here asks for one
+            node[None] = node.get(None, True) and word_end
+
+        alternatives = []
+        if tries[True]:
+            alternatives.append(WORD_BOUNDARY + _trie_to_regex(tries[True]))
+        if tries[False]:
+            alternatives.append(_trie_to_regex(tries[False]))
+        # Lowercasing the text once is much cheaper than a case-insensitive scan
+        self._pattern = re.compile("|".join(alternatives)) if alternatives else None
+
+    def _keyword_for(self, text: str, start: int, end: int):
+        """Maps a regex hit back to the first configured keyword whose boundary rules it satisfies."""
+        boundary_before = start == 0 or not _is_word_char(text[start - 1])
+        boundary_after = end == len(text) or not _is_word_char(text[end])
+        for keyword_id in self._ids_by_literal.get(text[start:end], []):
+            _, word_start, word_end = self._rules[keyword_id]
+            if (not word_start or boundary_before) and (not word_end or boundary_after):
+                return self.keywords[keyword_id]
+        return None
+
+    # --- MATCHING ---
+    def first_match(self, text: str):
+        """Returns the keyword (as configured) of the first occurrence in the text, or None."""
+        if not text or self._pattern is None:
+            return None
+        text = text.lower()
+        match = self._pattern.search(text)
+        return self._keyword_for(text, match.start(), match.end()) if match else None
+
+    def first_match_in_rows(self, df, columns: list) -> list:
+        """Scans all given columns of every row in one pass. Returns the fired keyword (or None) per row."""
+        # Columns are joined with a line break: no keyword spans it and it counts as a word boundary
+        rows = zip(*(df[column].tolist() for column in columns))
+        return [self.first_match("\n".join(str(value) for value in row if pd.notna(value))) for row in rows]
@@ -0,0 +1,211 @@
+# ==========================================================
+# Near-Duplicate Job Ads (MinHash + LSH)
+# ==========================================================
+# Goal:
+#   Catch the same ad posted again with a slightly changed title or by a
+#   recruiting agency, which the exact 'Title | Company' check of the
+#   scrapers lets through and which inflates the skills and tasks counts.
+# Key Functionality:
+#   - Word shingles of Tasks + Skills, MinHash signature per ad.
+#   - LSH banding: only ads sharing a band are compared, so the check grows
+#     roughly linearly with the number of ads instead of all pairs.
+#   - Candidates are confirmed with the Jaccard similarity estimated from
+#     the signatures; the ad with the lowest Job_Index is kept.
+#   - Signatures are cached per Job_Index (with a hash of the text), so
+#     incremental runs only hash the new ads.
+#   - Ads without any words in Tasks / Skills are kept and never compared.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from pathlib import Path
+import hashlib
+import os
+import re
+import zlib
+import numpy as np
+import pandas as pd
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 3
+HASH_SEED = 42
+# Largest prime below 2^32: signature values fit into uint32
+HASH_PRIME = 4294967291
+TEXT_COLUMNS = ["Tasks", "Skills"]
+REPORT_COLUMNS = ["Job_Index", "Duplicate_Of", "Similarity"]
+
+
+def near_duplicate_cache_path(final_output_path: Path) -> Path:
+    return Path(final_output_path).with_suffix(".minhash.npz")
+
+
+def near_duplicate_report_path(final_output_path: Path) -> Path:
+    final_output_path = Path(final_output_path)
+    return final_output_path.with_name(final_output_path.stem + "_near_duplicates.csv")
+
+
+def ad_text(row) -> str:
+    return " ".join(str(value) for value in row if pd.notna(value))
+
+
+def shingles_of(text: str, shingle_size: int = DEFAULT_SHINGLE_SIZE) -> set:
+    """Set of word n-grams (lowercase, punctuation ignored); short texts give one shingle."""
+    words = re.findall(r'\w+', text.lower())
+    if len(words) <= shingle_size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+
+
+def lsh_bands_for(threshold: float, num_perm: int):
+    """(bands, rows per band) with the highest S-curve midpoint (1/bands)^(1/rows) not above the threshold:
+    pairs at the threshold become candidates with good probability, the signature check drops the rest."""
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    below = [option for option in options if (1 / option[0]) ** (1 / option[1]) <= threshold]
+    return max(below, key=lambda option: (1 / option[0]) ** (1 / option[1])) if below else options[-1]
+
+
+class NearDuplicateIndex:
+
+    def __init__(self, cache_path: Path = None, threshold: float = DEFAULT_THRESHOLD,
+                 num_perm: int = DEFAULT_NUM_PERM, shingle_size: int = DEFAULT_SHINGLE_SIZE):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows_per_band = lsh_bands_for(threshold, num_perm)
+
+        # Hash functions h(x) = (a * x + b) mod p; a, b < 2^31 keeps a * x + b inside uint64
+        generator = np.random.RandomState(HASH_SEED)
+        self._a = generator.randint(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+
+        # Job_Index -> (text digest, signature); 'used' collects what this run touched and is saved
+        self._cached = self._load_cache()
+        self._used = {}
+        # One bucket dict per band: band values -> Job_Index list
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = {}
+        self.hashed = 0
+
+    # --- SIGNATURE CACHE ---
+    def _params(self) -> np.ndarray:
+        return np.array([self.num_perm, self.shingle_size, HASH_SEED], dtype=np.int64)
+
+    def _load_cache(self) -> dict:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            with np.load(self.cache_path) as cache:
+                if not np.array_equal(cache["params"], self._params()):
+                    print("Near-duplicate signature cache was built with other settings. Hashing all ads again.")
+                    return {}
+                return {int(job_index): (int(digest), signature) for job_index, digest, signature
+                        in zip(cache["job_index"], cache["digest"], cache["signatures"])}
+        except (OSError, KeyError, ValueError) as e:
+            print(f"WARNING: Near-duplicate signature cache could not be read, hashing all ads again: {e}")
+            return {}
+
+    def save(self):
+        """Writes the signatures of all ads seen in this run (atomically)."""
+        if self.cache_path is None:
+            return
+        job_indices = sorted(self._used)
+        signatures = (np.stack([self._used[job_index][1] for job_index in job_indices])
+                      if job_indices else np.empty((0, self.num_perm), dtype=np.uint32))
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        with open(tmp_path, "wb") as cache_file:
+            np.savez(cache_file, params=self._params(),
+                     job_index=np.array(job_indices, dtype=np.int64),
+                     digest=np.array([self._used[job_index][0] for job_index in job_indices], dtype=np.uint64),
+                     signatures=signatures)
+        os.replace(tmp_path, self.cache_path)
+
+    # --- MINHASH ---
+    def minhash(self, text: str):
+        """MinHash signature of the text, or None if it has no words (nothing to compare)."""
+        shingles = shingles_of(text, self.shingle_size)
+        if not shingles:
+            return None
+        values = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        hashed = (np.outer(values, self._a) + self._b) % np.uint64(HASH_PRIME)
+        return hashed.min(axis=0).astype(np.uint32)
+
+    def signature_of(self, job_index: int, text: str):
+        """Signature from the cache if the text is unchanged, else newly computed; None for an empty ad."""
+        digest = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+        cached = self._cached.get(job_index)
+        if cached is not None and cached[0] == digest:
+            signature = cached[1]
+        else:
+            signature = self.minhash(text)
+            self.hashed += 1
+        if signature is not None:
+            self._used[job_index] = (digest, signature)
+        return signature
+
+    # --- LSH INDEX ---
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes()
+
+    def _add(self, job_index: int, signature: np.ndarray):
+        self._signatures[job_index] = signature
+        for band, key in self._band_keys(signature):
+            self._buckets[band].setdefault(key, []).append(job_index)
+
+    def _best_match(self, signature: np.ndarray):
+        """Most similar indexed ad with estimated Jaccard >= threshold, as (Job_Index, similarity), or None."""
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        best = None
+        for candidate in candidates:
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity >= self.threshold and (best is None or (similarity, -candidate) > (best[1], -best[0])):
+                best = (candidate, similarity)
+        return best
+
+    def add_rows(self, df: pd.DataFrame):
+        """Indexes ads that are already kept (e.g. the previous cleaned output of an incremental run)."""
+        for job_index, *texts in df[["Job_Index"] + TEXT_COLUMNS].itertuples(index=False):
+            signature = self.signature_of(int(job_index), ad_text(texts))
+            if signature is not None:
+                self._add(int(job_index), signature)
+
+    def remove_duplicates(self, df: pd.DataFrame):
+        """Drops ads that are near-duplicates of an indexed or earlier ad (lowest Job_Index wins).
+        Returns (kept DataFrame, report DataFrame with Job_Index, Duplicate_Of, Similarity)."""
+        report = []
+        # Earlier ads are indexed first, so the repost is the one dropped
+        for job_index, *texts in df.sort_values("Job_Index")[["Job_Index"] + TEXT_COLUMNS].itertuples(index=False):
+            signature = self.signature_of(int(job_index), ad_text(texts))
+            # Empty ads all share one signature; they are kept as they are
+            if signature is None:
+                continue
+            match = self._best_match(signature)
+            if match is None:
+                self._add(int(job_index), signature)
+            else:
+                report.append((int(job_index), match[0], round(match[1], 3)))
+
+        df_report = pd.DataFrame(report, columns=REPORT_COLUMNS)
+        return df[~df["Job_Index"].isin(df_report["Job_Index"])], df_report
+
+    def print_summary(self, rows_before: int, df_report: pd.DataFrame):
+        print("-" * 30)
+        print("--- Near-Duplicate Filter ---")
+        print(f"Jaccard threshold: {self.threshold} (MinHash {self.num_perm}, LSH {self.bands} bands x {self.rows_per_band} rows)")
+        print(f"Signatures computed: {self.hashed} (others from the cache)")
+        print(f"Total rows before filter: {rows_before}")
+        print(f"Rows excluded as near-duplicates: {len(df_report)}")
+        print(f"Total rows after filter: {rows_before - len(df_report)}")
+        print("-" * 30)
+
+
+# Pairs found (Job_Index, Duplicate_Of, Similarity) next to the cleaned CSV; incremental runs append
+def write_near_duplicate_report(df_report: pd.DataFrame, final_output_path: Path, append: bool = False):
+    report_path = near_duplicate_report_path(final_output_path)
+    append = append and report_path.exists()
+    df_report.to_csv(report_path, sep=';', index=False, mode="a" if append else "w", header=not append)
+    return report_path
@@ -16,6 +16,15 @@
 #   9. Visualize required job tasks (Bar Chart).
 # Execution:
 #   Runs interactively, prompting the user for scrape parameters.
+#   Optional: --workers N scrapes with N browsers in parallel.
+#   Optional: --fetch-mode http|async reads the ad details over HTTP instead of Chrome.
+#   Optional: --browser-profile performance runs Chrome headless without images, fonts and trackers.
+#   Batch:    --terms "Data Scientist" "ML Engineer" or --terms-file titles.txt (with --max-jobs N)
+#             scrapes all titles, merges once and runs steps 3-9 once.
+#   Optional: --incremental reads the newest ads first and stops at the last run's watermark.
+#   Optional: --no-html-cache skips storing the raw ad HTML (used by src.scraping.reparse).
+#   Optional: --parquet-store also keeps the master as Parquet segments and cleans from there.
+#   Optional: --sqlite-master uses the SQLite job store instead of the master CSV (imported on first use).
 # Author: Stefan Dreyfus
 # ==========================================================
 
@@ -23,13 +32,14 @@
 import sys
 from pathlib import Path
 import os
-import re
+import argparse
 
 # Import Modules
 import src.scraping as scraping
 import src.cleaning as cleaning
 import src.analysis as analysis
 import src.visualization as vis
+import src.storage as storage
 
 # Definition the Project Root and Standard Paths
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -48,52 +58,103 @@ os.makedirs(REPORT_DIR, exist_ok=True)
 os.makedirs(ANALYSIS_DATA_DIR, exist_ok=True)
 os.makedirs(DATA_VIS_DIR, exist_ok=True)
 
+# Master file shared by all search terms
+MASTER_FILE_PATH = RAW_DATA_DIR / "jobs_ch_skills_all.csv"
 
-def run_full_data_pipeline(search_term: str, max_jobs: int, delete_session: bool):
-    # Clean the search term to create robust file names
-    safe_job_name = re.sub(r'\s+', '_', search_term.strip().lower())
-    safe_job_name = re.sub(r'[^a-z0-9_]', '', safe_job_name)
+# Alternative master: SQLite job store with upsert on a stable ad ID (see src.storage.sqlite_store)
+MASTER_DB_PATH = RAW_DATA_DIR / "jobs_ch_skills_all.sqlite"
 
-    # Define the specific file paths for the current session
-    SESSION_FILE_PATH = RAW_DATA_DIR / f"jobs_ch_{safe_job_name}_skills.csv"
-    MASTER_FILE_PATH = RAW_DATA_DIR / "jobs_ch_skills_all.csv"
-    INTERMEDIATE_CLEANED_PATH = PROCESSED_DATA_DIR / "jobs_ch_skills_all_intermediate.csv"
-    FINAL_CLEANED_PATH = PROCESSED_DATA_DIR / "jobs_ch_skills_all_cleaned_final_V1.csv"
-    CLUSTERS_CSV_PATH = ANALYSIS_DATA_DIR / "jobs_ch_semantic_clusters_labeled.csv"
-    CLUSTERS_PLOT_PATH = REPORT_DIR / "figures" / "cluster_plot.png"
-    JOB_COUNTS_PER_LOCATION_PATH = ANALYSIS_DATA_DIR / "jobs_ch_location_counts.csv"
-    JOB_COUNTS_PER_CANTON_PATH = DATA_VIS_DIR / "Job_per_canton.csv"
-    CANTON_MAP_OUTPUT_PATH = REPORT_DIR / "figures" / "jobs_maps_switzerland.png"
-    SINGLE_SKILL_CSV_PATH = ANALYSIS_DATA_DIR / "jobs_ch_single_skills_analysis.csv"
-    SINGLE_SKILL_PLOT_PATH = REPORT_DIR / "figures" / "required_single_skills.png"
-    TASKS_OVERVIEW_CSV_PATH = ANALYSIS_DATA_DIR / "jobs_ch_tasks_overview.csv"
-    TASKS_OVERVIEW_PLOT_PATH = REPORT_DIR / "figures" / "required_tasks_overview.png"
-    # ------------------------------------------
+# Columnar copy of the master file (one Parquet segment per merge, see src.storage.parquet_store)
+MASTER_STORE_DIR = RAW_DATA_DIR / "jobs_ch_skills_all_parquet"
 
+# Raw HTML of every scraped ad, for offline re-parsing (python -m src.scraping.reparse)
+HTML_CACHE_DIR = RAW_DATA_DIR / "html_cache"
 
-    # INPUT PATH for Skills Analysis
-    SKILLS_INPUT_PATH = FINAL_CLEANED_PATH
 
-    # INPUT PATH for Tasks Analysis
-    TASKS_INPUT_PATH = FINAL_CLEANED_PATH
+# Input of the cleaning stage: the Parquet store once it exists, otherwise the master CSV
+def master_input_path_for(parquet_store: bool) -> Path:
+    if parquet_store and storage.is_parquet_store(MASTER_STORE_DIR):
+        return MASTER_STORE_DIR
+    return MASTER_FILE_PATH
+
+
+# First run with --sqlite-master: take over the existing master CSV (Job_Index values are kept)
+def prepare_sqlite_master(master_csv_path: Path, master_db_path: Path):
+    if master_db_path.exists() or not master_csv_path.exists():
+        return
+    print(f"Creating SQLite job store {master_db_path.name} from {master_csv_path.name}...")
+    with storage.SqliteJobStore(master_db_path) as store:
+        inserted, updated = store.import_csv(master_csv_path)
+    print(f"Imported {inserted} ads ({updated} duplicates merged).")
+
+
+# Session file of one search term (e.g., 'Data Scientist' -> jobs_ch_data_scientist_skills.csv)
+def session_file_path_for(search_term: str) -> Path:
+    return RAW_DATA_DIR / scraping.session_file_name(search_term)
+
+
+def run_full_data_pipeline(search_term: str, max_jobs: int, delete_session: bool, workers: int = 1,
+                           fetch_mode: str = "selenium", browser_profile: str = "default",
+                           incremental: bool = False, use_html_cache: bool = True, parquet_store: bool = False,
+                           incremental_clean: bool = False, clean_chunk_size: int = None,
+                           near_duplicate_threshold: float = None):
+    # Define the specific file paths for the current session
+    SESSION_FILE_PATH = session_file_path_for(search_term)
 
     print(f"--- Starting Full Data Pipeline for '{search_term}' (Max: {max_jobs}) ---")
 
     # --- SCRAPING ---
+    html_cache = scraping.HtmlCache(HTML_CACHE_DIR) if use_html_cache else None
     try:
         print("\n[1/9] Running Scraper")
 
         # Call the refactored function, passing all required paths/values
-        jobs_scraped = scraping.scrape_jobs(
-            job_search_term=search_term,
-            max_jobs_to_scrape=max_jobs,
-            save_file_path=SESSION_FILE_PATH,
-            master_file_path=MASTER_FILE_PATH
-        )
+        if fetch_mode == "http":
+            jobs_scraped = scraping.scrape_jobs_http(
+                job_search_term=search_term,
+                max_jobs_to_scrape=max_jobs,
+                save_file_path=SESSION_FILE_PATH,
+                master_file_path=MASTER_FILE_PATH,
+                browser_profile=browser_profile,
+                incremental=incremental,
+                html_cache=html_cache
+            )
+        elif fetch_mode == "async":
+            jobs_scraped = scraping.scrape_jobs_async(
+                job_search_term=search_term,
+                max_jobs_to_scrape=max_jobs,
+                save_file_path=SESSION_FILE_PATH,
+                master_file_path=MASTER_FILE_PATH,
+                browser_profile=browser_profile,
+                incremental=incremental,
+                html_cache=html_cache
+            )
+        elif workers > 1:
+            jobs_scraped = scraping.scrape_jobs_parallel(
+                job_search_term=search_term,
+                max_jobs_to_scrape=max_jobs,
+                save_file_path=SESSION_FILE_PATH,
+                master_file_path=MASTER_FILE_PATH,
+                workers=workers,
+                browser_profile=browser_profile,
+                html_cache=html_cache
+            )
+        else:
+            jobs_scraped = scraping.scrape_jobs(
+                job_search_term=search_term,
+                max_jobs_to_scrape=max_jobs,
+                save_file_path=SESSION_FILE_PATH,
+                master_file_path=MASTER_FILE_PATH,
+                browser_profile=browser_profile,
+                incremental=incremental,
+                html_cache=html_cache
+            )
         print(f"Scraping completed. Found {len(jobs_scraped)} new records.")
     except Exception as e:
         print(f"SCRAPING FAILED: {e}");
         sys.exit(1)
+    finally:
+        if html_cache: html_cache.close()
 
     # --- MERGING ---
     try:
@@ -101,8 +162,61 @@ def run_full_data_pipeline(search_term: str, max_jobs: int, delete_session: bool
         success = scraping.merge_session_to_master(
             session_file_path=SESSION_FILE_PATH,
             master_file_path=MASTER_FILE_PATH,
-            delete_session=delete_session
+            delete_session=delete_session,
+            parquet_store_dir=MASTER_STORE_DIR if parquet_store else None
+        )
+        if success:
+            print("Merging completed successfully.")
+        else:
+            print("Merging step skipped or failed. Continuing pipeline...")
+
+    except Exception as e:
+        print(f"MERGING FAILED: {e}");
+        sys.exit(1)
+
+    run_downstream_stages(master_input_path_for(parquet_store), incremental_clean=incremental_clean,
+                          clean_chunk_size=clean_chunk_size, near_duplicate_threshold=near_duplicate_threshold)
+
+
+def run_batch_data_pipeline(search_terms: list, max_jobs_per_term: int, delete_session: bool,
+                            fetch_mode: str = "selenium", browser_profile: str = "default",
+                            incremental: bool = False, use_html_cache: bool = True, parquet_store: bool = False,
+                            incremental_clean: bool = False, clean_chunk_size: int = None,
+                            near_duplicate_threshold: float = None):
+    print(f"--- Starting Batch Data Pipeline for {len(search_terms)} search terms (Max per term: {max_jobs_per_term}) ---")
+
+    # --- SCRAPING ---
+    html_cache = scraping.HtmlCache(HTML_CACHE_DIR) if use_html_cache else None
+    try:
+        print("\n[1/9] Running Batch Scraper")
+        session_file_paths = scraping.scrape_jobs_batch(
+            search_terms=search_terms,
+            max_jobs_per_term=max_jobs_per_term,
+            raw_data_dir=RAW_DATA_DIR,
+            master_file_path=MASTER_FILE_PATH,
+            fetch_mode=fetch_mode,
+            browser_profile=browser_profile,
+            incremental=incremental,
+            html_cache=html_cache
         )
+        print(f"Batch scraping completed. {len(session_file_paths)} session files with data.")
+    except Exception as e:
+        print(f"SCRAPING FAILED: {e}");
+        sys.exit(1)
+    finally:
+        if html_cache: html_cache.close()
+
+    # --- MERGING (once for all terms) ---
+    try:
+        print("\n[2/9] Merging Data")
+        success = False
+        if session_file_paths:
+            success = scraping.merge_sessions_to_master(
+                session_file_paths=session_file_paths,
+                master_file_path=MASTER_FILE_PATH,
+                delete_session=delete_session,
+                parquet_store_dir=MASTER_STORE_DIR if parquet_store else None
+            )
         if success:
             print("Merging completed successfully.")
         else:
@@ -112,15 +226,47 @@ def run_full_data_pipeline(search_term: str, max_jobs: int, delete_session: bool
         print(f"MERGING FAILED: {e}");
         sys.exit(1)
 
+    run_downstream_stages(master_input_path_for(parquet_store), incremental_clean=incremental_clean,
+                          clean_chunk_size=clean_chunk_size, near_duplicate_threshold=near_duplicate_threshold)
+
+
+# Steps 3-9: cleaning, analysis and visualization of the master file.
+# Runs once per pipeline call, also when a batch scraped many search terms.
+def run_downstream_stages(master_input_path: Path = MASTER_FILE_PATH, incremental_clean: bool = False,
+                          clean_chunk_size: int = None, near_duplicate_threshold: float = None):
+    INTERMEDIATE_CLEANED_PATH = PROCESSED_DATA_DIR / "jobs_ch_skills_all_intermediate.csv"
+    FINAL_CLEANED_PATH = PROCESSED_DATA_DIR / "jobs_ch_skills_all_cleaned_final_V1.csv"
+    CLUSTERS_CSV_PATH = ANALYSIS_DATA_DIR / "jobs_ch_semantic_clusters_labeled.csv"
+    CLUSTERS_PLOT_PATH = REPORT_DIR / "figures" / "cluster_plot.png"
+    JOB_COUNTS_PER_LOCATION_PATH = ANALYSIS_DATA_DIR / "jobs_ch_location_counts.csv"
+    JOB_COUNTS_PER_CANTON_PATH = DATA_VIS_DIR / "Job_per_canton.csv"
+    CANTON_MAP_OUTPUT_PATH = REPORT_DIR / "figures" / "jobs_maps_switzerland.png"
+    SINGLE_SKILL_CSV_PATH = ANALYSIS_DATA_DIR / "jobs_ch_single_skills_analysis.csv"
+    SINGLE_SKILL_PLOT_PATH = REPORT_DIR / "figures" / "required_single_skills.png"
+    TASKS_OVERVIEW_CSV_PATH = ANALYSIS_DATA_DIR / "jobs_ch_tasks_overview.csv"
+    TASKS_OVERVIEW_PLOT_PATH = REPORT_DIR / "figures" / "required_tasks_overview.png"
+    # ------------------------------------------
+
+
+    # INPUT PATH for Skills Analysis
+    SKILLS_INPUT_PATH = FINAL_CLEANED_PATH
+
+    # INPUT PATH for Tasks Analysis
+    TASKS_INPUT_PATH = FINAL_CLEANED_PATH
+
+
     # --- CLEANING ---
-    if os.path.exists(MASTER_FILE_PATH):
+    if os.path.exists(master_input_path):
         try:
             print("\n[3/9] Cleaning Data")
 
             cleaned_df = cleaning.run_data_cleaning(
-                input_file_path=MASTER_FILE_PATH,
+                input_file_path=master_input_path,
                 intermediate_output_path=INTERMEDIATE_CLEANED_PATH,
-                final_output_path=FINAL_CLEANED_PATH
+                final_output_path=FINAL_CLEANED_PATH,
+                incremental=incremental_clean,
+                chunk_size=clean_chunk_size,
+                near_duplicate_threshold=near_duplicate_threshold
             )
 
             if cleaned_df is not None:
@@ -282,25 +428,106 @@ def run_full_data_pipeline(search_term: str, max_jobs: int, delete_session: bool
             f"\n[9/9] Tasks Overview Visualization skipped: Input file not found at {TASKS_OVERVIEW_CSV_PATH}. Exiting.")
         sys.exit(1)
 
-# --- FINAL STATUS ---
+    # --- FINAL STATUS ---
     print("\n--- Pipeline Execution Complete! (All 9 steps successfully executed) --- ")
 
+
 if __name__ == "__main__":
 
+    # --- Command Line Options ---
+    parser = argparse.ArgumentParser(description="Run the jobs.ch data pipeline.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of parallel browsers used for scraping (default: 1).")
+    parser.add_argument("--fetch-mode", choices=["selenium", "http", "async"], default="selenium",
+                        help="How job ad details are fetched: full browser, pooled HTTP or asyncio (default: selenium).")
+    parser.add_argument("--browser-profile", choices=list(scraping.BROWSER_PROFILES), default="default",
+                        help="Chrome profile: full browser or headless 'performance' profile (default: default).")
+    parser.add_argument("--terms", nargs="+", default=None,
+                        help="Batch mode: several job titles, scraped back-to-back and merged once.")
+    parser.add_argument("--terms-file", type=Path, default=None,
+                        help="Batch mode: text file with one job title per line.")
+    parser.add_argument("--max-jobs", type=int, default=None,
+                        help="Maximum number of jobs (per term in batch mode). Asked interactively if omitted.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Read the newest ads first and stop after a run of already known ads (daily refresh).")
+    parser.add_argument("--no-html-cache", action="store_true",
+                        help="Do not keep the raw HTML of the scraped ads in data/raw/html_cache.")
+    parser.add_argument("--parquet-store", action="store_true",
+                        help="Also write each merge as a Parquet segment and clean from the Parquet store (needs pyarrow).")
+    parser.add_argument("--sqlite-master", action="store_true",
+                        help="Keep the master data in data/raw/jobs_ch_skills_all.sqlite instead of the CSV.")
+    parser.add_argument("--incremental-clean", action="store_true",
+                        help="Only clean the rows added since the last run (full rebuild when the cleaning rules change).")
+    parser.add_argument("--clean-chunk-size", type=int, default=None,
+                        help="Clean the master in chunks of this many rows to bound memory (default: all at once).")
+    parser.add_argument("--near-duplicates", type=float, nargs="?", const=0.8, default=None, metavar="THRESHOLD",
+                        help="Drop reposted ads whose Tasks + Skills have a Jaccard similarity >= THRESHOLD (default: 0.8).")
+    parser.add_argument("--delete-session", action="store_true",
+                        help="Delete the session CSV files after a successful merge (batch mode).")
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be a positive number.")
+    if args.max_jobs is not None and args.max_jobs <= 0:
+        parser.error("--max-jobs must be a positive number.")
+    if args.incremental and args.workers > 1 and args.fetch_mode == "selenium":
+        parser.error("--incremental needs a single browser (--workers 1) or --fetch-mode http|async.")
+    if args.clean_chunk_size is not None and args.clean_chunk_size <= 0:
+        parser.error("--clean-chunk-size must be a positive number.")
+    if args.near_duplicates is not None and not 0 < args.near_duplicates <= 1:
+        parser.error("--near-duplicates needs a threshold between 0 and 1.")
+    if args.parquet_store and not storage.PYARROW_AVAILABLE:
+        parser.error("--parquet-store needs pyarrow (pip install pyarrow).")
+    if args.parquet_store and args.sqlite_master:
+        parser.error("--parquet-store copies the master CSV and cannot be combined with --sqlite-master.")
+
+    # The job store replaces the master CSV for scraping (duplicate checks), merging and cleaning
+    if args.sqlite_master:
+        prepare_sqlite_master(MASTER_FILE_PATH, MASTER_DB_PATH)
+        MASTER_FILE_PATH = MASTER_DB_PATH
+
+    # --- Batch Mode (non-interactive apart from a missing --max-jobs) ---
+    batch_terms = list(args.terms or [])
+    if args.terms_file:
+        batch_terms += [term for term in scraping.read_search_terms(args.terms_file) if term not in batch_terms]
+
+    if batch_terms:
+        if args.workers > 1:
+            print("Note: --workers is ignored in batch mode (terms run back-to-back on one browser).")
+        MAX_JOBS = args.max_jobs
+        while MAX_JOBS is None:
+            try:
+                MAX_JOBS = int(input("Enter the maximum number of jobs to scrape per term (e.g., 50): "))
+                if MAX_JOBS <= 0:
+                    print("Please enter a positive number.")
+                    MAX_JOBS = None
+            except ValueError:
+                print("Invalid input. Please enter a whole number.")
+
+        run_batch_data_pipeline(batch_terms, MAX_JOBS, args.delete_session,
+                                fetch_mode=args.fetch_mode, browser_profile=args.browser_profile,
+                                incremental=args.incremental, use_html_cache=not args.no_html_cache,
+                                parquet_store=args.parquet_store, incremental_clean=args.incremental_clean,
+                                clean_chunk_size=args.clean_chunk_size,
+                                near_duplicate_threshold=args.near_duplicates)
+        sys.exit(0)
+
     # --- User Input Scraping ---
+    if args.workers > 1 and args.fetch_mode != "selenium":
+        print(f"Note: --workers is ignored with --fetch-mode {args.fetch_mode} (it sets its own concurrency).")
 
     # Ask for the job search term
     job_search_term = input("Enter the job title you want to scrape (e.g., Data Scientist): ")
 
-    # Ask for the maximum number of jobs to scrape
-    while True:
+    # Ask for the maximum number of jobs to scrape (unless given with --max-jobs)
+    MAX_JOBS = args.max_jobs
+    while MAX_JOBS is None:
         try:
             max_jobs_input = input("Enter the maximum number of jobs to scrape (e.g., 50): ")
             MAX_JOBS = int(max_jobs_input)
             if MAX_JOBS <= 0:
                 print("Please enter a positive number.")
-                continue
-            break
+                MAX_JOBS = None
         except ValueError:
             print("Invalid input. Please enter a whole number.")
 
@@ -312,4 +539,9 @@ if __name__ == "__main__":
 
 
     # Call the pipeline runner function with the collected user input
-    run_full_data_pipeline(job_search_term, MAX_JOBS, SHOULD_DELETE_SESSION)
\ No newline at end of file
+    run_full_data_pipeline(job_search_term, MAX_JOBS, SHOULD_DELETE_SESSION, workers=args.workers,
+                           fetch_mode=args.fetch_mode, browser_profile=args.browser_profile,
+                           incremental=args.incremental, use_html_cache=not args.no_html_cache,
+                           parquet_store=args.parquet_store, incremental_clean=args.incremental_clean,
+                           clean_chunk_size=args.clean_chunk_size,
+                           near_duplicate_threshold=args.near_duplicates)
\ No newline at end of file
@@ -1,3 +1,12 @@
 from .jobs_scraping import scrape_jobs
+from .jobs_worker_pool import scrape_jobs_parallel
+from .jobs_http_fetcher import scrape_jobs_http
+from .jobs_async_fetcher import scrape_jobs_async
+from .jobs_batch import scrape_jobs_batch, read_search_terms, session_file_name
+from .scrape_timing import LatencyProfile
+from .concurrency_controller import AdaptiveConcurrency
+from .html_cache import HtmlCache
+from .reparse import reparse_cache
+from .jobs_ch_base import BROWSER_PROFILES, driver_session, resolve_chromedriver_path
 
-from .csv_merging import merge_session_to_master
\ No newline at end of file
+from .csv_merging import merge_session_to_master, merge_sessions_to_master
\ No newline at end of file
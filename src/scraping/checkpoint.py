@@ -0,0 +1,87 @@
+# ==========================================================
+# Page-Cursor Checkpoint for Resumable Scrapes
+# ==========================================================
+# Goal:
+#   Let a crashed long scrape continue at the result page it stopped at,
+#   instead of re-walking every page and card from page 1.
+# Key Functionality:
+#   - Small JSON file next to the session CSV ('<session>.csv.checkpoint.json')
+#     with search term, result page, position within the page and a timestamp.
+#   - Saved after every flushed batch of the session writer and on every page change.
+#   - Read by scrape_jobs on start: same search term -> jump to the page via its URL.
+#   - Removed when a scrape finishes normally.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import os
+import re
+import threading
+
+
+def checkpoint_path_for(save_file_path: Path) -> Path:
+    return save_file_path.with_name(save_file_path.name + ".checkpoint.json")
+
+
+class ScrapeCheckpoint:
+
+    def __init__(self, save_file_path: Path, job_search_term: str):
+        self.path = checkpoint_path_for(Path(save_file_path))
+        self.job_search_term = job_search_term
+        self.page = 1
+        self.card_index = 0
+        # save() also runs on the session writer's timer thread
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(job_search_term: str) -> str:
+        return re.sub(r'\s+', ' ', job_search_term.strip().lower())
+
+    def load(self) -> bool:
+        """Reads an earlier checkpoint of the same search term. Returns True if there is a page to resume at."""
+        if not self.path.exists():
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as checkpoint_file:
+                state = json.load(checkpoint_file)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"WARNING: Ignoring unreadable checkpoint {self.path.name}. Error: {e}")
+            return False
+
+        if self._normalize(state.get("search_term", "")) != self._normalize(self.job_search_term):
+            print(f"WARNING: Checkpoint {self.path.name} belongs to '{state.get('search_term')}'. Ignoring it.")
+            return False
+
+        self.page = max(1, int(state.get("page", 1)))
+        self.card_index = max(0, int(state.get("card_index", 0)))
+        print(f"Checkpoint found (saved {state.get('updated_at')}): resuming at page {self.page}, card {self.card_index + 1}.")
+        return self.page > 1 or self.card_index > 0
+
+    def mark(self, page: int, card_index: int):
+        """Moves the cursor in memory: 'card_index' is the next card to look at on 'page'."""
+        with self._lock:
+            self.page = page
+            self.card_index = card_index
+
+    def save(self, *_):
+        # Accepts and ignores the arguments of the SessionWriter flush callback
+        with self._lock:
+            state = {"search_term": self.job_search_term,
+                     "page": self.page,
+                     "card_index": self.card_index,
+                     "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as checkpoint_file:
+                    json.dump(state, checkpoint_file)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"WARNING: Could not save checkpoint {self.path.name}. Error: {e}")
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
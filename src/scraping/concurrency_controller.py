@@ -0,0 +1,133 @@
+# ==========================================================
+# Adaptive Concurrency Controller (AIMD)
+# ==========================================================
+# Goal:
+#   Choose the number of in-flight job ad fetches automatically instead of
+#   a fixed pool size that either leaves bandwidth unused or trips the
+#   throttling of jobs.ch.
+# Key Functionality:
+#   - Additive increase / multiplicative decrease: after every round of
+#     'limit' finished fetches the limit grows by one, unless the round
+#     had errors / timeouts or its median latency rose clearly above the
+#     best median seen so far; then the limit is cut in half.
+#   - Gate for worker threads (slot) and a non-blocking try_acquire for asyncio.
+#   - Keeps the limit over time for the run summary.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from contextlib import contextmanager
+import math
+import threading
+import time
+from .scrape_timing import percentile
+
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_MAX_CONCURRENCY = 16
+# Round is "slow" if its median latency is this many times the best median so far
+LATENCY_TOLERANCE = 2.0
+# A round with more failed fetches than this share counts as throttled
+MAX_ERROR_RATE = 0.1
+DECREASE_FACTOR = 0.5
+MAX_SUMMARY_LINES = 15
+
+
+class AdaptiveConcurrency:
+
+    def __init__(self, initial: int, min_limit: int = DEFAULT_MIN_CONCURRENCY,
+                 max_limit: int = DEFAULT_MAX_CONCURRENCY):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, initial))
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._round_latencies = []
+        self._round_errors = 0
+        self._best_median = None
+        # Fetches started before the last decrease; their outcome says nothing about the new limit
+        self._ignore_results = 0
+        self._start = time.monotonic()
+        # (seconds since start, limit, reason) for every change of the limit
+        self.history = [(0.0, self.limit, "start")]
+
+    # --- GATE ---
+    def try_acquire(self) -> bool:
+        """Takes a fetch slot if fewer than 'limit' fetches are in flight."""
+        with self._condition:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, seconds: float, ok: bool = True):
+        """Gives the slot back and feeds the outcome of the fetch into the controller."""
+        with self._condition:
+            self._in_flight -= 1
+            self._record_locked(seconds, ok)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Blocking gate for threads. Yields a dict; set outcome['ok'] = False for a failed or timed-out fetch."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        outcome = {"ok": True}
+        start = time.perf_counter()
+        try:
+            yield outcome
+        except Exception:
+            outcome["ok"] = False
+            raise
+        finally:
+            self.release(time.perf_counter() - start, outcome["ok"])
+
+    # --- AIMD ---
+    def _record_locked(self, seconds: float, ok: bool):
+        if self._ignore_results > 0:
+            self._ignore_results -= 1
+            return
+        self._round_latencies.append(seconds)
+        if not ok:
+            self._round_errors += 1
+        if len(self._round_latencies) < self.limit:
+            return
+
+        round_median = percentile(sorted(self._round_latencies), 50)
+        error_rate = self._round_errors / len(self._round_latencies)
+        self._round_latencies = []
+        self._round_errors = 0
+
+        if error_rate > MAX_ERROR_RATE:
+            self._set_limit_locked(int(self.limit * DECREASE_FACTOR), f"errors {error_rate:.0%}")
+        elif self._best_median is not None and round_median > self._best_median * LATENCY_TOLERANCE:
+            self._set_limit_locked(int(self.limit * DECREASE_FACTOR),
+                                   f"p50 {round_median * 1000:.0f} ms vs. {self._best_median * 1000:.0f} ms")
+        else:
+            self._set_limit_locked(self.limit + 1, "healthy round")
+
+        if error_rate <= MAX_ERROR_RATE:
+            self._best_median = round_median if self._best_median is None else min(self._best_median, round_median)
+
+    def _set_limit_locked(self, new_limit: int, reason: str):
+        new_limit = min(self.max_limit, max(self.min_limit, new_limit))
+        if new_limit < self.limit:
+            self._ignore_results = self._in_flight
+        if new_limit != self.limit:
+            self.limit = new_limit
+            self.history.append((time.monotonic() - self._start, new_limit, reason))
+
+    # --- REPORTING ---
+    def print_summary(self, title: str = "Adaptive Concurrency"):
+        limits = [limit for _, limit, _ in self.history]
+        print("-" * 50)
+        print(f"--- {title} ---")
+        print(f"Start: {limits[0]} | Min: {min(limits)} | Max: {max(limits)} | Final: {self.limit} "
+              f"(bounds {self.min_limit}-{self.max_limit}, {len(self.history) - 1} change(s))")
+        # Long runs: every n-th change plus the last one
+        changes = self.history[1:]
+        step = max(1, math.ceil(len(changes) / MAX_SUMMARY_LINES))
+        shown = changes[::step] + ([changes[-1]] if changes and (len(changes) - 1) % step else [])
+        for seconds, limit, reason in shown:
+            print(f"  {seconds:7.1f}s -> {limit:3d} in flight ({reason})")
+        print("-" * 50)
@@ -5,9 +5,16 @@
 #   Safely append a newly scraped session CSV file to the master dataset
 #   while maintaining continuous indexing and supporting optional cleanup.
 # Key Functionality:
-#   - Calculates the next unique 'Job_Index' for seamless record addition.
+#   - Calculates the next unique 'Job_Index' for seamless record addition
+#     (read from the master manifest; full scan only if it is out of sync).
 #   - Appends all new session records to the master CSV for historical tracking.
 #   - Provides an option to delete the temporary session file post-merge.
+#   - Keeps the persistent dedup index of the master file up to date.
+#   - Holds an exclusive file lock from the index lookup to the last write, so
+#     several scrape sessions on one host can merge at the same time.
+#   - Batch mode: merges the session files of several search terms at once.
+#   - Optional: writes the merged rows as a Parquet segment (src.storage.parquet_store).
+#   - A master path ending in .sqlite upserts into the SQLite job store instead of the CSV.
 # Author: Stefan Dreyfus
 # ==========================================================
 
@@ -16,27 +23,36 @@ import pandas as pd
 from pathlib import Path
 import re
 import os
+from .dedup_index import update_dedup_index_after_merge
+from .master_lock import master_lock
+from src.storage.parquet_store import append_to_parquet_store
+from src.storage.sqlite_store import SqliteJobStore, is_sqlite_master
+from .master_manifest import read_manifest, rebuild_manifest, update_manifest_after_merge
 
 CSV_DELIMITER = ';'
 
 #Determines the next available unique Job_Index for new records
-#by finding the maximum index in the master file and adding 1.
+#from the maximum index in the master file plus 1.
+#The maximum comes from the manifest; the master file is only scanned if the manifest does not match it.
 def get_next_job_index(master_file_path: Path) -> int:
 
     next_job_index = 1
 
+    # SQLite job store: indexed MAX(Job_Index)
+    if is_sqlite_master(master_file_path):
+        with SqliteJobStore(master_file_path) as store:
+            return store.next_job_index()
+
     # Check if the master file exists and has content
     if os.path.exists(master_file_path) and os.path.getsize(master_file_path) > 0:
-        try:
-            master_df = pd.read_csv(
-                master_file_path,
-                sep=CSV_DELIMITER,
-                usecols=['Job_Index']
-            )
+        manifest = read_manifest(master_file_path)
+        if manifest is not None:
+            return manifest['max_job_index'] + 1
 
-            # Ensure the DataFrame is not empty and the column exists
-            if not master_df.empty and 'Job_Index' in master_df.columns:
-                next_job_index = int(master_df['Job_Index'].max()) + 1
+        try:
+            print(f"Manifest missing or out of sync with {master_file_path.name}. Scanning the master file once...")
+            manifest = rebuild_manifest(master_file_path)
+            next_job_index = manifest['max_job_index'] + 1
 
         except pd.errors.EmptyDataError:
             print(f"WARNING: Master file is empty or corrupted: {master_file_path}. Starting index at 1.")
@@ -45,61 +61,134 @@ def get_next_job_index(master_file_path: Path) -> int:
 
     return next_job_index
 
-def merge_session_to_master(session_file_path: Path, master_file_path: Path, delete_session: bool = False):
+
+# Appends the merged rows to the master CSV and keeps its dedup index, manifest and Parquet copy in sync.
+# Runs under the master lock.
+def _append_to_master_csv(df_session: pd.DataFrame, master_file_path: Path, source_names: str,
+                          parquet_store_dir: Path = None):
+    records_to_append = len(df_session)
+
+    # Determine the starting index for the new data
+    master_file_exists = master_file_path.exists() and master_file_path.stat().st_size > 0
+    master_size_before = master_file_path.stat().st_size if master_file_path.exists() else 0
+
+    # Determine the starting index for the new data using the helper function
+    start_index = get_next_job_index(master_file_path)
+
+    print(f"Starting index for new records will be: {start_index}")
+
+    # Recalculate the Job_Index column in the session data
+    df_session['Job_Index'] = range(start_index, start_index + records_to_append)
+
+    # Save the session data to the Master CSV in one write, flushed to disk before the lock is released
+    csv_text = df_session.to_csv(header=not master_file_exists, index=False, sep=CSV_DELIMITER)
+    with open(master_file_path, 'a', encoding='utf-8', newline='') as master_file:
+        master_file.write(csv_text)
+        master_file.flush()
+        os.fsync(master_file.fileno())
+
+    print(
+        f"{records_to_append} records from {source_names} successfully copied to '{master_file_path}'.")
+
+    # Keep the dedup index used by the scraper in sync with the master file
+    try:
+        unique_ids = (df_session['Job_Title'].astype(str).str.strip() + ' | '
+                      + df_session['Company_Name'].astype(str).str.strip())
+        indexed_ids = update_dedup_index_after_merge(master_file_path, unique_ids, master_size_before)
+        print(f"Dedup index updated. Total indexed IDs: {indexed_ids}")
+    except Exception as e:
+        print(f"WARNING: Could not update the dedup index. It will be rebuilt on the next scrape. Error: {e}")
+
+    # Keep the manifest in sync, so the next merge does not scan the master file
+    try:
+        update_manifest_after_merge(master_file_path, records_to_append,
+                                    start_index + records_to_append - 1, master_size_before)
+    except Exception as e:
+        print(f"WARNING: Could not update the master manifest. It will be rebuilt on the next merge. Error: {e}")
+
+    # Columnar copy of the master: one immutable Parquet segment per merge
+    if parquet_store_dir is not None:
+        try:
+            append_to_parquet_store(parquet_store_dir, df_session, master_file_path)
+        except Exception as e:
+            print(f"WARNING: Could not write to the Parquet store. It catches up on the next merge. Error: {e}")
+
+
+# SQLite job store as master: known ads only get a new Last_Seen, new ads the next Job_Index. Runs under the master lock.
+def _upsert_into_job_store(df_session: pd.DataFrame, master_file_path: Path, source_names: str):
+    with SqliteJobStore(master_file_path) as store:
+        inserted, updated = store.upsert(df_session)
+        total_ads = len(store)
+    print(f"{inserted} new and {updated} already known ads from {source_names} upserted into '{master_file_path}'. "
+          f"Total ads: {total_ads}")
+
+
+def merge_session_to_master(session_file_path: Path, master_file_path: Path, delete_session: bool = False,
+                            parquet_store_dir: Path = None):
+    return merge_sessions_to_master([session_file_path], master_file_path, delete_session, parquet_store_dir)
+
+
+# Batch mode: appends several session files in ONE write to the master file (one index lookup, one dedup index update)
+def merge_sessions_to_master(session_file_paths: list, master_file_path: Path, delete_session: bool = False,
+                             parquet_store_dir: Path = None):
 
     # --- CORE CONSOLIDATION LOGIC ---
     print("-" * 50)
-    print(f"Starting to consolidate data from: {session_file_path}")
+    for session_file_path in session_file_paths:
+        print(f"Starting to consolidate data from: {session_file_path}")
     print("-" * 50)
 
-    if not session_file_path.exists():
-        print(f"Error: Session file not found at path: {session_file_path}")
-        print(f"Expected location: {session_file_path.resolve()}")
+    existing_session_paths = []
+    for session_file_path in session_file_paths:
+        if session_file_path.exists():
+            existing_session_paths.append(session_file_path)
+        else:
+            print(f"Error: Session file not found at path: {session_file_path}")
+            print(f"Expected location: {session_file_path.resolve()}")
+
+    if not existing_session_paths:
         return False
 
     try:
         # Load the session data
-        df_session = pd.read_csv(session_file_path, sep=CSV_DELIMITER)
+        session_frames = [pd.read_csv(session_file_path, sep=CSV_DELIMITER)
+                          for session_file_path in existing_session_paths]
+        df_session = pd.concat(session_frames, ignore_index=True)
+
+        # The same ad can sit in two session files (e.g. one resumed from an earlier run)
+        if len(existing_session_paths) > 1:
+            df_session = df_session.drop_duplicates(subset=['Job_Title', 'Company_Name'], keep='first')
+
         records_to_append = len(df_session)
 
         if records_to_append == 0:
             print("Warning: Session file is empty. No data to consolidate.")
             return False
 
-        # Determine the starting index for the new data
-        master_file_exists = master_file_path.exists() and master_file_path.stat().st_size > 0
-
-        # Determine the starting index for the new data using the helper function
-        start_index = get_next_job_index(master_file_path)
+        source_names = ", ".join(f"'{session_file_path}'" for session_file_path in existing_session_paths)
 
-        print(f"Starting index for new records will be: {start_index}")
-
-        # Recalculate the Job_Index column in the session data
-        df_session['Job_Index'] = range(start_index, start_index + records_to_append)
-
-        # Save the session data to the Master CSV
-        df_session.to_csv(master_file_path,
-                          mode='a',
-                          header=not master_file_exists,
-                          index=False,
-                          sep=CSV_DELIMITER)
-
-        print(
-            f"{records_to_append} records from '{session_file_path}' successfully copied to '{master_file_path}'.")
+        # Only one merge at a time may read the next index and append (other sessions wait for the lock)
+        with master_lock(master_file_path) as lock_wait_seconds:
+            print(f"Master lock acquired after {lock_wait_seconds:.2f}s wait.")
+            if is_sqlite_master(master_file_path):
+                _upsert_into_job_store(df_session, master_file_path, source_names)
+            else:
+                _append_to_master_csv(df_session, master_file_path, source_names, parquet_store_dir)
 
     except Exception as e:
         print(f"A critical error occurred during consolidation: {e}")
         exit()
 
-    # --- Clean up Session File ---
-    if delete_session:
-        try:
-            os.remove(session_file_path)
-            print(f"Successfully deleted session file: '{session_file_path}'")
-        except OSError as e:
-            print(f"Error deleting file {session_file_path}: {e}")
-    else:
-        print(f"Session file '{session_file_path}' retained (delete_session=False).")
+    # --- Clean up Session Files ---
+    for session_file_path in existing_session_paths:
+        if delete_session:
+            try:
+                os.remove(session_file_path)
+                print(f"Successfully deleted session file: '{session_file_path}'")
+            except OSError as e:
+                print(f"Error deleting file {session_file_path}: {e}")
+        else:
+            print(f"Session file '{session_file_path}' retained (delete_session=False).")
 
     print("-" * 50)
     print("Consolidation script finished.")
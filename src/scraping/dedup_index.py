@@ -0,0 +1,147 @@
+# ==========================================================
+# Persistent Duplicate Index for the Master Dataset
+# ==========================================================
+# Goal:
+#   Keep scraper startup cost constant as the master CSV grows, by
+#   replacing the full pandas reload of the master file with an
+#   on-disk index of the 'Title | Company' IDs.
+# Key Functionality:
+#   - SQLite table keyed by a hash of the normalized unique ID.
+#   - Indexed membership checks for the scraper ('unique_id in index').
+#   - Updated by merge_session_to_master on every append.
+#   - Rebuilt once from the master CSV if it is missing or out of sync
+#     (detected by comparing the recorded master file size).
+#   - A SQLite job store as master (.sqlite) is its own index and is used directly.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from pathlib import Path
+import hashlib
+import sqlite3
+import threading
+import re
+import pandas as pd
+from src.storage.sqlite_store import SqliteJobStore, is_sqlite_master
+
+CSV_DELIMITER = ';'
+DEDUP_INDEX_SUFFIX = ".dedup.sqlite"
+
+
+# The index file lives next to the master CSV (e.g. jobs_ch_skills_all.dedup.sqlite)
+def dedup_index_path(master_file_path: Path) -> Path:
+    return master_file_path.with_suffix(DEDUP_INDEX_SUFFIX)
+
+
+# Case and whitespace differences should not create a new ID
+def normalize_unique_id(unique_id: str) -> str:
+    return re.sub(r'\s+', ' ', str(unique_id)).strip().lower()
+
+
+def hash_unique_id(unique_id: str) -> str:
+    return hashlib.blake2b(normalize_unique_id(unique_id).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class DedupIndex:
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        # The worker pool shares one index between threads; all access goes through the lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS dedup_ids (id_hash TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+
+    def __contains__(self, unique_id) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM dedup_ids WHERE id_hash = ?",
+                                     (hash_unique_id(unique_id),)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM dedup_ids").fetchone()[0]
+
+    def add_many(self, unique_ids):
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO dedup_ids (id_hash) VALUES (?)",
+                                   ((hash_unique_id(unique_id),) for unique_id in unique_ids))
+            self._conn.commit()
+
+    def add(self, unique_id: str):
+        self.add_many([unique_id])
+
+    # --- SYNC STATE WITH THE MASTER FILE ---
+    def get_meta(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)", (key, str(value)))
+            self._conn.commit()
+
+    def record_master_size(self, master_file_path: Path):
+        """Stores the master file size the index is in sync with."""
+        size = master_file_path.stat().st_size if master_file_path.exists() else 0
+        self.set_meta("master_size", size)
+
+    def is_in_sync(self, master_file_path: Path) -> bool:
+        size = master_file_path.stat().st_size if master_file_path.exists() else 0
+        return self.get_meta("master_size") == str(size)
+
+    def rebuild_from_csv(self, master_file_path: Path):
+        """Fills the index from all 'Title | Company' pairs of the master CSV (one-off full read)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM dedup_ids")
+            self._conn.commit()
+
+        if master_file_path.exists() and master_file_path.stat().st_size > 0:
+            df_master = pd.read_csv(master_file_path, sep=CSV_DELIMITER, usecols=["Job_Title", "Company_Name"])
+            unique_ids = (df_master["Job_Title"].astype(str).str.strip() + " | "
+                          + df_master["Company_Name"].astype(str).str.strip())
+            self.add_many(unique_ids)
+
+        self.record_master_size(master_file_path)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Adds the IDs of freshly appended records. If the index was not in sync before the append, it is rebuilt instead.
+def update_dedup_index_after_merge(master_file_path: Path, unique_ids, master_size_before: int):
+    with DedupIndex(dedup_index_path(master_file_path)) as index:
+        if index.get_meta("master_size") == str(master_size_before):
+            index.add_many(unique_ids)
+            index.record_master_size(master_file_path)
+        else:
+            index.rebuild_from_csv(master_file_path)
+        return len(index)
+
+
+# Opens the index of a master file and rebuilds it if it does not match the master anymore
+def open_dedup_index(master_file_path: Path) -> DedupIndex:
+    # The job store answers 'Title | Company' lookups from its own index
+    if is_sqlite_master(master_file_path):
+        return SqliteJobStore(master_file_path)
+
+    index = DedupIndex(dedup_index_path(master_file_path))
+
+    if not index.is_in_sync(master_file_path):
+        print(f"Dedup index out of sync with {master_file_path.name}. Rebuilding it once from the master file...")
+        try:
+            index.rebuild_from_csv(master_file_path)
+            print(f"Dedup index rebuilt with {len(index)} IDs.")
+        except Exception as e:
+            print(f"WARNING: Could not rebuild dedup index from {master_file_path}. Error: {e}")
+
+    return index
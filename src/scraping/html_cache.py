@@ -0,0 +1,198 @@
+# ==========================================================
+# Content-Addressed Raw HTML Cache
+# ==========================================================
+# Goal:
+#   Keep the raw HTML of every fetched job ad on disk, so a change of the
+#   extraction logic (TASKS_XPATH / SKILLS_XPATH, parsing) only needs an
+#   offline re-parse instead of a new scrape of jobs.ch.
+# Key Functionality:
+#   - Stores each page gzip-compressed under its SHA-256 content hash
+#     (identical pages are stored once).
+#   - SQLite index of (URL, fetch date) -> content hash plus the card data
+#     (Title, Company, Location, Search term) needed to rebuild a CSV row.
+#   - Size-based eviction: when the cache grows beyond its limit, the least
+#     recently used pages are removed until it is back at 90% of the limit.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from datetime import date
+from pathlib import Path
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_MAX_CACHE_BYTES = 1024 * 1024 * 1024  # 1 GB of compressed HTML
+EVICTION_TARGET_RATIO = 0.9
+INDEX_FILE_NAME = "index.sqlite"
+OBJECTS_DIR_NAME = "objects"
+
+
+def content_hash_of(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def blob_path(cache_dir: Path, content_hash: str) -> Path:
+    return Path(cache_dir) / OBJECTS_DIR_NAME / content_hash[:2] / f"{content_hash}.html.gz"
+
+
+# Module-level so that worker processes of the re-parse can read pages without the index connection
+def read_cached_html(cache_dir: Path, content_hash: str) -> str:
+    with gzip.open(blob_path(cache_dir, content_hash), "rt", encoding="utf-8") as blob_file:
+        return blob_file.read()
+
+
+class HtmlCache:
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        (self.cache_dir / OBJECTS_DIR_NAME).mkdir(parents=True, exist_ok=True)
+
+        # The HTTP fetcher writes from several threads; all index access goes through the lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.cache_dir / INDEX_FILE_NAME, check_same_thread=False)
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS pages (
+                                  url TEXT NOT NULL,
+                                  fetch_date TEXT NOT NULL,
+                                  content_hash TEXT NOT NULL,
+                                  fetched_at REAL NOT NULL,
+                                  metadata TEXT,
+                                  PRIMARY KEY (url, fetch_date))""")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS blobs (
+                                  content_hash TEXT PRIMARY KEY,
+                                  size INTEGER NOT NULL,
+                                  last_access REAL NOT NULL)""")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    # --- WRITE ---
+    def put(self, url: str, html: str, metadata: dict = None, fetch_date: str = None) -> str:
+        """Stores one fetched page. A page fetched again on the same day replaces the earlier entry."""
+        content_hash = content_hash_of(html)
+        fetch_date = fetch_date or date.today().isoformat()
+        now = time.time()
+        target = blob_path(self.cache_dir, content_hash)
+
+        with self._lock:
+            known_blob = self._conn.execute("SELECT 1 FROM blobs WHERE content_hash = ?",
+                                            (content_hash,)).fetchone()
+            if not known_blob or not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = target.with_name(target.name + f".{os.getpid()}.tmp")
+                with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as blob_file:
+                    blob_file.write(html)
+                os.replace(tmp_path, target)
+                size = target.stat().st_size
+                self._conn.execute("INSERT OR REPLACE INTO blobs (content_hash, size, last_access) VALUES (?, ?, ?)",
+                                   (content_hash, size, now))
+                if not known_blob:
+                    self._total_bytes += size
+            else:
+                self._conn.execute("UPDATE blobs SET last_access = ? WHERE content_hash = ?", (now, content_hash))
+
+            self._conn.execute("INSERT OR REPLACE INTO pages (url, fetch_date, content_hash, fetched_at, metadata) "
+                               "VALUES (?, ?, ?, ?, ?)",
+                               (url, fetch_date, content_hash, now, json.dumps(metadata or {}, ensure_ascii=False)))
+            self._conn.commit()
+
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked(int(self.max_bytes * EVICTION_TARGET_RATIO))
+
+        return content_hash
+
+    # --- READ ---
+    def get(self, url: str, fetch_date: str = None):
+        """Returns the cached HTML of the URL (latest fetch unless a date is given) or None."""
+        query = "SELECT content_hash FROM pages WHERE url = ?"
+        params = [url]
+        if fetch_date:
+            query += " AND fetch_date = ?"
+            params.append(fetch_date)
+        query += " ORDER BY fetch_date DESC LIMIT 1"
+
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE blobs SET last_access = ? WHERE content_hash = ?", (time.time(), row[0]))
+            self._conn.commit()
+
+        try:
+            return read_cached_html(self.cache_dir, row[0])
+        except OSError:
+            return None
+
+    def latest_entries(self, search_term: str = None) -> list:
+        """Latest cached fetch per URL in fetch order: dicts with url, fetch_date, content_hash and metadata."""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT p.url, p.fetch_date, p.content_hash, p.metadata
+                   FROM pages p
+                   JOIN (SELECT url, MAX(fetch_date) AS fetch_date FROM pages GROUP BY url) latest
+                     ON p.url = latest.url AND p.fetch_date = latest.fetch_date
+                   ORDER BY p.fetched_at""").fetchall()
+
+        entries = []
+        for url, fetch_date, content_hash, metadata in rows:
+            metadata = json.loads(metadata or "{}")
+            if search_term and metadata.get("Job_Search_Term", "").lower() != search_term.strip().lower():
+                continue
+            entries.append({"url": url, "fetch_date": fetch_date, "content_hash": content_hash, "metadata": metadata})
+        return entries
+
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    # --- EVICTION ---
+    def evict(self, target_bytes: int = None) -> int:
+        with self._lock:
+            return self._evict_locked(target_bytes if target_bytes is not None else self.max_bytes)
+
+    def _evict_locked(self, target_bytes: int) -> int:
+        """Removes least recently used pages until the cache is at most target_bytes. Returns the pages removed."""
+        removed = 0
+        rows = self._conn.execute("SELECT content_hash, size FROM blobs ORDER BY last_access").fetchall()
+        for content_hash, size in rows:
+            if self._total_bytes <= target_bytes:
+                break
+            try:
+                blob_path(self.cache_dir, content_hash).unlink()
+            except FileNotFoundError:
+                pass
+            self._conn.execute("DELETE FROM pages WHERE content_hash = ?", (content_hash,))
+            self._conn.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+            self._total_bytes -= size
+            removed += 1
+        self._conn.commit()
+        if removed:
+            print(f"    -> HTML cache: evicted {removed} page(s), {self._total_bytes / 1024 / 1024:.1f} MB left.")
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Card data stored with every page; together with the re-parsed lists it gives a full session CSV row
+def cache_metadata(job_details: dict) -> dict:
+    return {key: job_details.get(key) for key in ("Job_Search_Term", "Job_Title", "Company_Name", "Job_Location")}
+
+
+# Stores a scraped page if a cache is in use. A cache problem never stops the scrape.
+def cache_page(html_cache, url: str, html: str, job_details: dict):
+    if html_cache is None or not url or not html:
+        return
+    try:
+        html_cache.put(url, html, cache_metadata(job_details))
+    except Exception as e:
+        print(f"WARNING: Could not store the page in the HTML cache. Error: {e}")
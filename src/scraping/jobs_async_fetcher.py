@@ -0,0 +1,264 @@
+# ==========================================================
+# Jobs.ch Async Scraping Engine (asyncio + aiohttp)
+# ==========================================================
+# Goal:
+#   Overlap the network waits of many job ad downloads so that full
+#   market refreshes finish in minutes instead of hours.
+# Key Functionality:
+#   - Collects the ad cards from the search result pages with Selenium
+#     (same as the HTTP fetcher), then closes the browser.
+#   - Keeps detail requests in flight with aiohttp; their number adapts to the
+#     observed latency and errors (AIMD), starting at max_in_flight.
+#   - Throttles the request start rate with a token-bucket limiter to stay polite to jobs.ch.
+#   - Writes into the same session CSV schema as scrape_jobs.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+import asyncio
+import aiohttp
+import time
+import pandas as pd
+from pathlib import Path
+import re
+from .jobs_ch_base import get_driver, accept_cookies_and_close_banner
+from .jobs_scraping import JOBS_CH_BASE_URL, new_job_details, load_unique_ids
+from .dedup_index import open_dedup_index
+from .session_writer import SessionWriter
+from .scrape_timing import LatencyProfile, AD_LATENCY_STEP
+from .watermark import WatermarkTracker, DEFAULT_STOP_AFTER_KNOWN
+from .html_cache import HtmlCache, cache_page
+from .concurrency_controller import AdaptiveConcurrency, DEFAULT_MAX_CONCURRENCY
+from .jobs_http_fetcher import (
+    HTTP_HEADERS, HTTP_TIMEOUT_SECONDS, collect_job_cards, parse_job_detail_html, apply_detail_lists,
+    fetch_job_detail_selenium,
+)
+
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_REQUESTS_PER_SECOND = 4.0
+DEFAULT_BURST = 4
+
+
+# Token bucket: allows 'rate' request starts per second on average and bursts of up to 'capacity'.
+class TokenBucket:
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        """Waits until a token is available and takes it."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def _fetch_detail_async(session: aiohttp.ClientSession, bucket: TokenBucket,
+                              concurrency: AdaptiveConcurrency, slot_freed: asyncio.Condition, job_card: dict):
+    """Downloads and parses one detail page. Returns (job_card, html, tasks, skills, seconds).
+    Failures give empty lists (like the HTTP fetcher), so one bad page never stops the whole run."""
+    async with slot_freed:
+        await slot_freed.wait_for(concurrency.try_acquire)
+
+    start = time.perf_counter()
+    html = None
+    tasks, skills = [], []
+    try:
+        # The token is taken once a slot is held, so the rate limit counts actual request starts
+        await bucket.acquire()
+        start = time.perf_counter()
+        async with session.get(job_card["Job_URL"]) as response:
+            response.raise_for_status()
+            html = await response.text()
+        tasks, skills = parse_job_detail_html(html)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"    -> Async fetch failed for {job_card['Job_URL']}: {e}")
+        html = None
+    except Exception as e:
+        # Undecodable or unparsable page: keep the ad with empty lists, the Selenium fallback may still get them
+        print(f"    -> Could not read detail page {job_card['Job_URL']}: {e}")
+        tasks, skills = [], []
+    finally:
+        seconds = time.perf_counter() - start
+        concurrency.release(seconds, ok=html is not None)
+        async with slot_freed:
+            slot_freed.notify_all()
+    return job_card, html, tasks, skills, seconds
+
+
+async def _fetch_all_details(job_cards: list, concurrency: AdaptiveConcurrency, requests_per_second: float,
+                             burst: int, on_result):
+    bucket = TokenBucket(requests_per_second, burst)
+    slot_freed = asyncio.Condition()
+    connector = aiohttp.TCPConnector(limit=concurrency.max_limit)
+    timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS)
+
+    async with aiohttp.ClientSession(connector=connector, headers=HTTP_HEADERS, timeout=timeout) as session:
+        tasks = [_fetch_detail_async(session, bucket, concurrency, slot_freed, job_card) for job_card in job_cards]
+        for next_done in asyncio.as_completed(tasks):
+            on_result(*(await next_done))
+
+
+def scrape_jobs_async(job_search_term: str, max_jobs_to_scrape: int, save_file_path: Path, master_file_path: Path,
+                      max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                      requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                      burst: int = DEFAULT_BURST, selenium_fallback: bool = True,
+                      browser_profile: str = "default", driver=None,
+                      seen_ids: set = None, incremental: bool = False,
+                      stop_after_known: int = DEFAULT_STOP_AFTER_KNOWN, html_cache: HtmlCache = None,
+                      latency_profile: LatencyProfile = None, adaptive: bool = True,
+                      max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+
+    # --- INITIAL DATA LOADING ---
+    session_writer = SessionWriter(save_file_path)
+    unique_job_ids_session = load_unique_ids(save_file_path)
+    jobs_scraped_count = len(unique_job_ids_session)
+    unique_job_ids_master = open_dedup_index(master_file_path)
+
+    # Batch mode: IDs already claimed by earlier search terms of the same run are skipped as well
+    if seen_ids is not None:
+        seen_ids.update(unique_job_ids_session)
+        unique_job_ids_session = seen_ids
+
+    print("-" * 50)
+    print(f"Starting ASYNC scrape for: '{job_search_term}' ({jobs_scraped_count} records already in session file).")
+    # max_in_flight is the starting concurrency; without 'adaptive' it stays fixed
+    max_concurrency = max(max_in_flight, max_concurrency) if adaptive else max_in_flight
+    concurrency = AdaptiveConcurrency(max_in_flight, min_limit=1 if adaptive else max_in_flight,
+                                      max_limit=max_concurrency)
+    print(f"Targeting {max_jobs_to_scrape} total jobs. In flight: {max_in_flight}"
+          + (f" (adaptive, up to {max_concurrency})" if adaptive else " (fixed)")
+          + f", rate limit: {requests_per_second}/s (burst {burst}).")
+    print(f"Total unique IDs in MASTER dedup index for cross-check: {len(unique_job_ids_master)}")
+    watermark = WatermarkTracker(master_file_path, job_search_term, stop_after_known) if incremental else None
+    if watermark:
+        print(watermark.describe())
+    print("-" * 50)
+
+    remaining_jobs = max_jobs_to_scrape - jobs_scraped_count
+    if remaining_jobs <= 0:
+        print(f"Limit of {max_jobs_to_scrape} jobs already reached in the session file.")
+        unique_job_ids_master.close()
+        session_writer.close()
+        return pd.DataFrame()
+
+    # --- PHASE 1: COLLECT AD CARDS WITH SELENIUM ---
+    # A driver passed in (see driver_session) is reused for phase 1 and 3 and stays open afterwards
+    owns_driver = driver is None
+    collect_driver = get_driver(profile=browser_profile) if owns_driver else driver
+    try:
+        if owns_driver:
+            collect_driver.get(JOBS_CH_BASE_URL)
+            accept_cookies_and_close_banner(collect_driver)
+        job_cards = collect_job_cards(collect_driver, job_search_term, remaining_jobs,
+                                      unique_job_ids_session, unique_job_ids_master, watermark)
+        unique_job_ids_session.update(job_card["Unique_ID"] for job_card in job_cards)
+    finally:
+        if owns_driver: collect_driver.quit()
+        unique_job_ids_master.close()
+
+    print(f"Collected {len(job_cards)} new ad URLs. Fetching detail pages asynchronously...")
+
+    # --- PHASE 2: FETCH DETAILS CONCURRENTLY ---
+    scraped_data = []
+    needs_browser = []
+    fetch_seconds = []
+    profile = latency_profile if latency_profile is not None else LatencyProfile()
+
+    def save_result(job_card, html, tasks, skills, seconds):
+        nonlocal jobs_scraped_count
+        fetch_seconds.append(seconds)
+        profile.record(AD_LATENCY_STEP, seconds)
+
+        job_details = new_job_details(job_search_term, jobs_scraped_count + 1)
+        job_details["Job_Title"] = job_card["Job_Title"]
+        job_details["Company_Name"] = job_card["Company_Name"]
+        job_details["Job_Location"] = job_card["Job_Location"]
+        apply_detail_lists(job_details, tasks, skills)
+        cache_page(html_cache, job_card["Job_URL"], html, job_details)
+
+        # Lists missing in the static HTML: keep the ad back for the browser fallback
+        if not tasks and not skills and selenium_fallback:
+            needs_browser.append((job_card, job_details))
+            return
+
+        jobs_scraped_count += 1
+        scraped_data.append(job_details)
+        _save_job(job_details, session_writer)
+
+    start_time = time.time()
+    asyncio.run(_fetch_all_details(job_cards, concurrency, requests_per_second, burst, save_result))
+
+    # --- PHASE 3: SELENIUM FALLBACK FOR JAVASCRIPT-ONLY PAGES ---
+    if needs_browser:
+        print(f"{len(needs_browser)} ad(s) have no lists in the static HTML. Falling back to Selenium...")
+        fallback_driver = get_driver(profile=browser_profile) if owns_driver else driver
+        try:
+            for job_card, job_details in needs_browser:
+                fetch_job_detail_selenium(fallback_driver, job_card["Job_URL"], job_details, html_cache)
+                jobs_scraped_count += 1
+                job_details["Job_Index"] = jobs_scraped_count
+                scraped_data.append(job_details)
+                _save_job(job_details, session_writer)
+        finally:
+            if owns_driver: fallback_driver.quit()
+
+    session_writer.close()
+    elapsed = time.time() - start_time
+    if watermark:
+        watermark.save()
+
+    # --- FINAL OUTPUT ---
+    df_skills = pd.DataFrame(scraped_data)
+
+    print("\n" + "=" * 50)
+    print(f"Successfully scraped {len(df_skills)} NEW job ads for '{job_search_term}' asynchronously.")
+    if fetch_seconds:
+        print(f"Detail phase: {elapsed:.1f}s | Average fetch: {sum(fetch_seconds) / len(fetch_seconds) * 1000:.0f} ms "
+              f"| Selenium fallbacks: {len(needs_browser)}")
+    print("=" * 50)
+
+    if fetch_seconds:
+        concurrency.print_summary(f"Async Concurrency for '{job_search_term}'")
+
+    return df_skills
+
+
+def _save_job(job_details: dict, session_writer: SessionWriter):
+    try:
+        session_writer.write(job_details)
+        print(f"    -> Saved job {job_details['Job_Index']}: {job_details['Job_Title'][:60]}")
+    except Exception as e:
+        print(f"WARNING: Could not save intermediate data to CSV. Error: {e}")
+
+
+# --- STANDALONE EXECUTION BLOCK ---
+if __name__ == "__main__":
+
+    print("--- RUNNING ASYNC SCRAPER IN STANDALONE TEST MODE ---")
+
+    job_search_term = input("Enter the job title you want to scrape (e.g., Data Scientist): ")
+    MAX_JOBS_TO_SCRAPE_TEST = int(input("Enter the maximum number of jobs to scrape (e.g., 50): "))
+
+    PROJECT_ROOT_TEST = Path(__file__).resolve().parent.parent.parent
+    RAW_DATA_DIR_TEST = PROJECT_ROOT_TEST / "data" / "raw"
+    RAW_DATA_DIR_TEST.mkdir(parents=True, exist_ok=True)
+
+    safe_job_name = re.sub(r'\s+', '_', job_search_term.strip().lower())
+    safe_job_name = re.sub(r'[^a-z0-9_]', '', safe_job_name)
+
+    TEST_SAVE_FILE_PATH = RAW_DATA_DIR_TEST / f"jobs_ch_{safe_job_name}_skills.csv"
+    TEST_MASTER_FILE_PATH = RAW_DATA_DIR_TEST / "jobs_ch_skills_all.csv"
+
+    scrape_jobs_async(job_search_term, MAX_JOBS_TO_SCRAPE_TEST, TEST_SAVE_FILE_PATH, TEST_MASTER_FILE_PATH)
@@ -0,0 +1,109 @@
+# ==========================================================
+# Jobs.ch Batch Scraping (several search terms per run)
+# ==========================================================
+# Goal:
+#   Scrape a list of search terms (e.g. the nightly run over ~20 job titles)
+#   in one process, without scraping the same ad twice.
+# Key Functionality:
+#   - Runs the terms back-to-back on one warm browser (cookies accepted once).
+#   - One in-memory dedup set shared by all terms, on top of the master dedup index.
+#   - Keeps one session file per term, so an interrupted batch resumes per term.
+#   - Returns the session files for a single merge into the master file.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from pathlib import Path
+import re
+import time
+from .jobs_ch_base import driver_session
+from .jobs_scraping import scrape_jobs
+from .jobs_http_fetcher import scrape_jobs_http
+from .jobs_async_fetcher import scrape_jobs_async
+from .csv_merging import merge_sessions_to_master
+
+BATCH_FETCH_MODES = ("selenium", "http", "async")
+
+
+def session_file_name(job_search_term: str) -> str:
+    """'Data Scientist' -> 'jobs_ch_data_scientist_skills.csv'"""
+    safe_job_name = re.sub(r'\s+', '_', job_search_term.strip().lower())
+    safe_job_name = re.sub(r'[^a-z0-9_]', '', safe_job_name)
+    return f"jobs_ch_{safe_job_name}_skills.csv"
+
+
+# Reads one search term per line; empty lines and '#' comments are ignored
+def read_search_terms(terms_file_path: Path) -> list:
+    search_terms = []
+    with open(terms_file_path, encoding="utf-8") as terms_file:
+        for line in terms_file:
+            term = line.split("#", 1)[0].strip()
+            if term and term not in search_terms:
+                search_terms.append(term)
+    return search_terms
+
+
+def scrape_jobs_batch(search_terms: list, max_jobs_per_term: int, raw_data_dir: Path, master_file_path: Path,
+                      fetch_mode: str = "selenium", browser_profile: str = "default", incremental: bool = False,
+                      html_cache=None):
+    """Scrapes all search terms and returns the list of session files that hold data."""
+    if fetch_mode not in BATCH_FETCH_MODES:
+        raise ValueError(f"Unknown fetch mode '{fetch_mode}'. Choose one of {BATCH_FETCH_MODES}.")
+
+    scrapers = {"selenium": scrape_jobs, "http": scrape_jobs_http, "async": scrape_jobs_async}
+    scrape = scrapers[fetch_mode]
+
+    seen_ids = set()
+    session_file_paths = []
+    new_records = {}
+    start_time = time.time()
+
+    print("=" * 50)
+    print(f"Starting BATCH scrape of {len(search_terms)} search terms ({fetch_mode}, max {max_jobs_per_term} per term).")
+    print("=" * 50)
+
+    with driver_session(profile=browser_profile) as driver:
+        for term_number, job_search_term in enumerate(search_terms, start=1):
+            print(f"\n[{term_number}/{len(search_terms)}] Search term: '{job_search_term}'")
+            save_file_path = raw_data_dir / session_file_name(job_search_term)
+
+            try:
+                df_new = scrape(job_search_term, max_jobs_per_term, save_file_path, master_file_path,
+                                browser_profile=browser_profile, driver=driver, seen_ids=seen_ids,
+                                incremental=incremental, html_cache=html_cache)
+                new_records[job_search_term] = len(df_new)
+            except Exception as e:
+                # One failing term should not cost the results of the others
+                print(f"ERROR: Scraping '{job_search_term}' failed. Continuing with the next term. Error: {e}")
+                new_records[job_search_term] = 0
+
+            if save_file_path.exists() and save_file_path.stat().st_size > 0:
+                session_file_paths.append(save_file_path)
+
+    elapsed = time.time() - start_time
+    print("\n" + "=" * 50)
+    print(f"Batch finished in {elapsed / 60:.1f} min. New records per term:")
+    for job_search_term, count in new_records.items():
+        print(f"  {job_search_term:35} {count}")
+    print(f"Unique ads seen in this batch: {len(seen_ids)}")
+    print("=" * 50)
+
+    return session_file_paths
+
+
+# --- STANDALONE EXECUTION BLOCK ---
+if __name__ == "__main__":
+
+    print("--- RUNNING BATCH SCRAPER IN STANDALONE TEST MODE ---")
+
+    terms_input = input("Enter the job titles to scrape, separated by commas (e.g., Data Scientist, ML Engineer): ")
+    MAX_JOBS_PER_TERM_TEST = int(input("Enter the maximum number of jobs per term (e.g., 20): "))
+
+    PROJECT_ROOT_TEST = Path(__file__).resolve().parent.parent.parent
+    RAW_DATA_DIR_TEST = PROJECT_ROOT_TEST / "data" / "raw"
+    RAW_DATA_DIR_TEST.mkdir(parents=True, exist_ok=True)
+    TEST_MASTER_FILE_PATH = RAW_DATA_DIR_TEST / "jobs_ch_skills_all.csv"
+
+    search_terms_test = [term.strip() for term in terms_input.split(",") if term.strip()]
+    session_files = scrape_jobs_batch(search_terms_test, MAX_JOBS_PER_TERM_TEST, RAW_DATA_DIR_TEST,
+                                      TEST_MASTER_FILE_PATH)
+    merge_sessions_to_master(session_files, TEST_MASTER_FILE_PATH, delete_session=False)
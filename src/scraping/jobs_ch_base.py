@@ -4,6 +4,10 @@
 # Purpose:
 #   Manages WebDriver initialization, OS-specific configuration,
 #   and initial site interaction (cookies/banners) for the jobs.ch scraper.
+#   Offers a 'performance' browser profile (headless, no images/fonts,
+#   blocked trackers, eager page load) next to the default full browser.
+#   Resolves the chromedriver path once (env pin or on-disk cache, works
+#   offline) and offers a reusable, cookie-accepted driver session.
 # Author: Valeska Blank & Stefan Dreyfus
 # ==========================================================
 
@@ -17,6 +21,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from contextlib import contextmanager
+from pathlib import Path
+import os
 import time
 import platform
 
@@ -36,12 +43,96 @@ else:
     print(f"WARNING: Unknown OS '{system}'. Falling back to general Windows configuration.")
     detected_os = "Windows"
 
+# --- BROWSER PROFILES ---
+# 'default': full, maximized, visible Chrome (original behaviour)
+# 'performance': headless, no images/fonts, third-party trackers blocked, 'eager' page load strategy
+BROWSER_PROFILES = ("default", "performance")
+
+# URL patterns blocked via CDP Network.setBlockedURLs in the performance profile
+BLOCKED_URL_PATTERNS = [
+    # Images and fonts are not needed to read the job texts
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    # Third-party analytics, ads and trackers
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*criteo.*", "*adnxs.com*",
+    "*bat.bing.com*", "*snap.licdn.com*", "*analytics.tiktok.com*", "*taboola.com*", "*outbrain.com*",
+]
+
+
+# --- CHROMEDRIVER RESOLUTION ---
+# Pin a driver with the CHROMEDRIVER_PATH environment variable, otherwise the path found by
+# webdriver-manager is cached on disk and reused without any network lookup.
+CHROMEDRIVER_PATH_ENV = "CHROMEDRIVER_PATH"
+DRIVER_PATH_CACHE_FILE = Path.home() / ".cache" / "cip_jobs_ch" / "chromedriver_path.txt"
+# JOBS_CH_BASE_URL can point the scrapers at a local stand-in (see src/benchmark/mock_jobs_server.py)
+JOBS_CH_BASE_URL = os.environ.get("JOBS_CH_BASE_URL", "https://www.jobs.ch/de/")
+
+_resolved_driver_path = None
+
+
+def resolve_chromedriver_path(refresh: bool = False):
+    """Returns the chromedriver path, resolving it at most once per process.
+
+    Order: CHROMEDRIVER_PATH -> cached path on disk -> webdriver-manager download (path is cached).
+    Returns None if nothing is available offline; Selenium then looks for a driver itself.
+    """
+    global _resolved_driver_path
+    if _resolved_driver_path and not refresh:
+        return _resolved_driver_path
+
+    # 1. Pinned path
+    pinned_path = os.environ.get(CHROMEDRIVER_PATH_ENV)
+    if pinned_path:
+        if Path(pinned_path).is_file():
+            _resolved_driver_path = pinned_path
+            return _resolved_driver_path
+        print(f"WARNING: {CHROMEDRIVER_PATH_ENV}='{pinned_path}' does not exist. Ignoring it.")
+
+    # 2. Path cached by an earlier run
+    if not refresh and DRIVER_PATH_CACHE_FILE.exists():
+        cached_path = DRIVER_PATH_CACHE_FILE.read_text(encoding="utf-8").strip()
+        if Path(cached_path).is_file():
+            _resolved_driver_path = cached_path
+            return _resolved_driver_path
+
+    # 3. Online lookup, only needed once per machine and Chrome version
+    try:
+        _resolved_driver_path = ChromeDriverManager().install()
+    except Exception as e:
+        print(f"WARNING: webdriver-manager could not resolve chromedriver (offline?). Error: {e}")
+        return None
+
+    try:
+        DRIVER_PATH_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        DRIVER_PATH_CACHE_FILE.write_text(_resolved_driver_path, encoding="utf-8")
+    except OSError as e:
+        print(f"WARNING: Could not cache chromedriver path. Error: {e}")
+
+    return _resolved_driver_path
+
+
 # --- DRIVER CONFIGURATION (get_driver) ---
 # Driver Configuration and OS Detection
-def get_driver(os_type="Windows"):  # os_type parameter can be used for User-Agent selection
-    """Start Chrome with options using webdriver-manager for automatic driver management."""
+def get_driver(os_type="Windows", profile="default", network_log=False):  # os_type parameter can be used for User-Agent selection
+    """Start Chrome with options. The chromedriver is looked up once per process (see resolve_chromedriver_path):
+    CHROMEDRIVER_PATH env variable -> path cached on disk -> ChromeDriverManager download -> Selenium's own lookup.
+    network_log: record the DevTools network events in the 'performance' log (used by the benchmarks)."""
+    if profile not in BROWSER_PROFILES:
+        raise ValueError(f"Unknown browser profile '{profile}'. Choose one of {BROWSER_PROFILES}.")
+
     options = Options()
-    options.add_argument("--start-maximized")
+
+    if profile == "performance":
+        # Headless has no screen to maximize: use a fixed desktop size so the page keeps its desktop layout
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        # Return from driver.get() at DOMContentLoaded instead of waiting for every subresource
+        options.page_load_strategy = "eager"
+    else:
+        options.add_argument("--start-maximized")
 
     if os_type == "Mac":
         user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) ..."
@@ -54,10 +145,20 @@ def get_driver(os_type="Windows"):  # os_type parameter can be used for User-Age
         user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) ..."
 
     options.add_argument(f"--user-agent={user_agent}")
+    if network_log:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
-    # CRITICAL: Use the Service object with webdriver-manager
-    service = ChromeService(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=options)
+    # CRITICAL: Use the Service object with the resolved chromedriver (no download check per call)
+    driver_path = resolve_chromedriver_path()
+    service = ChromeService(driver_path) if driver_path else ChromeService()
+    driver = webdriver.Chrome(service=service, options=options)
+
+    if profile == "performance":
+        # Block fonts, images and trackers on the network level
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+    return driver
 
 
 # --- Cookie and Banner Management ---
@@ -90,10 +191,23 @@ def accept_cookies_and_close_banner(driver):
         print("No smart search banner found")
 
 
+# --- REUSABLE DRIVER SESSION ---
+# One warm browser with cookies accepted, shared by several scrape_jobs* calls:
+#   with driver_session(profile="performance") as driver:
+#       scrape_jobs("Data Scientist", 50, ..., driver=driver)
+#       scrape_jobs("Data Analyst", 50, ..., driver=driver)
+@contextmanager
+def driver_session(os_type="Windows", profile="default"):
+    driver = get_driver(os_type, profile=profile)
+    try:
+        driver.get(JOBS_CH_BASE_URL)
+        accept_cookies_and_close_banner(driver)
+        yield driver
+    finally:
+        driver.quit()
+
+
 # Simple test run to check that banners are handled
 if __name__ == "__main__":
-    driver = get_driver(detected_os)
-    driver.get("https://www.jobs.ch/de/")
-    accept_cookies_and_close_banner(driver)
-    time.sleep(5)
-    driver.quit()
\ No newline at end of file
+    with driver_session(detected_os) as driver:
+        time.sleep(5)
@@ -0,0 +1,327 @@
+# ==========================================================
+# Jobs.ch HTTP Detail Fetcher (requests + BeautifulSoup)
+# ==========================================================
+# Goal:
+#   Scrape job ads without rendering every detail page in Chrome.
+# Key Functionality:
+#   - Uses Selenium only to walk the search result pages and collect the
+#     ad cards (Title, Company, Location, ad URL).
+#   - Downloads each ad's detail page over one pooled requests.Session
+#     (keep-alive, bounded connection pool) with a small thread pool.
+#   - The number of fetches in flight adapts to the observed latency and errors (AIMD).
+#   - Parses the Tasks / Skills lists ('li-t_disc') with BeautifulSoup (lxml if installed).
+#   - Falls back to Selenium for ads whose lists are only rendered by JavaScript.
+#   - Writes the same session CSV schema as scrape_jobs.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup
+import requests
+import time
+import pandas as pd
+from pathlib import Path
+import re
+from .jobs_ch_base import get_driver, accept_cookies_and_close_banner
+from .dedup_index import open_dedup_index
+from .session_writer import SessionWriter
+from .scrape_timing import LatencyProfile, AD_LATENCY_STEP
+from .watermark import WatermarkTracker, DEFAULT_STOP_AFTER_KNOWN
+from .html_cache import HtmlCache, cache_page
+from .concurrency_controller import AdaptiveConcurrency, DEFAULT_MAX_CONCURRENCY
+from .jobs_scraping import (
+    JOBS_CH_BASE_URL, JOB_LINK_XPATH, NEXT_PAGE_XPATH, SHARED_LIST_CLASS,
+    MISSING_TASKS_TEXT, MISSING_SKILLS_TEXT,
+    DEFAULT_WAIT_TIMEOUTS, build_search_page_url, new_job_details, make_unique_id, load_unique_ids,
+    read_job_cards, extract_detail_lists,
+)
+
+# lxml is considerably faster than the built-in parser but optional
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+DEFAULT_HTTP_POOL_SIZE = 8
+HTTP_TIMEOUT_SECONDS = 10
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Accept-Language": "de-CH,de;q=0.9,en;q=0.8",
+}
+
+
+# --- HTTP SESSION ---
+def create_http_session(pool_size: int = DEFAULT_HTTP_POOL_SIZE) -> requests.Session:
+    """Creates a keep-alive session with a bounded connection pool and retries for transient errors."""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HTTP_HEADERS)
+    return session
+
+
+# --- PARSING ---
+# Returns the (tasks, skills) bullet lists of a detail page.
+# Same assumption as TASKS_XPATH / SKILLS_XPATH: the first 'li-t_disc' list holds the tasks, the second the skills.
+def parse_job_detail_html(html: str):
+    soup = BeautifulSoup(html, HTML_PARSER)
+    lists = soup.select(f"ul[class*='{SHARED_LIST_CLASS}']")
+
+    def list_items(ul):
+        return [li.get_text(" ", strip=True) for li in ul.find_all("li") if li.get_text(strip=True)]
+
+    tasks = list_items(lists[0]) if len(lists) > 0 else []
+    skills = list_items(lists[1]) if len(lists) > 1 else []
+    return tasks, skills
+
+
+def apply_detail_lists(job_details: dict, tasks: list, skills: list):
+    """Writes the extracted lists into the record, keeping the 'not found' placeholders for empty lists."""
+    job_details["Tasks"] = " | ".join(tasks) if tasks else MISSING_TASKS_TEXT
+    job_details["Skills"] = " | ".join(skills) if skills else MISSING_SKILLS_TEXT
+
+
+# --- PHASE 1: COLLECT AD CARDS WITH SELENIUM ---
+# Walks the search result pages and returns the cards of all ads that are neither in the session nor in the master index.
+# With a watermark tracker the list is read newest-first and paging stops after K known ads in a row.
+def collect_job_cards(driver, job_search_term: str, max_cards: int, session_ids: set, master_index,
+                      watermark: WatermarkTracker = None):
+    wait = WebDriverWait(driver, 5)
+    job_cards = []
+    seen_ids = set(session_ids)
+    page = 1
+
+    watermark_reached = False
+
+    while len(job_cards) < max_cards and not watermark_reached:
+        driver.get(build_search_page_url(job_search_term, page, newest_first=watermark is not None))
+
+        try:
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            wait.until(EC.presence_of_element_located((By.XPATH, JOB_LINK_XPATH)))
+        except TimeoutException:
+            print(f"No job ads found on page {page}. Stopping.")
+            break
+
+        # All cards of the page in one round-trip
+        for page_card in read_job_cards(driver):
+            if len(job_cards) >= max_cards:
+                break
+            if not page_card["title"] or not page_card["company"] or not page_card["url"]:
+                print(f"Could not read job card on page {page}. Skipping.")
+                continue
+
+            unique_id = make_unique_id(page_card["title"], page_card["company"])
+            known = unique_id in seen_ids or unique_id in master_index
+            if watermark and watermark.observe(unique_id, known):
+                print(f"Watermark reached on page {page}: {watermark.stop_after_known} known ads in a row.")
+                watermark_reached = True
+                break
+            if known:
+                continue
+
+            seen_ids.add(unique_id)
+            job_cards.append({"Job_Title": page_card["title"],
+                              "Company_Name": page_card["company"],
+                              "Job_Location": page_card["location"],
+                              "Job_URL": page_card["url"],
+                              "Unique_ID": unique_id})
+
+        print(f"Page {page}: {len(job_cards)} new ad URLs collected so far.")
+
+        if watermark_reached:
+            break
+        if not driver.find_elements(By.XPATH, NEXT_PAGE_XPATH):
+            print("No 'Next Page' found. All available results collected.")
+            break
+        page += 1
+
+    return job_cards
+
+
+# --- PHASE 2: FETCH DETAIL PAGES OVER HTTP ---
+def fetch_job_detail(session: requests.Session, job_url: str):
+    """Downloads one detail page. Returns (html, seconds) or (None, seconds) on failure."""
+    start = time.perf_counter()
+    try:
+        response = session.get(job_url, timeout=HTTP_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        return response.text, time.perf_counter() - start
+    except requests.RequestException as e:
+        print(f"    -> HTTP fetch failed for {job_url}: {e}")
+        return None, time.perf_counter() - start
+
+
+# Selenium fallback for pages whose lists are not in the server-rendered HTML.
+# Returns False if the page could not be loaded; the record then keeps its 'not found' placeholders.
+def fetch_job_detail_selenium(driver, job_url: str, job_details: dict, html_cache: HtmlCache = None) -> bool:
+    try:
+        driver.get(job_url)
+        extract_detail_lists(driver, job_details, DEFAULT_WAIT_TIMEOUTS["lists"])
+        # The rendered page replaces the static HTML in the cache (same URL and day)
+        cache_page(html_cache, job_url, driver.page_source, job_details)
+        return True
+    except Exception as e:
+        print(f"    -> Selenium fallback failed for {job_url}: {e}")
+        apply_detail_lists(job_details, [], [])
+        return False
+
+
+def scrape_jobs_http(job_search_term: str, max_jobs_to_scrape: int, save_file_path: Path, master_file_path: Path,
+                     pool_size: int = DEFAULT_HTTP_POOL_SIZE, selenium_fallback: bool = True,
+                     browser_profile: str = "default", driver=None,
+                     seen_ids: set = None, incremental: bool = False,
+                     stop_after_known: int = DEFAULT_STOP_AFTER_KNOWN, html_cache: HtmlCache = None,
+                     latency_profile: LatencyProfile = None, adaptive: bool = True,
+                     max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+
+    # --- INITIAL DATA LOADING ---
+    session_writer = SessionWriter(save_file_path)
+    unique_job_ids_session = load_unique_ids(save_file_path)
+    jobs_scraped_count = len(unique_job_ids_session)
+    unique_job_ids_master = open_dedup_index(master_file_path)
+
+    # Batch mode: IDs already claimed by earlier search terms of the same run are skipped as well
+    if seen_ids is not None:
+        seen_ids.update(unique_job_ids_session)
+        unique_job_ids_session = seen_ids
+
+    print("-" * 50)
+    print(f"Starting HTTP scrape for: '{job_search_term}' ({jobs_scraped_count} records already in session file).")
+    # pool_size is the starting concurrency; without 'adaptive' it stays fixed
+    max_concurrency = max(pool_size, max_concurrency) if adaptive else pool_size
+    concurrency = AdaptiveConcurrency(pool_size, min_limit=1 if adaptive else pool_size, max_limit=max_concurrency)
+    print(f"Targeting {max_jobs_to_scrape} total jobs. Concurrency: {pool_size}"
+          + (f" (adaptive, up to {max_concurrency})." if adaptive else " (fixed)."))
+    print(f"Total unique IDs in MASTER dedup index for cross-check: {len(unique_job_ids_master)}")
+    watermark = WatermarkTracker(master_file_path, job_search_term, stop_after_known) if incremental else None
+    if watermark:
+        print(watermark.describe())
+    print("-" * 50)
+
+    remaining_jobs = max_jobs_to_scrape - jobs_scraped_count
+    if remaining_jobs <= 0:
+        print(f"Limit of {max_jobs_to_scrape} jobs already reached in the session file.")
+        unique_job_ids_master.close()
+        session_writer.close()
+        return pd.DataFrame()
+
+    # A driver passed in (see driver_session) already accepted the cookies and stays open afterwards
+    owns_driver = driver is None
+    if owns_driver:
+        driver = get_driver(profile=browser_profile)
+    scraped_data = []
+    fetch_seconds = []
+    fallback_count = 0
+    fallback_errors = 0
+    profile = latency_profile if latency_profile is not None else LatencyProfile()
+
+    try:
+        if owns_driver:
+            driver.get(JOBS_CH_BASE_URL)
+            accept_cookies_and_close_banner(driver)
+
+        job_cards = collect_job_cards(driver, job_search_term, remaining_jobs,
+                                      unique_job_ids_session, unique_job_ids_master, watermark)
+        unique_job_ids_session.update(job_card["Unique_ID"] for job_card in job_cards)
+        print(f"Collected {len(job_cards)} new ad URLs. Fetching detail pages over HTTP...")
+
+        session = create_http_session(max_concurrency)
+
+        # Threads beyond the current limit wait at the gate; a failed download counts as an error
+        def fetch_gated(job_card):
+            with concurrency.slot() as outcome:
+                start = time.perf_counter()
+                try:
+                    html, seconds = fetch_job_detail(session, job_card["Job_URL"])
+                except Exception as e:
+                    # Anything raised here would end executor.map and with it the whole term
+                    print(f"    -> HTTP fetch failed for {job_card['Job_URL']}: {e}")
+                    html, seconds = None, time.perf_counter() - start
+                outcome["ok"] = html is not None
+            return html, seconds
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            fetched = executor.map(fetch_gated, job_cards)
+
+            for job_card, (html, seconds) in zip(job_cards, fetched):
+                fetch_seconds.append(seconds)
+                job_details = new_job_details(job_search_term, jobs_scraped_count + 1)
+                job_details["Job_Title"] = job_card["Job_Title"]
+                job_details["Company_Name"] = job_card["Company_Name"]
+                job_details["Job_Location"] = job_card["Job_Location"]
+
+                tasks, skills = parse_job_detail_html(html) if html else ([], [])
+                apply_detail_lists(job_details, tasks, skills)
+                cache_page(html_cache, job_card["Job_URL"], html, job_details)
+
+                # Nothing in the static HTML: the page needs JavaScript, use the browser instead
+                if not tasks and not skills and selenium_fallback:
+                    print(f"    -> No lists in HTML for '{job_card['Job_Title'][:50]}'. Falling back to Selenium.")
+                    with profile.measure("selenium_fallback"):
+                        if not fetch_job_detail_selenium(driver, job_card["Job_URL"], job_details, html_cache):
+                            fallback_errors += 1
+                    fallback_count += 1
+                profile.record(AD_LATENCY_STEP, seconds)
+
+                scraped_data.append(job_details)
+                jobs_scraped_count += 1
+
+                try:
+                    session_writer.write(job_details)
+                    print(f"    -> Saved job {job_details['Job_Index']}: {job_details['Job_Title'][:60]} "
+                          f"({seconds * 1000:.0f} ms)")
+                except Exception as e:
+                    print(f"WARNING: Could not save intermediate data to CSV. Error: {e}")
+    finally:
+        if driver and owns_driver: driver.quit()
+        unique_job_ids_master.close()
+        session_writer.close()
+
+    if watermark:
+        watermark.save()
+
+    # --- FINAL OUTPUT ---
+    df_skills = pd.DataFrame(scraped_data)
+
+    print("\n" + "=" * 50)
+    print(f"Successfully scraped {len(df_skills)} NEW job ads for '{job_search_term}' over HTTP.")
+    if fetch_seconds:
+        print(f"Average detail fetch: {sum(fetch_seconds) / len(fetch_seconds) * 1000:.0f} ms per ad. "
+              f"Selenium fallbacks: {fallback_count} ({fallback_errors} failed).")
+    print("=" * 50)
+
+    if fetch_seconds:
+        concurrency.print_summary(f"HTTP Concurrency for '{job_search_term}'")
+
+    return df_skills
+
+
+# --- STANDALONE EXECUTION BLOCK ---
+if __name__ == "__main__":
+
+    print("--- RUNNING HTTP SCRAPER IN STANDALONE TEST MODE ---")
+
+    job_search_term = input("Enter the job title you want to scrape (e.g., Data Scientist): ")
+    MAX_JOBS_TO_SCRAPE_TEST = int(input("Enter the maximum number of jobs to scrape (e.g., 50): "))
+
+    PROJECT_ROOT_TEST = Path(__file__).resolve().parent.parent.parent
+    RAW_DATA_DIR_TEST = PROJECT_ROOT_TEST / "data" / "raw"
+    RAW_DATA_DIR_TEST.mkdir(parents=True, exist_ok=True)
+
+    safe_job_name = re.sub(r'\s+', '_', job_search_term.strip().lower())
+    safe_job_name = re.sub(r'[^a-z0-9_]', '', safe_job_name)
+
+    TEST_SAVE_FILE_PATH = RAW_DATA_DIR_TEST / f"jobs_ch_{safe_job_name}_skills.csv"
+    TEST_MASTER_FILE_PATH = RAW_DATA_DIR_TEST / "jobs_ch_skills_all.csv"
+
+    scrape_jobs_http(job_search_term, MAX_JOBS_TO_SCRAPE_TEST, TEST_SAVE_FILE_PATH, TEST_MASTER_FILE_PATH)
@@ -7,9 +7,14 @@
 # Key Functionality:
 #   - Utilizes Selenium to execute search, handle navigation, and extract ad details.
 #   - Implements robust duplicate checking against both the current session and the
-#     historical master file based on a 'Title | Company' unique ID.
+#     historical master file based on a 'Title | Company' unique ID
+#     (the master IDs are looked up in a persistent SQLite dedup index).
 #   - Efficiently handles search result pagination to reach a user-defined job limit.
-#   - Saves unique scraped data incrementally to a session-specific CSV file.
+#   - Saves unique scraped data in small batches to a session-specific CSV file
+#     (every row is logged to a write-ahead file first, so nothing is lost on a crash).
+#   - Waits on page conditions instead of fixed sleeps and prints a per-step latency profile.
+#   - Reads all job cards of a page and the lists of an ad with one execute_script call each.
+#   - Keeps a page-cursor checkpoint, so a crashed scrape resumes at the result page it stopped at.
 # Author: Stefan Dreyfus
 # ==========================================================
 
@@ -17,65 +22,261 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 import time
 import pandas as pd
 from pathlib import Path
 import re
 import sys
-from .jobs_ch_base import get_driver, accept_cookies_and_close_banner
+from urllib.parse import urlencode
+from .jobs_ch_base import get_driver, accept_cookies_and_close_banner, JOBS_CH_BASE_URL
+from .scrape_timing import LatencyProfile, AD_LATENCY_STEP
+from .dedup_index import open_dedup_index
+from .session_writer import SessionWriter
+from .watermark import WatermarkTracker, DEFAULT_STOP_AFTER_KNOWN
+from .html_cache import HtmlCache, cache_page
+from .checkpoint import ScrapeCheckpoint
 
 
 CSV_DELIMITER = ';'
 
-def scrape_jobs(job_search_term: str, max_jobs_to_scrape: int, save_file_path: Path, master_file_path: Path):
+# --- CONFIGURATION ---
+SEARCH_RESULTS_PATH = "stellenangebote/"
+NEWEST_FIRST_QUERY = {"sort-by": "date"}  # Result list ordered by publication date (incremental mode)
+
+JOB_LINK_XPATH = "//a[@data-cy='job-link']"
+JOB_TITLE_XPATH = ".//div/span[contains(@class, 'textStyle_h6')]"
+COMPANY_NAME_XPATH = "./div/div[4]/p/strong"
+JOB_LOCATION_XPATH = "./div/div[3]/div[1]/p"
+NEXT_PAGE_XPATH = "//a[@data-cy='paginator-next']"
+SEARCH_BAR_XPATH = "//*[@id='synonym-typeahead-text-field']"
+
+# CRITICAL XPATH for dual scraping
+SHARED_LIST_CLASS = "li-t_disc"
+TASKS_XPATH = f"//ul[contains(@class, '{SHARED_LIST_CLASS}')][1]//li" #assuming tasks being at the first place in a job ad
+SKILLS_XPATH = f"//ul[contains(@class, '{SHARED_LIST_CLASS}')][2]//li" #assuming skills being at the second place in a job ad
+
+# Placeholder values written when an ad has no Tasks / Skills list
+MISSING_TASKS_TEXT = "no tasks found on this job ad"
+MISSING_SKILLS_TEXT = "no skills found on this job ad"
+
+# Column order of the session and master CSV files
+SESSION_COLUMNS = ["Job_Index", "Job_Title", "Company_Name", "Job_Location", "Tasks", "Skills", "Job_Search_Term"]
+# ---------------------
+
+
+# Builds the search result URL for a given term and page, so a page can be opened directly
+# without typing into the search bar and clicking through the paginator.
+def build_search_page_url(job_search_term: str, page: int = 1, newest_first: bool = False) -> str:
+    query_params = {"term": job_search_term.strip(), "page": page}
+    if newest_first:
+        query_params.update(NEWEST_FIRST_QUERY)
+    query = urlencode(query_params)
+    return f"{JOBS_CH_BASE_URL}{SEARCH_RESULTS_PATH}?{query}"
+
+
+# Returns an empty record in the session CSV schema, pre-filled with the 'not found' placeholders.
+def new_job_details(job_search_term: str, job_index: int = None) -> dict:
+    return {"Job_Index": job_index,
+            "Job_Title": "N/A",
+            "Company_Name": "N/A",
+            "Job_Location": "N/A",
+            "Tasks": MISSING_TASKS_TEXT,
+            "Skills": MISSING_SKILLS_TEXT,
+            "Job_Search_Term": job_search_term}
+
+
+# Builds the 'Title | Company' ID used for duplicate checking.
+def make_unique_id(job_title: str, company_name: str) -> str:
+    return f"{str(job_title).strip()} | {str(company_name).strip()}"
+
+
+# --- HELPER FUNCTION FOR DUPLICATE CHECKING ---
+def load_unique_ids(file_path: Path) -> set:
+    """Loads unique IDs (Title | Company) from an existing CSV."""
+    unique_ids = set()
+    try:
+        if file_path.exists() and file_path.stat().st_size > 0:
+            df_existing = pd.read_csv(file_path, sep = CSV_DELIMITER)
+            if not df_existing.empty and 'Company_Name' in df_existing.columns:
+                df_existing['Unique_ID'] = df_existing['Job_Title'].astype(str).str.strip() + ' | ' + df_existing[
+                    'Company_Name'].astype(str).str.strip()
+                unique_ids = set(df_existing['Unique_ID'])
+    except Exception as e:
+        print(f"WARNING: Error reading CSV at {file_path}. Error: {e}")
+    return unique_ids
+
+
+# --- SINGLE ROUND-TRIP EXTRACTION (execute_script) ---
+# Reads every job card of the result page in one call.
+# Arguments: job link XPath, then the title / company / location XPaths relative to the link.
+JOB_CARDS_JS = """
+const textAt = (expr, context) => {
+    const node = document.evaluate(expr, context, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    return node ? (node.innerText || node.textContent).trim() : null;
+};
+const links = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const cards = [];
+for (let i = 0; i < links.snapshotLength; i++) {
+    const link = links.snapshotItem(i);
+    cards.push({element: link,
+                url: link.href,
+                title: textAt(arguments[1], link),
+                company: textAt(arguments[2], link),
+                location: textAt(arguments[3], link)});
+}
+return cards;
+"""
+
+# Reads the Tasks and Skills bullets of the detail pane in one call.
+# Also returns the first list element, used as the 'previous list' marker when the next ad is clicked.
+DETAIL_LISTS_JS = """
+const itemsAt = (expr) => {
+    const items = document.evaluate(expr, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const texts = [];
+    for (let i = 0; i < items.snapshotLength; i++) {
+        const text = (items.snapshotItem(i).innerText || items.snapshotItem(i).textContent).trim();
+        if (text) texts.push(text);
+    }
+    return texts;
+};
+const firstList = document.evaluate(arguments[2], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return {tasks: itemsAt(arguments[0]), skills: itemsAt(arguments[1]), marker: firstList};
+"""
+
+DETAIL_LIST_XPATH = f"//ul[contains(@class, '{SHARED_LIST_CLASS}')]"
+
+
+def read_job_cards(driver) -> list:
+    """Returns all job cards of the current page as dicts (element, url, title, company, location)."""
+    job_cards = driver.execute_script(JOB_CARDS_JS, JOB_LINK_XPATH, JOB_TITLE_XPATH,
+                                      COMPANY_NAME_XPATH, JOB_LOCATION_XPATH) or []
+    for job_card in job_cards:
+        if not job_card.get("location"):
+            job_card["location"] = "Location N/A (Search View)"
+    return job_cards
+
+
+def extract_detail_lists(driver, job_details: dict, timeout: float):
+    """Fills Tasks and Skills from the detail pane. Polls only while both lists are still empty.
+    Returns the first list element of the pane (or None)."""
+    deadline = time.monotonic() + timeout
+    while True:
+        result = driver.execute_script(DETAIL_LISTS_JS, TASKS_XPATH, SKILLS_XPATH, DETAIL_LIST_XPATH) or {}
+        tasks, skills = result.get("tasks") or [], result.get("skills") or []
+        if tasks or skills or time.monotonic() >= deadline:
+            break
+        time.sleep(0.1)
 
-    # Clean the job name for file naming (e.g., 'Data Scientist' -> 'data_scientist')
-    safe_job_name = re.sub(r'\s+', '_', job_search_term.strip().lower())
-    safe_job_name = re.sub(r'[^a-z0-9_]', '', safe_job_name)
+    for field_name, items in (("Tasks", tasks), ("Skills", skills)):
+        if items:
+            job_details[field_name] = " | ".join(items)
+            print(f"    -> Extracted {len(items)} {field_name}.")
+        else:
+            job_details[field_name] = f"no {field_name.lower()} found on this job ad"
+            print(f"    -> No {field_name} list found.")
 
-    # --- CONFIGURATION ---
-    JOB_LINK_XPATH = "//a[@data-cy='job-link']"
-    JOB_TITLE_XPATH = ".//div/span[contains(@class, 'textStyle_h6')]"
-    COMPANY_NAME_XPATH = "./div/div[4]/p/strong"
-    JOB_LOCATION_XPATH = "./div/div[3]/div[1]/p"
-    NEXT_PAGE_XPATH = "//a[@data-cy='paginator-next']"
+    return result.get("marker")
 
-    # CRITICAL XPATH for dual scraping
-    SHARED_LIST_CLASS = "li-t_disc"
-    TASKS_XPATH = f"//ul[contains(@class, '{SHARED_LIST_CLASS}')][1]//li" #assuming tasks being at the first place in a job ad
-    SKILLS_XPATH = f"//ul[contains(@class, '{SHARED_LIST_CLASS}')][2]//li" #assuming skills being at the second place in a job ad
-    # ---------------------
 
+# --- CONDITION-BASED WAITS ---
+# Upper bounds (seconds) for the waits that replaced the fixed sleeps. Each wait returns as soon as its condition holds.
+DEFAULT_WAIT_TIMEOUTS = {"search": 10, "scroll": 5, "detail": 8, "lists": 5, "pagination": 10}
 
-    # --- HELPER FUNCTION FOR DUPLICATE CHECKING ---
+# True if an <h1>/<h2> on the page shows exactly the given job title (i.e. the detail pane switched to this ad)
+DETAIL_TITLE_JS = """
+const title = arguments[0];
+return Array.from(document.querySelectorAll('h1, h2')).some(h => h.textContent.trim() === title);
+"""
+
+
+class job_link_count_stable:
+    """Wait condition: job links are present and their number did not change since the last poll."""
+
+    def __init__(self):
+        self._last_count = -1
+
+    def __call__(self, driver):
+        count = len(driver.find_elements(By.XPATH, JOB_LINK_XPATH))
+        is_stable = count > 0 and count == self._last_count
+        self._last_count = count
+        return is_stable
+
+
+def detail_pane_shows(job_title: str):
+    """Wait condition: the detail pane heading shows the given job title."""
+    return lambda driver: driver.execute_script(DETAIL_TITLE_JS, job_title)
 
-    def load_unique_ids(file_path):
-        """Loads unique IDs (Title | Company) from an existing CSV."""
-        unique_ids = set()
-        try:
-            if file_path.exists() and file_path.stat().st_size > 0:
-                df_existing = pd.read_csv(file_path, sep = CSV_DELIMITER)
-                if not df_existing.empty and 'Company_Name' in df_existing.columns:
-                    df_existing['Unique_ID'] = df_existing['Job_Title'].astype(str).str.strip() + ' | ' + df_existing[
-                        'Company_Name'].astype(str).str.strip()
-                    unique_ids = set(df_existing['Unique_ID'])
-        except Exception as e:
-            print(f"WARNING: Error reading CSV at {file_path}. Error: {e}")
-        return unique_ids
 
+def find_first_detail_list(driver):
+    lists = driver.find_elements(By.XPATH, DETAIL_LIST_XPATH)
+    return lists[0] if lists else None
+
+
+def find_first_job_link(driver):
+    links = driver.find_elements(By.XPATH, JOB_LINK_XPATH)
+    return links[0] if links else None
+
+
+def wait_until(driver, timeout: float, condition, step_name: str) -> bool:
+    """Waits up to 'timeout' seconds for the condition. On timeout a warning is printed and the scrape continues."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(condition)
+        return True
+    except TimeoutException:
+        print(f"    -> Warning: '{step_name}' not confirmed within {timeout}s. Continuing.")
+        return False
+
+
+def wait_for_detail_pane(driver, previous_list, job_title: str, timeout: float) -> bool:
+    """Waits until the detail pane switched to the clicked ad: new title shown or old lists replaced."""
+    conditions = [detail_pane_shows(job_title)]
+    if previous_list is not None:
+        conditions.append(EC.staleness_of(previous_list))
+    return wait_until(driver, timeout, EC.any_of(*conditions), "detail pane update")
+
+
+def wait_for_next_page(driver, previous_url: str, previous_first_link, timeout: float) -> bool:
+    """Waits until the paginator moved on: URL changed or the old job links were replaced."""
+    conditions = [EC.url_changes(previous_url)]
+    if previous_first_link is not None:
+        conditions.append(EC.staleness_of(previous_first_link))
+    return wait_until(driver, timeout, EC.any_of(*conditions), "pagination")
+
+
+def scrape_jobs(job_search_term: str, max_jobs_to_scrape: int, save_file_path: Path, master_file_path: Path,
+                wait_timeouts: dict = None, latency_profile: LatencyProfile = None,
+                browser_profile: str = "default", driver=None, seen_ids: set = None,
+                incremental: bool = False, stop_after_known: int = DEFAULT_STOP_AFTER_KNOWN,
+                html_cache: HtmlCache = None):
+
+    # Clean the job name for file naming (e.g., 'Data Scientist' -> 'data_scientist')
+    safe_job_name = re.sub(r'\s+', '_', job_search_term.strip().lower())
+    safe_job_name = re.sub(r'[^a-z0-9_]', '', safe_job_name)
 
     # --- INITIAL DATA LOADING ---
     jobs_scraped_count = 0
     scraped_data = []  # Data collected in the current session
     unique_job_ids_session = set()  # Unique IDs collected in the current session
 
+    # Open the buffered session writer first: it replays rows a crashed run left in its write-ahead file
+    # The page cursor is saved after every flushed batch, so a crashed run can jump back to its page
+    checkpoint = ScrapeCheckpoint(save_file_path, job_search_term)
+    resume_from_checkpoint = checkpoint.load()
+    session_writer = SessionWriter(save_file_path, on_flush=checkpoint.save)
+
     # Load existing IDs from the session-specific file
     unique_job_ids_session = load_unique_ids(save_file_path)
     jobs_scraped_count = len(unique_job_ids_session)
 
-    # Load ALL unique IDs from the master file
-    unique_job_ids_master = load_unique_ids(master_file_path)
+    # Batch mode: one in-memory set shared by all search terms of the run, so an ad found by
+    # an earlier term is not scraped again before the single merge into the master file
+    if seen_ids is not None:
+        seen_ids.update(unique_job_ids_session)
+        unique_job_ids_session = seen_ids
+
+    # Open the persistent index of ALL unique IDs in the master file (no full reload of the master CSV)
+    unique_job_ids_master = open_dedup_index(master_file_path)
 
     print("-" * 50)
     if jobs_scraped_count > 0:
@@ -83,58 +284,69 @@ def scrape_jobs(job_search_term: str, max_jobs_to_scrape: int, save_file_path: P
     else:
         print(f"Starting fresh scrape for: '{job_search_term}'.")
     print(f"Targeting {max_jobs_to_scrape} total jobs.")
-    print(f"Total unique IDs loaded from MASTER file for cross-check: {len(unique_job_ids_master)}")
-    print("-" * 50)
+    print(f"Total unique IDs in MASTER dedup index for cross-check: {len(unique_job_ids_master)}")
 
-    current_page = 1
+    # Incremental mode: newest ads first, stop once K known ads in a row were seen
+    watermark = WatermarkTracker(master_file_path, job_search_term, stop_after_known) if incremental else None
+    if watermark:
+        print(watermark.describe())
+    print("-" * 50)
 
-    # Getting the URL and accepting cookies and close banner
-    driver = get_driver()
-    driver.get("https://www.jobs.ch/de/")
-    accept_cookies_and_close_banner(driver)
+    current_page = checkpoint.page if resume_from_checkpoint else 1
+    start_card_index = checkpoint.card_index if resume_from_checkpoint else 0
+    watermark_reached = False
+    scrape_complete = False
+
+    # Upper bounds for the condition-based waits and per-step timing
+    timeouts = {**DEFAULT_WAIT_TIMEOUTS, **(wait_timeouts or {})}
+    profile = latency_profile if latency_profile is not None else LatencyProfile()
+
+    # Getting the URL and accepting cookies and close banner.
+    # A driver passed in (see driver_session) is reused as is and stays open for the next search term.
+    owns_driver = driver is None
+    if owns_driver:
+        driver = get_driver(profile=browser_profile)
+        driver.get(JOBS_CH_BASE_URL)
+        accept_cookies_and_close_banner(driver)
+    else:
+        driver.get(JOBS_CH_BASE_URL)
 
     # Search for the user-specified job title
     wait = WebDriverWait(driver, 5)
     try:
-        search_bar = wait.until(
-            EC.presence_of_element_located((By.XPATH, "//*[@id='synonym-typeahead-text-field']")))
-        search_bar.clear()
-        search_bar.send_keys(job_search_term)
-        search_bar.send_keys(Keys.RETURN)
-        time.sleep(5)
+        if incremental:
+            # The search bar has no sort option: open the date-sorted result list directly
+            with profile.measure("search"):
+                driver.get(build_search_page_url(job_search_term, 1, newest_first=True))
+        else:
+            search_bar = wait.until(
+                EC.presence_of_element_located((By.XPATH, SEARCH_BAR_XPATH)))
+            search_url = driver.current_url
+            search_bar.clear()
+            search_bar.send_keys(job_search_term)
+            with profile.measure("search"):
+                search_bar.send_keys(Keys.RETURN)
+                # Wait until the browser left the start page for the result list
+                wait_until(driver, timeouts["search"], EC.url_changes(search_url), "search results")
     except Exception as e:
         print(f"Error during initial search: {e}")
-        driver.quit()
+        if owns_driver: driver.quit()
+        unique_job_ids_master.close()
+        session_writer.close()
+        # In a batch (shared driver / seen IDs) only this term fails; the caller moves on to the next one
+        if not owns_driver or seen_ids is not None:
+            raise RuntimeError(f"Search for '{job_search_term}' failed: {e}") from e
         exit()
 
 
-    # --- HELPER FUNCTION FOR SKILL/TASK EXTRACTION ---
-    def extract_list(driver, wait, xpath, field_name, job_details):
-        """Handles extraction of a specific list (Tasks or Skills) using its XPath."""
-        extracted_items = []
-        job_details[field_name] = f"no {field_name.lower()} found on this job ad"
-
-        try:
-            elements = wait.until(
-                EC.presence_of_all_elements_located((By.XPATH, xpath))
-            )
-
-            for element in elements:
-                item_text = element.text.strip()
-                if item_text:
-                    extracted_items.append(item_text)
-
-            if extracted_items:
-                job_details[field_name] = " | ".join(extracted_items)
-                print(f"    -> Extracted {len(extracted_items)} {field_name}.")
-            else:
-                print(f"    -> No {field_name} list found.")
-
-        except TimeoutException:
-            print(f"    -> Warning: {field_name} list timed out (5s).")
-        except Exception as e:
-            print(f"    -> Error during {field_name} extraction: {e}")
+    # Resume: open the checkpointed result page directly via its URL page parameter
+    if current_page > 1:
+        with profile.measure("resume"):
+            driver.get(build_search_page_url(job_search_term, current_page, newest_first=incremental))
+        print(f"Jumped to result page {current_page} from checkpoint.")
 
+    # First list element of the detail pane, used to detect when the pane switches to the next ad
+    previous_list = None
 
     # --- JOB ITERATION AND SCRAPING MASTER LOOP (PAGINATION) ---
     while jobs_scraped_count < max_jobs_to_scrape:  # Uses the user-defined max_jobs_to_scrape
@@ -142,67 +354,60 @@ def scrape_jobs(job_search_term: str, max_jobs_to_scrape: int, save_file_path: P
         # SCROLL DOWN TO LOAD ALL JOBS ON THE CURRENT PAGE
         try:
             print("Scrolling page content to load all job links on this view...")
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
+            with profile.measure("scroll"):
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                # Wait until lazily loaded job links stopped appearing
+                wait_until(driver, timeouts["scroll"], job_link_count_stable(), "job links loaded")
         except Exception as e:
             print(f"Error during scrolling: {e}")
 
-        # LOCATE ALL JOB LINKS
+        # LOCATE ALL JOB CARDS (one round-trip for the whole page)
         try:
             wait.until(EC.presence_of_element_located((By.XPATH, JOB_LINK_XPATH)))
-            job_links_on_page = driver.find_elements(By.XPATH, JOB_LINK_XPATH)
+            with profile.measure("card_read"):
+                job_cards = read_job_cards(driver)
         except TimeoutException:
             print(f"No job ads found on page {current_page}. Stopping.")
             break
 
-        num_jobs_on_page = len(job_links_on_page)
+        num_jobs_on_page = len(job_cards)
         num_to_scrape_on_page = min(num_jobs_on_page, max_jobs_to_scrape - jobs_scraped_count)
 
         print(f"Found {num_jobs_on_page} links. Checking the next {num_to_scrape_on_page} job(s)...")
 
         # ITERATE AND SCRAPE JOBS
-        for i in range(num_jobs_on_page):
+        for i in range(start_card_index, num_jobs_on_page):
 
             if jobs_scraped_count >= max_jobs_to_scrape:
                 break
 
-            job_details = {"Job_Index": jobs_scraped_count + 1,
-                           "Job_Title": "N/A",
-                           "Company_Name": "N/A",
-                           "Job_Location": "N/A",
-                           "Tasks": "no tasks found on this job ad",
-                           "Skills": "no skills found on this job ad",
-                           "Job_Search_Term": job_search_term}
+            job_details = new_job_details(job_search_term, jobs_scraped_count + 1)
             unique_id = None
 
-            # NAVIGATION AND INITIAL EXTRACTION (FROM SEARCH RESULTS)
-            try:
-                job_links = wait.until(EC.presence_of_all_elements_located((By.XPATH, JOB_LINK_XPATH)))
-                current_link = job_links[i]
-
-                # Extract Title, Company, and Location
-                job_title = current_link.find_element(By.XPATH, JOB_TITLE_XPATH).text.strip()
-                company_name = current_link.find_element(By.XPATH, COMPANY_NAME_XPATH).text.strip()
-
-                try:
-                    location_element = current_link.find_element(By.XPATH, JOB_LOCATION_XPATH)
-                    job_location = location_element.text.strip()
-                    job_details["Job_Location"] = job_location
-                except NoSuchElementException:
-                    job_details["Job_Location"] = "Location N/A (Search View)"
+            # INITIAL EXTRACTION (FROM THE CARDS READ FOR THIS PAGE)
+            job_title = job_cards[i]["title"]
+            company_name = job_cards[i]["company"]
+            if not job_title or not company_name:
+                print(f"Could not extract basic info for job link at index {i}. Skipping.")
+                continue
 
-                unique_id = f"{job_title} | {company_name}"
+            job_details["Job_Location"] = job_cards[i]["location"]
+            unique_id = make_unique_id(job_title, company_name)
+            in_session = unique_id in unique_job_ids_session
+            in_master = not in_session and unique_id in unique_job_ids_master
 
-            except Exception as e:
-                print(f"Could not extract basic info for job link at index {i}. Skipping. Error: {e}")
-                continue
+            # INCREMENTAL MODE: K known ads in a row means everything below is already stored
+            if watermark and watermark.observe(unique_id, known=in_session or in_master):
+                print(f"  -> Watermark reached: {watermark.stop_after_known} known ads in a row. Stopping.")
+                watermark_reached = True
+                break
 
             # DUPLICATE CHECKS
-            if unique_id in unique_job_ids_session:
+            if in_session:
                 print(f"  -> Duplicate found in SESSION FILE: '{job_title[:50]}...' (Skipping)")
                 continue
 
-            if unique_id in unique_job_ids_master:
+            if in_master:
                 print(f"  -> Duplicate found in MASTER FILE: '{job_title[:50]}...' (Skipping)")
                 continue
 
@@ -214,43 +419,55 @@ def scrape_jobs(job_search_term: str, max_jobs_to_scrape: int, save_file_path: P
             print(
                 f"\n--- Scraping UNIQUE Job {jobs_scraped_count + 1}/{max_jobs_to_scrape}: {job_title[:100]} ({company_name[:50]})... ---")
 
+            ad_start = time.perf_counter()
             try:
-                # Click the job link to open details
-                driver.execute_script("arguments[0].click();", current_link)
-                time.sleep(3)  # Wait for the detail pane content to update
+                # Click the job link to open details and wait for the detail pane content to update
+                with profile.measure("detail_pane"):
+                    try:
+                        driver.execute_script("arguments[0].click();", job_cards[i]["element"])
+                    except StaleElementReferenceException:
+                        # The result list was re-rendered: read the cards again once and retry
+                        job_cards = read_job_cards(driver)
+                        driver.execute_script("arguments[0].click();", job_cards[i]["element"])
+                    wait_for_detail_pane(driver, previous_list, job_title, timeouts["detail"])
 
             except Exception as e:
                 print(f"Could not navigate to unique job ad. Skipping. Error: {e}")
                 continue
 
             # DUAL EXTRACTION LOGIC (TASKS and SKILLS)
-            extract_list(driver, wait, TASKS_XPATH, "Tasks", job_details)
-            extract_list(driver, wait, SKILLS_XPATH, "Skills", job_details)
+            with profile.measure("extract_lists"):
+                previous_list = extract_detail_lists(driver, job_details, timeouts["lists"])
+
+            # Keep the raw page for offline re-parsing (see reparse.py)
+            if html_cache is not None:
+                with profile.measure("html_cache"):
+                    cache_page(html_cache, job_cards[i]["url"], driver.page_source, job_details)
 
             # SAVE UNIQUE JOB
             scraped_data.append(job_details)
             unique_job_ids_session.add(unique_id)
-            unique_job_ids_master.add(unique_id)
             jobs_scraped_count += 1
 
             try:
-                df_new_job = pd.DataFrame([job_details])
-
-                # Save to Session-Specific CSV
-                session_file_exists = save_file_path.exists() and save_file_path.stat().st_size > 0
-                df_new_job.to_csv(save_file_path,
-                                  mode='a',
-                                  header=not session_file_exists,
-                                  index=False,
-                                  sep = CSV_DELIMITER)
+                # Save to Session-Specific CSV (buffered, flushed in batches); the cursor goes into the next checkpoint
+                checkpoint.mark(current_page, i + 1)
+                with profile.measure("save"):
+                    session_writer.write(job_details)
 
-                print(f"    -> UNIQUE Data Appended to Session CSVs. Total records: {jobs_scraped_count}")
+                print(f"    -> UNIQUE Data queued for Session CSV. Total records: {jobs_scraped_count}")
             except Exception as e:
                 print(f"WARNING: Could not save intermediate data to CSV. Error: {e}")
+            profile.record(AD_LATENCY_STEP, time.perf_counter() - ad_start)
 
         # PAGINATE
+        start_card_index = 0
         if jobs_scraped_count >= max_jobs_to_scrape:
             print(f"Limit of {max_jobs_to_scrape} jobs reached.")
+            scrape_complete = True
+            break
+        if watermark_reached:
+            scrape_complete = True
             break
 
         # Attempt to click the next page button
@@ -258,18 +475,38 @@ def scrape_jobs(job_search_term: str, max_jobs_to_scrape: int, save_file_path: P
             next_page_link = wait.until(
                 EC.element_to_be_clickable((By.XPATH, NEXT_PAGE_XPATH))
             )
-            driver.execute_script("arguments[0].click();", next_page_link)
+            with profile.measure("pagination"):
+                previous_url = driver.current_url
+                previous_first_link = find_first_job_link(driver)
+                driver.execute_script("arguments[0].click();", next_page_link)
+                wait_for_next_page(driver, previous_url, previous_first_link, timeouts["pagination"])
+                previous_list = find_first_detail_list(driver)
             print(f"Successfully moved to page {current_page + 1}.")
-            time.sleep(5)
             current_page += 1
+            # Rows of earlier pages are in the session CSV or its write-ahead file, so the cursor can move on
+            checkpoint.mark(current_page, 0)
+            checkpoint.save()
 
         except TimeoutException:
             print("No 'Next Page' found. All available results scraped.")
+            scrape_complete = True
             break
         except Exception as e:
             print(f"Error clicking the next page: {e}. Stopping pagination.")
             break
 
+    # Write the last partial batch
+    session_writer.close()
+
+    # A finished scrape starts at page 1 next time; an interrupted one keeps its checkpoint
+    if scrape_complete:
+        checkpoint.clear()
+
+    # Remember the head of the listing for the next incremental run
+    if watermark:
+        watermark.save()
+        print(f"Watermark saved for '{job_search_term}' ({watermark.new_ads} new ads seen).")
+
     # --- FINAL OUTPUT ---
     pd.set_option('display.width', 1000)
     df_skills = pd.DataFrame(scraped_data)
@@ -283,7 +520,10 @@ def scrape_jobs(job_search_term: str, max_jobs_to_scrape: int, save_file_path: P
         print("No new unique jobs were scraped in this session.")
     print("=" * 50)
 
-    if driver: driver.quit()
+    profile.print_summary(f"Latency Profile for '{job_search_term}'")
+
+    if driver and owns_driver: driver.quit()
+    unique_job_ids_master.close()
 
     return df_skills
 # --- STANDALONE EXECUTION BLOCK ---
@@ -0,0 +1,328 @@
+# ==========================================================
+# Jobs.ch Parallel Scraper (WebDriver Worker Pool)
+# ==========================================================
+# Goal:
+#   Scale the jobs.ch scraper across several Chrome instances so that
+#   large scrapes are no longer bound to a single browser.
+# Key Functionality:
+#   - Starts N worker threads, each driving its own WebDriver instance.
+#   - Workers take search result pages from a shared page queue and open
+#     them directly via the page URL parameter.
+#   - All workers share one thread-safe duplicate set (session + master IDs)
+#     and one job limit, so no ad is scraped twice.
+#   - A single writer thread assigns the Job_Index and appends to the session CSV in batches.
+#   - The number of browsers opening ads at the same time adapts to the observed
+#     latency and detail pane timeouts (AIMD, at most one per worker).
+#   - Reports the overall throughput in ads/minute and a per-step latency profile.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+import threading
+import queue
+import time
+import pandas as pd
+from pathlib import Path
+import argparse
+import re
+from .jobs_ch_base import get_driver, accept_cookies_and_close_banner
+from .jobs_scraping import (
+    JOBS_CH_BASE_URL, JOB_LINK_XPATH, NEXT_PAGE_XPATH, DEFAULT_WAIT_TIMEOUTS, MISSING_TASKS_TEXT, MISSING_SKILLS_TEXT,
+    build_search_page_url, new_job_details, make_unique_id, load_unique_ids, read_job_cards, extract_detail_lists,
+    job_link_count_stable, find_first_detail_list, wait_until, wait_for_detail_pane,
+)
+from .scrape_timing import LatencyProfile
+from .dedup_index import DedupIndex, open_dedup_index
+from .session_writer import SessionWriter
+from .html_cache import HtmlCache, cache_page
+from .concurrency_controller import AdaptiveConcurrency
+
+DEFAULT_WORKERS = 4
+
+
+# Thread-safe duplicate set shared by all workers: IDs seen in this session plus a lookup in the master index.
+# A worker must 'claim' an ID before scraping the ad; the claim also reserves one slot of the job limit.
+class SharedDedupSet:
+
+    def __init__(self, session_ids: set, master_index: DedupIndex, max_new_jobs: int):
+        self._lock = threading.Lock()
+        self._seen = set(session_ids)
+        self._master_index = master_index
+        self._reserved = 0
+        self.max_new_jobs = max_new_jobs
+
+    def __contains__(self, unique_id):
+        with self._lock:
+            return unique_id in self._seen or unique_id in self._master_index
+
+    def claim(self, unique_id: str) -> bool:
+        """Returns True if the ID is new and a slot of the job limit was reserved for it."""
+        with self._lock:
+            if self._reserved >= self.max_new_jobs:
+                return False
+            if unique_id in self._seen or unique_id in self._master_index:
+                return False
+            self._seen.add(unique_id)
+            self._reserved += 1
+            return True
+
+    def release(self, unique_id: str):
+        """Gives back the ID and its slot if the ad could not be scraped."""
+        with self._lock:
+            if unique_id in self._seen:
+                self._seen.discard(unique_id)
+                self._reserved -= 1
+
+    def is_full(self) -> bool:
+        with self._lock:
+            return self._reserved >= self.max_new_jobs
+
+
+# Shared queue of search result pages.
+# Pages are handed out in order; once a worker sees the last page, no higher page is handed out anymore.
+class SearchPageQueue:
+
+    def __init__(self, first_page: int = 1):
+        self._lock = threading.Lock()
+        self._next_page = first_page
+        self._last_page = None
+
+    def get(self):
+        """Returns the next page number to scrape, or None if all pages are taken."""
+        with self._lock:
+            if self._last_page is not None and self._next_page > self._last_page:
+                return None
+            page = self._next_page
+            self._next_page += 1
+            return page
+
+    def mark_last_page(self, page: int):
+        with self._lock:
+            if self._last_page is None or page < self._last_page:
+                self._last_page = page
+
+
+def ads_per_minute(ads_count: int, elapsed_seconds: float) -> float:
+    if elapsed_seconds <= 0:
+        return 0.0
+    return ads_count / elapsed_seconds * 60
+
+
+# --- WORKER: ONE BROWSER, MANY RESULT PAGES ---
+def _scrape_worker(worker_id: int, job_search_term: str, pages: SearchPageQueue,
+                   dedup: SharedDedupSet, results: queue.Queue, timeouts: dict, profile: LatencyProfile,
+                   browser_profile: str, concurrency: AdaptiveConcurrency, html_cache: HtmlCache = None):
+    prefix = f"[W{worker_id}]"
+    driver = None
+
+    try:
+        driver = get_driver(profile=browser_profile)
+        driver.get(JOBS_CH_BASE_URL)
+        accept_cookies_and_close_banner(driver)
+        wait = WebDriverWait(driver, 5)
+
+        while not dedup.is_full():
+            page = pages.get()
+            if page is None:
+                break
+
+            # Open the result page directly and scroll down to load all job links
+            with profile.measure("page_load"):
+                driver.get(build_search_page_url(job_search_term, page))
+            try:
+                with profile.measure("scroll"):
+                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                    wait_until(driver, timeouts["scroll"], job_link_count_stable(), "job links loaded")
+            except Exception as e:
+                print(f"{prefix} Error during scrolling: {e}")
+
+            try:
+                wait.until(EC.presence_of_element_located((By.XPATH, JOB_LINK_XPATH)))
+                with profile.measure("card_read"):
+                    job_cards = read_job_cards(driver)
+                num_jobs_on_page = len(job_cards)
+            except TimeoutException:
+                print(f"{prefix} No job ads found on page {page}. Marking it as the end of the results.")
+                pages.mark_last_page(page - 1)
+                continue
+
+            print(f"{prefix} Page {page}: found {num_jobs_on_page} links.")
+            previous_list = find_first_detail_list(driver)
+
+            for job_card in job_cards:
+                if dedup.is_full():
+                    break
+
+                job_details = new_job_details(job_search_term)
+                job_title, company_name, job_location = job_card["title"], job_card["company"], job_card["location"]
+                if not job_title or not company_name:
+                    print(f"{prefix} Could not extract basic info for a job card on page {page}. Skipping.")
+                    continue
+                unique_id = make_unique_id(job_title, company_name)
+
+                if not dedup.claim(unique_id):
+                    print(f"{prefix}  -> Duplicate or limit reached: '{job_title[:50]}...' (Skipping)")
+                    continue
+
+                job_details["Job_Title"] = job_title
+                job_details["Company_Name"] = company_name
+                job_details["Job_Location"] = job_location
+
+                # Opening the ad waits for a slot; a pane timeout or an ad without any list counts as an error
+                with concurrency.slot() as outcome:
+                    try:
+                        with profile.measure("detail_pane"):
+                            driver.execute_script("arguments[0].click();", job_card["element"])
+                            wait_for_detail_pane(driver, previous_list, job_title, timeouts["detail"])
+                    except Exception as e:
+                        print(f"{prefix} Could not navigate to unique job ad. Skipping. Error: {e}")
+                        outcome["ok"] = False
+                        dedup.release(unique_id)
+                        continue
+
+                    with profile.measure("extract_lists"):
+                        previous_list = extract_detail_lists(driver, job_details, timeouts["lists"])
+                    outcome["ok"] = (job_details["Tasks"] != MISSING_TASKS_TEXT
+                                     or job_details["Skills"] != MISSING_SKILLS_TEXT)
+                if html_cache is not None:
+                    cache_page(html_cache, job_card["url"], driver.page_source, job_details)
+
+                results.put(job_details)
+
+            # No paginator on this page means it is the last one
+            if not driver.find_elements(By.XPATH, NEXT_PAGE_XPATH):
+                pages.mark_last_page(page)
+
+    except Exception as e:
+        print(f"{prefix} WORKER FAILED: {e}")
+    finally:
+        if driver: driver.quit()
+
+
+# --- WRITER: SINGLE CONSUMER OF ALL WORKER RESULTS ---
+def _result_writer(results: queue.Queue, session_writer: SessionWriter, first_job_index: int,
+                   scraped_data: list, start_time: float):
+    next_job_index = first_job_index
+
+    while True:
+        job_details = results.get()
+        if job_details is None:
+            break
+
+        job_details["Job_Index"] = next_job_index
+        next_job_index += 1
+        scraped_data.append(job_details)
+
+        try:
+            session_writer.write(job_details)
+        except Exception as e:
+            print(f"WARNING: Could not save intermediate data to CSV. Error: {e}")
+
+        rate = ads_per_minute(len(scraped_data), time.time() - start_time)
+        print(f"    -> Saved job {job_details['Job_Index']}: {job_details['Job_Title'][:60]} "
+              f"({len(scraped_data)} new, {rate:.1f} ads/min)")
+
+
+def scrape_jobs_parallel(job_search_term: str, max_jobs_to_scrape: int, save_file_path: Path,
+                         master_file_path: Path, workers: int = DEFAULT_WORKERS,
+                         wait_timeouts: dict = None, latency_profile: LatencyProfile = None,
+                         browser_profile: str = "default", html_cache: HtmlCache = None, adaptive: bool = True):
+
+    # --- INITIAL DATA LOADING ---
+    session_writer = SessionWriter(save_file_path)
+    unique_job_ids_session = load_unique_ids(save_file_path)
+    jobs_scraped_count = len(unique_job_ids_session)
+    unique_job_ids_master = open_dedup_index(master_file_path)
+
+    print("-" * 50)
+    if jobs_scraped_count > 0:
+        print(f"RESUMING SCRAPE for '{job_search_term}': Loaded {jobs_scraped_count} existing records from session file.")
+    else:
+        print(f"Starting fresh scrape for: '{job_search_term}'.")
+    print(f"Targeting {max_jobs_to_scrape} total jobs with {workers} parallel browser(s).")
+    print(f"Total unique IDs in MASTER dedup index for cross-check: {len(unique_job_ids_master)}")
+    print("-" * 50)
+
+    remaining_jobs = max_jobs_to_scrape - jobs_scraped_count
+    if remaining_jobs <= 0:
+        print(f"Limit of {max_jobs_to_scrape} jobs already reached in the session file.")
+        unique_job_ids_master.close()
+        session_writer.close()
+        return pd.DataFrame()
+
+    dedup = SharedDedupSet(unique_job_ids_session, unique_job_ids_master, remaining_jobs)
+    pages = SearchPageQueue()
+    results = queue.Queue()
+    scraped_data = []
+    timeouts = {**DEFAULT_WAIT_TIMEOUTS, **(wait_timeouts or {})}
+    profile = latency_profile if latency_profile is not None else LatencyProfile()
+    # All browsers may open ads at the start; the controller backs off if jobs.ch slows down
+    concurrency = AdaptiveConcurrency(workers, min_limit=1 if adaptive else workers, max_limit=workers)
+
+    # --- START WRITER AND WORKERS ---
+    start_time = time.time()
+    writer = threading.Thread(target=_result_writer,
+                              args=(results, session_writer, jobs_scraped_count + 1, scraped_data, start_time),
+                              name="session-writer")
+    writer.start()
+
+    worker_threads = [
+        threading.Thread(target=_scrape_worker,
+                         args=(worker_id, job_search_term, pages, dedup, results, timeouts, profile, browser_profile,
+                               concurrency, html_cache),
+                         name=f"scrape-worker-{worker_id}")
+        for worker_id in range(1, workers + 1)
+    ]
+    for thread in worker_threads:
+        thread.start()
+    for thread in worker_threads:
+        thread.join()
+
+    # All workers are done: stop the writer once the queue is drained
+    results.put(None)
+    writer.join()
+    session_writer.close()
+    elapsed = time.time() - start_time
+    unique_job_ids_master.close()
+
+    # --- FINAL OUTPUT ---
+    df_skills = pd.DataFrame(scraped_data)
+
+    print("\n" + "=" * 50)
+    print(f"Successfully scraped {len(df_skills)} NEW job ads for '{job_search_term}' with {workers} worker(s).")
+    print(f"Elapsed time: {elapsed:.1f}s | Throughput: {ads_per_minute(len(df_skills), elapsed):.1f} ads/min")
+    print("=" * 50)
+
+    profile.print_summary(f"Latency Profile for '{job_search_term}' (all workers)")
+    concurrency.print_summary(f"Browsers Opening Ads for '{job_search_term}'")
+
+    return df_skills
+
+
+# --- STANDALONE EXECUTION BLOCK ---
+if __name__ == "__main__":
+
+    print("--- RUNNING PARALLEL SCRAPER IN STANDALONE TEST MODE ---")
+
+    parser = argparse.ArgumentParser(description="Scrape jobs.ch with several browsers in parallel.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of parallel browsers.")
+    args = parser.parse_args()
+
+    job_search_term = input("Enter the job title you want to scrape (e.g., Data Scientist): ")
+    MAX_JOBS_TO_SCRAPE_TEST = int(input("Enter the maximum number of jobs to scrape (e.g., 50): "))
+
+    PROJECT_ROOT_TEST = Path(__file__).resolve().parent.parent.parent
+    RAW_DATA_DIR_TEST = PROJECT_ROOT_TEST / "data" / "raw"
+    RAW_DATA_DIR_TEST.mkdir(parents=True, exist_ok=True)
+
+    safe_job_name = re.sub(r'\s+', '_', job_search_term.strip().lower())
+    safe_job_name = re.sub(r'[^a-z0-9_]', '', safe_job_name)
+
+    TEST_SAVE_FILE_PATH = RAW_DATA_DIR_TEST / f"jobs_ch_{safe_job_name}_skills.csv"
+    TEST_MASTER_FILE_PATH = RAW_DATA_DIR_TEST / "jobs_ch_skills_all.csv"
+
+    scrape_jobs_parallel(job_search_term, MAX_JOBS_TO_SCRAPE_TEST, TEST_SAVE_FILE_PATH, TEST_MASTER_FILE_PATH,
+                         workers=args.workers)
@@ -0,0 +1,28 @@
+# ==========================================================
+# Advisory Lock for the Master Dataset
+# ==========================================================
+# Goal:
+#   Let several scrape sessions on one host merge into the same master
+#   CSV at the same time without computing the same start Job_Index or
+#   interleaving their appended rows.
+# Key Functionality:
+#   - Exclusive lock on a '<master>.lock' file next to the master CSV
+#     (see src.storage.file_lock).
+#   - Blocks until the lock is free (optional timeout) and reports the wait time.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from pathlib import Path
+from src.storage.file_lock import file_lock, FileLockTimeout
+
+LOCK_SUFFIX = ".lock"
+MasterLockTimeout = FileLockTimeout
+
+
+def master_lock_path(master_file_path: Path) -> Path:
+    return master_file_path.with_name(master_file_path.name + LOCK_SUFFIX)
+
+
+def master_lock(master_file_path: Path, timeout: float = None):
+    """Holds the exclusive merge lock of a master file. Yields the seconds spent waiting for it."""
+    return file_lock(master_lock_path(master_file_path), timeout)
@@ -0,0 +1,91 @@
+# ==========================================================
+# Master File Manifest (next Job_Index without a full scan)
+# ==========================================================
+# Goal:
+#   Keep the cost of finding the next 'Job_Index' constant as the master
+#   CSV grows, instead of parsing the whole Job_Index column on every merge.
+# Key Functionality:
+#   - Small JSON sidecar next to the master CSV (e.g. jobs_ch_skills_all.manifest.json)
+#     with row count, max Job_Index, byte size and a checksum of the file tail.
+#   - Trusted only if byte size and tail checksum still match the master file;
+#     otherwise the master is scanned once and the manifest is rewritten.
+#   - Updated atomically (temp file + rename) by every merge.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from pathlib import Path
+import hashlib
+import json
+import os
+import pandas as pd
+
+CSV_DELIMITER = ';'
+MANIFEST_SUFFIX = ".manifest.json"
+# Only the end of the file is hashed: the master is append-only, so a changed tail or size means a changed file
+TAIL_CHECKSUM_BYTES = 64 * 1024
+
+
+def manifest_path(master_file_path: Path) -> Path:
+    return master_file_path.with_suffix(MANIFEST_SUFFIX)
+
+
+def tail_checksum(master_file_path: Path) -> str:
+    """SHA-256 of the last TAIL_CHECKSUM_BYTES of the file (constant time for any file size)."""
+    size = master_file_path.stat().st_size
+    with open(master_file_path, "rb") as master_file:
+        master_file.seek(max(0, size - TAIL_CHECKSUM_BYTES))
+        return hashlib.sha256(master_file.read()).hexdigest()
+
+
+def read_manifest(master_file_path: Path):
+    """Returns the manifest if it matches the current master file, otherwise None."""
+    path = manifest_path(master_file_path)
+    if not path.exists() or not master_file_path.exists():
+        return None
+    try:
+        with open(path, encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        if (manifest.get("size_bytes") != master_file_path.stat().st_size
+                or manifest.get("tail_sha256") != tail_checksum(master_file_path)):
+            return None
+        return manifest
+    except (json.JSONDecodeError, OSError):
+        return None
+
+
+def write_manifest(master_file_path: Path, row_count: int, max_job_index: int):
+    manifest = {"row_count": int(row_count),
+                "max_job_index": int(max_job_index),
+                "size_bytes": master_file_path.stat().st_size,
+                "tail_sha256": tail_checksum(master_file_path)}
+    path = manifest_path(master_file_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def rebuild_manifest(master_file_path: Path):
+    """Full scan of the Job_Index column (fallback when the manifest is missing or out of sync)."""
+    df_master = pd.read_csv(master_file_path, sep=CSV_DELIMITER, usecols=["Job_Index"])
+    max_job_index = int(df_master["Job_Index"].max()) if not df_master.empty else 0
+    return write_manifest(master_file_path, len(df_master), max_job_index)
+
+
+# Called after an append: extends the manifest if it described the file before the append, else rebuilds it
+def update_manifest_after_merge(master_file_path: Path, appended_rows: int, last_job_index: int,
+                                master_size_before: int):
+    path = manifest_path(master_file_path)
+    previous = None
+    if path.exists():
+        try:
+            with open(path, encoding="utf-8") as manifest_file:
+                previous = json.load(manifest_file)
+        except (json.JSONDecodeError, OSError):
+            previous = None
+
+    if previous is not None and previous.get("size_bytes") == master_size_before:
+        return write_manifest(master_file_path, previous["row_count"] + appended_rows,
+                              max(previous["max_job_index"], last_job_index))
+    return rebuild_manifest(master_file_path)
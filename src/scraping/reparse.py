@@ -0,0 +1,126 @@
+# ==========================================================
+# Offline Re-Parse from the Raw HTML Cache
+# ==========================================================
+# Goal:
+#   Rebuild the scraped job data from the cached job ad HTML after a
+#   change of TASKS_XPATH / SKILLS_XPATH or the extraction logic, without
+#   touching jobs.ch again.
+# Key Functionality:
+#   - Takes the latest cached fetch of every ad URL (optionally one search term).
+#   - Re-extracts Tasks and Skills in a process pool (CPU-bound work).
+#   - Uses the Selenium XPaths 1:1 through lxml; falls back to the
+#     BeautifulSoup list parser if lxml is not installed.
+#   - Writes a session-style CSV (same schema as the scrapers, Job_Index 1..n).
+#     It is not a master file: merge it into a new master file with
+#     csv_merging, which assigns the master Job_Index values.
+# Execution:
+#   python -m src.scraping.reparse --output data/raw/jobs_ch_skills_all_reparsed.csv
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import os
+import time
+import pandas as pd
+from .html_cache import HtmlCache, read_cached_html
+from .jobs_scraping import (
+    TASKS_XPATH, SKILLS_XPATH, SESSION_COLUMNS, CSV_DELIMITER, MISSING_TASKS_TEXT, MISSING_SKILLS_TEXT,
+    new_job_details,
+)
+from .jobs_http_fetcher import parse_job_detail_html, apply_detail_lists
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+REPARSE_CHUNK_SIZE = 32
+
+
+def extract_lists_from_html(html: str):
+    """Returns (tasks, skills) of a cached page, evaluated with the same XPaths as the Selenium scraper."""
+    if not LXML_AVAILABLE:
+        return parse_job_detail_html(html)
+
+    tree = lxml.html.fromstring(html)
+
+    def items_at(xpath):
+        texts = (" ".join(li.text_content().split()) for li in tree.xpath(xpath))
+        return [text for text in texts if text]
+
+    return items_at(TASKS_XPATH), items_at(SKILLS_XPATH)
+
+
+# Runs in the worker processes: read, decompress and parse one cached page
+def _reparse_page(cache_dir: str, content_hash: str):
+    try:
+        return extract_lists_from_html(read_cached_html(Path(cache_dir), content_hash))
+    except Exception as e:
+        print(f"WARNING: Could not re-parse cached page {content_hash[:12]}. Error: {e}")
+        return [], []
+
+
+def reparse_cache(cache_dir: Path, output_file_path: Path, search_term: str = None, workers: int = None):
+    with HtmlCache(cache_dir) as html_cache:
+        entries = html_cache.latest_entries(search_term)
+
+    print("-" * 50)
+    print(f"Re-parsing {len(entries)} cached job ads from {cache_dir}"
+          + (f" (search term '{search_term}')" if search_term else "") + ".")
+    print(f"Parser: {'lxml XPath' if LXML_AVAILABLE else 'BeautifulSoup fallback'} | "
+          f"Processes: {workers or os.cpu_count()}")
+    print("-" * 50)
+
+    if not entries:
+        print("Nothing to re-parse.")
+        return pd.DataFrame(columns=SESSION_COLUMNS)
+
+    start_time = time.time()
+    cache_dirs = [str(cache_dir)] * len(entries)
+    content_hashes = [entry["content_hash"] for entry in entries]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parsed = list(executor.map(_reparse_page, cache_dirs, content_hashes, chunksize=REPARSE_CHUNK_SIZE))
+
+    records = []
+    # Session numbering, like a scraper session; the master Job_Index is assigned by the merge
+    for job_index, (entry, (tasks, skills)) in enumerate(zip(entries, parsed), start=1):
+        metadata = entry["metadata"]
+        job_details = new_job_details(metadata.get("Job_Search_Term") or "", job_index)
+        for key in ("Job_Title", "Company_Name", "Job_Location"):
+            if metadata.get(key):
+                job_details[key] = metadata[key]
+        apply_detail_lists(job_details, tasks, skills)
+        records.append(job_details)
+
+    df_reparsed = pd.DataFrame(records, columns=SESSION_COLUMNS)
+    output_file_path.parent.mkdir(parents=True, exist_ok=True)
+    df_reparsed.to_csv(output_file_path, index=False, sep=CSV_DELIMITER)
+
+    elapsed = time.time() - start_time
+    with_lists = ((df_reparsed["Tasks"] != MISSING_TASKS_TEXT) | (df_reparsed["Skills"] != MISSING_SKILLS_TEXT)).sum()
+    print(f"Re-parsed {len(df_reparsed)} ads in {elapsed:.1f}s ({with_lists} with Tasks or Skills). "
+          f"Saved to: {output_file_path}")
+    return df_reparsed
+
+
+# --- STANDALONE EXECUTION BLOCK ---
+if __name__ == "__main__":
+
+    PROJECT_ROOT_TEST = Path(__file__).resolve().parent.parent.parent
+    RAW_DATA_DIR_TEST = PROJECT_ROOT_TEST / "data" / "raw"
+
+    parser = argparse.ArgumentParser(description="Rebuild a job CSV from the raw HTML cache.")
+    parser.add_argument("--cache-dir", type=Path, default=RAW_DATA_DIR_TEST / "html_cache",
+                        help="HTML cache directory (default: data/raw/html_cache).")
+    parser.add_argument("--output", type=Path, default=RAW_DATA_DIR_TEST / "jobs_ch_skills_all_reparsed.csv",
+                        help="Session-style CSV to write (merge it into a new master file afterwards). "
+                             "Do not point it at the master file: Job_Index is renumbered from 1.")
+    parser.add_argument("--term", default=None, help="Only re-parse ads of this search term.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes (default: CPU count).")
+    args = parser.parse_args()
+
+    reparse_cache(args.cache_dir, args.output, search_term=args.term, workers=args.workers)
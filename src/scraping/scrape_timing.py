@@ -0,0 +1,86 @@
+# ==========================================================
+# Scraper Latency Profile
+# ==========================================================
+# Goal:
+#   Record how long each scraping step takes (search, scrolling,
+#   detail pane update, list extraction, pagination, ...) so we can
+#   see where the wall-clock time of a scrape goes.
+# Key Functionality:
+#   - Thread-safe collection of per-step durations.
+#   - Percentile summary (p50 / p90 / p99 / max) per step as a DataFrame.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from collections import defaultdict
+from contextlib import contextmanager
+import threading
+import time
+import math
+import pandas as pd
+
+# Step name under which every scraper records the full time spent on one job ad
+AD_LATENCY_STEP = "ad_total"
+
+
+# Nearest-rank percentile of an already sorted list
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LatencyProfile:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(list)
+
+    def record(self, step: str, seconds: float):
+        with self._lock:
+            self._samples[step].append(seconds)
+
+    @contextmanager
+    def measure(self, step: str):
+        """Context manager that records the duration of the enclosed block under 'step'."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(step, time.perf_counter() - start)
+
+    def samples(self, step: str) -> list:
+        with self._lock:
+            return list(self._samples.get(step, []))
+
+    def percentiles(self, step: str, quantiles=(50, 90, 99)) -> dict:
+        values = sorted(self.samples(step))
+        return {q: percentile(values, q) for q in quantiles}
+
+    def summary(self) -> pd.DataFrame:
+        """Returns one row per step with count, total time and latency percentiles in milliseconds."""
+        with self._lock:
+            steps = {step: sorted(values) for step, values in self._samples.items()}
+
+        rows = []
+        for step, values in steps.items():
+            rows.append({"Step": step,
+                         "Count": len(values),
+                         "Total_s": round(sum(values), 2),
+                         "p50_ms": round(percentile(values, 50) * 1000, 1),
+                         "p90_ms": round(percentile(values, 90) * 1000, 1),
+                         "p99_ms": round(percentile(values, 99) * 1000, 1),
+                         "Max_ms": round(values[-1] * 1000, 1)})
+
+        df_summary = pd.DataFrame(rows, columns=["Step", "Count", "Total_s", "p50_ms", "p90_ms", "p99_ms", "Max_ms"])
+        return df_summary.sort_values("Total_s", ascending=False)
+
+    def print_summary(self, title: str = "Latency Profile"):
+        df_summary = self.summary()
+        print("-" * 50)
+        print(f"--- {title} ---")
+        if df_summary.empty:
+            print("No timings recorded.")
+        else:
+            print(df_summary.to_string(index=False))
+        print("-" * 50)
@@ -0,0 +1,242 @@
+# ==========================================================
+# Buffered Session CSV Writer
+# ==========================================================
+# Goal:
+#   Remove the per-ad DataFrame construction and file open/close of
+#   the scrapers while keeping the crash-resume guarantee of the
+#   session CSV.
+# Key Functionality:
+#   - Buffers scraped rows and appends them to the session CSV in batches
+#     (row-count or time threshold, at close, at exit and on SIGINT/SIGTERM).
+#     A background thread enforces the time threshold while no new rows arrive
+#     (e.g. the scraper waits on a slow page).
+#   - Every row is first appended as one JSON line to a write-ahead file
+#     ('<session>.csv.wal'), which is emptied after each flushed batch.
+#   - On start, rows left in the write-ahead file by a crashed run are
+#     replayed into the session CSV (rows already in the CSV are skipped).
+#   - Optional callback after every flushed batch (used for the page checkpoint).
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from contextlib import contextmanager
+from pathlib import Path
+import atexit
+import json
+import signal
+import threading
+import time
+import pandas as pd
+
+CSV_DELIMITER = ';'
+DEFAULT_BATCH_SIZE = 25
+DEFAULT_FLUSH_INTERVAL_SECONDS = 30.0
+# How long a signal waits for a flush running in another thread before it is deferred
+SIGNAL_LOCK_TIMEOUT_SECONDS = 2.0
+
+
+def wal_path_for(save_file_path: Path) -> Path:
+    return save_file_path.with_name(save_file_path.name + ".wal")
+
+
+class SessionWriter:
+
+    def __init__(self, save_file_path: Path, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS, on_flush=None):
+        self.save_file_path = Path(save_file_path)
+        self.wal_path = wal_path_for(self.save_file_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.on_flush = on_flush
+
+        # Not reentrant: a signal arriving inside write/flush must not start a second flush
+        self._lock = threading.Lock()
+        self._lock_owner = None
+        self._pending_signal = None
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._closed = False
+
+        # Replay what a crashed run left behind before new rows are accepted
+        self.recover()
+        self._wal = open(self.wal_path, "a", encoding="utf-8")
+
+        atexit.register(self.close)
+        self._previous_handlers = {}
+        self._install_signal_handlers()
+
+        self._stop_timer = threading.Event()
+        self._timer = None
+        if flush_interval and flush_interval > 0:
+            self._timer = threading.Thread(target=self._flush_periodically, name="session-writer-flush", daemon=True)
+            self._timer.start()
+
+    # --- CRASH RECOVERY ---
+    def recover(self) -> int:
+        """Appends rows from an existing write-ahead file that are not in the session CSV yet."""
+        if not self.wal_path.exists() or self.wal_path.stat().st_size == 0:
+            return 0
+
+        pending_rows = []
+        with open(self.wal_path, encoding="utf-8") as wal_file:
+            for line in wal_file:
+                try:
+                    pending_rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A line cut off by the crash: that ad was never acknowledged, it will be scraped again
+                    continue
+
+        existing_ids = set()
+        if self.save_file_path.exists() and self.save_file_path.stat().st_size > 0:
+            df_existing = pd.read_csv(self.save_file_path, sep=CSV_DELIMITER, usecols=["Job_Title", "Company_Name"])
+            existing_ids = set(zip(df_existing["Job_Title"].astype(str), df_existing["Company_Name"].astype(str)))
+
+        rows_to_restore = [row for row in pending_rows
+                           if (str(row.get("Job_Title")), str(row.get("Company_Name"))) not in existing_ids]
+        self._append_rows(rows_to_restore)
+        self.wal_path.unlink()
+
+        if rows_to_restore:
+            print(f"Recovered {len(rows_to_restore)} unsaved record(s) from {self.wal_path.name}.")
+        return len(rows_to_restore)
+
+    # --- WRITING ---
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            self._lock_owner = threading.get_ident()
+            try:
+                yield
+            finally:
+                self._lock_owner = None
+
+    def write(self, job_details: dict):
+        """Logs the row to the write-ahead file and buffers it for the next batch."""
+        with self._locked():
+            self._wal.write(json.dumps(job_details, ensure_ascii=False) + "\n")
+            self._wal.flush()
+            self._buffer.append(dict(job_details))
+
+            batch_full = len(self._buffer) >= self.batch_size
+            interval_passed = time.monotonic() - self._last_flush >= self.flush_interval
+            if batch_full or interval_passed:
+                self._flush_locked()
+        self._handle_pending_signal()
+
+    def flush(self):
+        with self._locked():
+            self._flush_locked()
+        self._handle_pending_signal()
+
+    # Time threshold without new rows: checked a few times per interval, so no row waits much longer than it
+    def _flush_periodically(self):
+        while not self._stop_timer.wait(max(0.1, self.flush_interval / 4)):
+            with self._locked():
+                if self._closed or not self._buffer or time.monotonic() - self._last_flush < self.flush_interval:
+                    continue
+                try:
+                    self._flush_locked()
+                except Exception as e:
+                    # The rows stay in the buffer and the write-ahead file; the next flush tries again
+                    print(f"WARNING: Timed flush of the session CSV failed. Error: {e}")
+
+    def _flush_locked(self):
+        if self._buffer:
+            self._append_rows(self._buffer)
+            self.rows_written += len(self._buffer)
+            print(f"    -> Flushed {len(self._buffer)} record(s) to session CSV. Total written: {self.rows_written}")
+            self._buffer = []
+            # The batch is in the CSV now, so the write-ahead file can be emptied
+            self._wal.seek(0)
+            self._wal.truncate()
+            if self.on_flush is not None:
+                try:
+                    self.on_flush(self.rows_written)
+                except Exception as e:
+                    print(f"WARNING: Flush callback failed. Error: {e}")
+        self._last_flush = time.monotonic()
+
+    def _append_rows(self, rows: list):
+        if not rows:
+            return
+        session_file_exists = self.save_file_path.exists() and self.save_file_path.stat().st_size > 0
+        pd.DataFrame(rows).to_csv(self.save_file_path,
+                                  mode='a',
+                                  header=not session_file_exists,
+                                  index=False,
+                                  sep=CSV_DELIMITER)
+
+    # --- SHUTDOWN ---
+    def close(self):
+        self._stop_timer.set()
+        if self._timer is not None and self._timer is not threading.current_thread():
+            self._timer.join()
+        with self._locked():
+            if self._closed:
+                return
+            self._flush_locked()
+            self._wal.close()
+            if self.wal_path.exists() and self.wal_path.stat().st_size == 0:
+                self.wal_path.unlink()
+            self._closed = True
+
+        atexit.unregister(self.close)
+        pending_signal, self._pending_signal = self._pending_signal, None
+        try:
+            # A signal that arrived during the final flush is passed on now, with the previous handlers
+            if pending_signal is not None:
+                self._forward_signal(*pending_signal)
+        finally:
+            self._restore_signal_handlers()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _install_signal_handlers(self):
+        # Signal handlers can only be set from the main thread
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            self._previous_handlers[signum] = signal.signal(signum, self._handle_signal)
+
+    def _restore_signal_handlers(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+        self._previous_handlers = {}
+
+    def _handle_signal(self, signum, frame):
+        # Interrupted in the middle of write/flush on this thread: let it finish, the signal is handled right after.
+        # A flush of the timer thread is waited for.
+        interrupted_own_flush = self._lock_owner == threading.get_ident()
+        if interrupted_own_flush or not self._lock.acquire(timeout=SIGNAL_LOCK_TIMEOUT_SECONDS):
+            self._pending_signal = (signum, frame)
+            return
+        try:
+            print(f"\nSignal {signum} received. Flushing buffered records before stopping...")
+            if not self._closed:
+                self._flush_locked()
+        finally:
+            self._lock.release()
+        self._forward_signal(signum, frame)
+
+    def _handle_pending_signal(self):
+        # Signals are delivered to the main thread, so they are also re-raised there
+        if self._pending_signal is None or threading.current_thread() is not threading.main_thread():
+            return
+        signum, frame = self._pending_signal
+        self._pending_signal = None
+        self._handle_signal(signum, frame)
+
+    def _forward_signal(self, signum, frame):
+        previous_handler = self._previous_handlers.get(signum)
+        if callable(previous_handler):
+            previous_handler(signum, frame)
+        elif signum == signal.SIGINT:
+            raise KeyboardInterrupt
+        else:
+            raise SystemExit(128 + signum)
@@ -0,0 +1,94 @@
+# ==========================================================
+# Incremental Scraping Watermarks
+# ==========================================================
+# Goal:
+#   Let daily re-runs of the same search only touch the new head of the
+#   result list instead of re-walking every ad that is already stored.
+# Key Functionality:
+#   - Assumes newest-first ordering of the result list (sort by date).
+#   - Counts consecutive already-known ads; after K in a row the scraper stops paging.
+#     A streak (instead of the first known ad) tolerates promoted ads pinned to the top.
+#   - Persists one watermark per search term (head IDs of the last run, timestamp,
+#     number of new ads) in a JSON file next to the master CSV.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import os
+import re
+
+WATERMARK_FILE_NAME = "jobs_ch_watermarks.json"
+DEFAULT_STOP_AFTER_KNOWN = 20   # K consecutive known ads end the scrape
+WATERMARK_HEAD_SIZE = 50        # IDs from the top of the list remembered per search term
+
+
+def watermark_file_path(master_file_path: Path) -> Path:
+    return master_file_path.with_name(WATERMARK_FILE_NAME)
+
+
+def watermark_key(job_search_term: str) -> str:
+    return re.sub(r'\s+', ' ', job_search_term.strip().lower())
+
+
+def load_watermarks(watermark_path: Path) -> dict:
+    if not watermark_path.exists():
+        return {}
+    try:
+        with open(watermark_path, encoding="utf-8") as watermark_file:
+            return json.load(watermark_file)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"WARNING: Could not read watermarks from {watermark_path}. Starting without. Error: {e}")
+        return {}
+
+
+class WatermarkTracker:
+
+    def __init__(self, master_file_path: Path, job_search_term: str,
+                 stop_after_known: int = DEFAULT_STOP_AFTER_KNOWN):
+        self.watermark_path = watermark_file_path(master_file_path)
+        self.key = watermark_key(job_search_term)
+        self.stop_after_known = stop_after_known
+
+        previous = load_watermarks(self.watermark_path).get(self.key, {})
+        self.previous_head_ids = set(previous.get("last_seen_ids", []))
+        self.previous_run = previous.get("last_run")
+
+        self.known_streak = 0
+        self.new_ads = 0
+        self.head_ids = []
+
+    def describe(self) -> str:
+        if self.previous_run:
+            return (f"Incremental mode: last run {self.previous_run}, stopping after "
+                    f"{self.stop_after_known} consecutive known ads.")
+        return f"Incremental mode: no watermark yet for '{self.key}', stopping after {self.stop_after_known} known ads."
+
+    def observe(self, unique_id: str, known: bool) -> bool:
+        """Registers one card in listing order. Returns True once the known-ads streak reached K."""
+        if len(self.head_ids) < WATERMARK_HEAD_SIZE and unique_id not in self.head_ids:
+            self.head_ids.append(unique_id)
+
+        if known or unique_id in self.previous_head_ids:
+            self.known_streak += 1
+        else:
+            self.known_streak = 0
+            self.new_ads += 1
+        return self.known_streak >= self.stop_after_known
+
+    def save(self):
+        """Stores the head of this run as the new watermark (written atomically)."""
+        watermarks = load_watermarks(self.watermark_path)
+        watermarks[self.key] = {
+            "last_seen_ids": self.head_ids or sorted(self.previous_head_ids),
+            "last_run": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "new_ads": self.new_ads,
+        }
+        tmp_path = self.watermark_path.with_name(self.watermark_path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as watermark_file:
+                json.dump(watermarks, watermark_file, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.watermark_path)
+        except OSError as e:
+            print(f"WARNING: Could not save the watermark for '{self.key}'. Error: {e}")
@@ -0,0 +1,6 @@
+from .job_table import load_job_table, iter_job_table
+from .parquet_store import ParquetMasterStore, append_to_parquet_store, is_parquet_store, PYARROW_AVAILABLE
+from .file_lock import file_lock
+from .sqlite_store import SqliteJobStore, is_sqlite_master
+from .arrow_table import write_arrow_table, read_arrow_table, arrow_sidecar_path
+from .compact_table import load_compact_job_table, compact_job_table, join_bullets
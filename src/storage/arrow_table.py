@@ -0,0 +1,78 @@
+# ==========================================================
+# Arrow IPC Hand-off Between Pipeline Stages
+# ==========================================================
+# Goal:
+#   Stop re-parsing the cleaned CSV (long Tasks / Skills texts) in every
+#   analysis stage: the cleaning stage writes the same table once more as
+#   an uncompressed Arrow IPC (Feather V2) file, which later stages read
+#   without any text parsing.
+# Key Functionality:
+#   - '<cleaned>.arrow' sidecar next to the cleaned CSV, written atomically.
+#   - Readers memory-map the file, so only the requested columns are paged in
+#     from disk. The DataFrame is not zero-copy: to_pandas() copies the columns
+#     into pandas buffers (plain dtypes, same as reading the CSV). The saving is
+#     the CSV parsing, not the memory of the loaded table.
+#   - Used only if it is at least as new as its CSV; otherwise (or without
+#     pyarrow) the loader falls back to the CSV.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from pathlib import Path
+import os
+import pandas as pd
+
+# pyarrow is optional: without it the stages simply read the CSV
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+ARROW_SUFFIXES = (".arrow", ".feather")
+SIDECAR_SUFFIX = ".arrow"
+
+
+def is_arrow_file(path: Path) -> bool:
+    return Path(path).suffix.lower() in ARROW_SUFFIXES
+
+
+def arrow_sidecar_path(csv_path: Path) -> Path:
+    return Path(csv_path).with_suffix(SIDECAR_SUFFIX)
+
+
+def fresh_arrow_sidecar(csv_path: Path):
+    """Returns the Arrow sidecar of a CSV if pyarrow is installed and the sidecar is not older than the CSV, else None."""
+    sidecar = arrow_sidecar_path(csv_path)
+    if not PYARROW_AVAILABLE or not sidecar.exists():
+        return None
+    if Path(csv_path).exists() and sidecar.stat().st_mtime_ns < Path(csv_path).stat().st_mtime_ns:
+        return None
+    return sidecar
+
+
+def write_arrow_table(df: pd.DataFrame, arrow_path: Path) -> Path:
+    """Writes the DataFrame as uncompressed Arrow IPC (memory-mappable). Returns the path."""
+    if not PYARROW_AVAILABLE:
+        raise ImportError("The Arrow hand-off needs pyarrow (pip install pyarrow).")
+    arrow_path = Path(arrow_path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Same table as the CSV next to it: categoricals go back to plain strings and the pandas dtype
+    # metadata is dropped, so readers get the dtypes that reading the CSV would give
+    table = table.cast(pa.schema([pa.field(field.name, field.type.value_type if pa.types.is_dictionary(field.type)
+                                           else field.type) for field in table.schema]))
+    table = table.replace_schema_metadata(None)
+    tmp_path = arrow_path.with_name(arrow_path.name + ".tmp")
+    # Compressed buffers would have to be decompressed into memory, uncompressed ones are mapped as they are
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, arrow_path)
+    return arrow_path
+
+
+def read_arrow_table(arrow_path: Path, columns: list = None) -> pd.DataFrame:
+    """Memory-maps an Arrow IPC / Feather file and returns the requested columns as a DataFrame.
+    Only these columns are read from disk, but they are copied into pandas buffers (not zero-copy)."""
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Reading Arrow files needs pyarrow (pip install pyarrow).")
+    table = feather.read_table(arrow_path, columns=columns, memory_map=True)
+    return table.to_pandas()
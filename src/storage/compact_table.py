@@ -0,0 +1,114 @@
+# ==========================================================
+# Memory-Compact Job Table
+# ==========================================================
+# Goal:
+#   Keep large job tables (1M+ ads) in RAM: the default object dtypes store
+#   every repeated company, location and search term, and every copy of a
+#   boilerplate Tasks / Skills bullet, as a separate Python string.
+# Key Functionality:
+#   - Categorical dtype for the repetitive columns (Company_Name, Job_Location,
+#     Job_Search_Term): each distinct value is stored once.
+#   - Arrow-backed strings for the long texts (needs pyarrow, otherwise unchanged).
+#     Stages that run regexes on the texts ask for Python strings instead:
+#     pandas runs regexes on Arrow strings with RE2, whose \b only knows
+#     ASCII letters ('r' would match inside 'für').
+#   - Optional bullet dictionary: Tasks / Skills become tuples of interned bullets
+#     (split on ' | '), so a bullet repeated across ads is stored once.
+#     join_bullets() turns such a column back into text.
+#   - Prints the memory of the table as loaded and after compaction per stage.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+from .job_table import load_job_table
+from .parquet_store import PYARROW_AVAILABLE
+
+CATEGORY_COLUMNS = ["Job_Search_Term", "Company_Name", "Job_Location"]
+TEXT_COLUMNS = ["Job_Title", "Tasks", "Skills"]
+BULLET_COLUMNS = ["Tasks", "Skills"]
+BULLET_SEPARATOR = " | "
+# A categorical only pays off if values repeat: at most this share of distinct values
+MAX_CATEGORY_RATIO = 0.5
+
+
+def arrow_string_dtype():
+    """Arrow-backed strings with NaN for missing values (like object strings): a comparison with a
+    missing value gives False, not <NA>, so the existing boolean masks keep their meaning."""
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except TypeError:
+        # pandas < 2.3
+        return "string[pyarrow_numpy]"
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+
+def split_bullets(text) -> tuple:
+    """'a | b | a' -> ('a', 'b', 'a') with every bullet interned (one object per distinct bullet).
+    Missing values stay missing, so join_bullets() gives the original column back."""
+    if not isinstance(text, str):
+        return text
+    return tuple(sys.intern(bullet) for bullet in text.split(BULLET_SEPARATOR))
+
+
+def join_bullets(series: pd.Series) -> pd.Series:
+    """Back from bullet tuples to the ' | ' separated text (for stages that need the text)."""
+    return series.map(lambda bullets: BULLET_SEPARATOR.join(bullets) if isinstance(bullets, tuple) else bullets)
+
+
+def _bullet_tuples_memory_mb(series: pd.Series) -> float:
+    # memory_usage(deep=True) counts a shared bullet once per tuple; count tuples plus each distinct bullet once
+    series = series[series.map(lambda bullets: isinstance(bullets, tuple))]
+    tuples = sum(sys.getsizeof(bullets) for bullets in series)
+    distinct = {id(bullet): bullet for bullets in series for bullet in bullets}
+    return (tuples + sum(sys.getsizeof(bullet) for bullet in distinct.values())) / 1024 / 1024
+
+
+def compact_job_table(df: pd.DataFrame, bullets: bool = False, python_strings: bool = False) -> pd.DataFrame:
+    """Returns the table with compact dtypes (see module header). The input frame is not changed.
+    python_strings: keep the texts as Python strings (object dtype), so .str regexes use Python's re."""
+    df = df.copy(deep=False)
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            if df[column].nunique(dropna=True) <= max(1, len(df) * MAX_CATEGORY_RATIO):
+                df[column] = df[column].astype("category")
+
+    for column in TEXT_COLUMNS:
+        if column not in df.columns:
+            continue
+        if bullets and column in BULLET_COLUMNS:
+            df[column] = df[column].map(split_bullets).astype(object)
+        elif python_strings:
+            # Also undoes pandas 3's default Arrow-backed 'str' dtype from the loader
+            df[column] = df[column].astype(object)
+        elif PYARROW_AVAILABLE:
+            df[column] = df[column].astype(arrow_string_dtype())
+    return df
+
+
+def compact_memory_mb(df: pd.DataFrame, bullets: bool = False) -> float:
+    """Memory of a compacted table, counting shared bullets once."""
+    bullet_columns = [column for column in BULLET_COLUMNS if bullets and column in df.columns]
+    if not bullet_columns or df.empty:
+        return frame_memory_mb(df)
+    other = df.drop(columns=bullet_columns).memory_usage(deep=True).sum() / 1024 / 1024
+    return other + _bullet_tuples_memory_mb(pd.concat([df[column] for column in bullet_columns]))
+
+
+def load_compact_job_table(path: Path, columns: list = None, filters: list = None,
+                           stage: str = "Job table", bullets: bool = False,
+                           python_strings: bool = False) -> pd.DataFrame:
+    """load_job_table with compact dtypes; prints the memory saved for this stage."""
+    df = load_job_table(path, columns=columns, filters=filters)
+    memory_before = frame_memory_mb(df)
+    df = compact_job_table(df, bullets=bullets, python_strings=python_strings)
+    memory_after = compact_memory_mb(df, bullets)
+    saved = 100 * (1 - memory_after / memory_before) if memory_before else 0.0
+    print(f"[{stage}] Table memory: {memory_before:.1f} MB as loaded -> {memory_after:.1f} MB compact "
+          f"({saved:.0f}% saved, {len(df)} rows)")
+    return df
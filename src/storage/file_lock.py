@@ -0,0 +1,72 @@
+# ==========================================================
+# Advisory File Lock
+# ==========================================================
+# Goal:
+#   One cross-platform exclusive lock for everything that rewrites shared
+#   data files (master CSV merges, Parquet store segments and compaction).
+# Key Functionality:
+#   - Exclusive lock on a separate lock file
+#     (fcntl.flock on Linux/macOS, msvcrt.locking on Windows).
+#   - Blocks until the lock is free (optional timeout) and reports the wait time.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from contextlib import contextmanager
+from pathlib import Path
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Windows has no blocking lock without a retry limit, so the lock is polled
+LOCK_POLL_SECONDS = 0.05
+
+
+class FileLockTimeout(Exception):
+    pass
+
+
+def _try_lock(lock_file) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(lock_path: Path, timeout: float = None):
+    """Holds the exclusive lock of 'lock_path'. Yields the seconds spent waiting for it."""
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(lock_path, "a+") as lock_file:
+        start = time.perf_counter()
+        if fcntl is not None and timeout is None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            while not _try_lock(lock_file):
+                if timeout is not None and time.perf_counter() - start > timeout:
+                    raise FileLockTimeout(f"{lock_path.name} is held by another process for more than {timeout:.0f}s.")
+                time.sleep(LOCK_POLL_SECONDS)
+        waited = time.perf_counter() - start
+
+        try:
+            yield waited
+        finally:
+            _unlock(lock_file)
@@ -0,0 +1,89 @@
+# ==========================================================
+# Job Table Loader for the Downstream Stages
+# ==========================================================
+# Goal:
+#   One entry point for cleaning and analysis to load job data, whatever
+#   format it is stored in, reading only the columns and rows they need.
+# Key Functionality:
+#   - Parquet store directory -> column projection and predicate pushdown in pyarrow.
+#   - SQLite job store (.sqlite / .db) -> columns and filters become one SQL query.
+#   - Arrow IPC / Feather file -> memory-mapped, only the requested columns are paged in
+#     (and copied into the DataFrame).
+#   - CSV file -> its '.arrow' sidecar if one is up to date (written by the cleaning stage),
+#     otherwise only the requested columns are parsed (usecols); filters applied afterwards.
+#   - iter_job_table: the same sources in chunks of rows, for stages that must not hold
+#     the whole table in memory.
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from pathlib import Path
+import operator
+import pandas as pd
+from .parquet_store import ParquetMasterStore, is_parquet_store
+from .sqlite_store import SqliteJobStore, is_sqlite_master
+from .arrow_table import fresh_arrow_sidecar, is_arrow_file, read_arrow_table
+
+CSV_DELIMITER = ';'
+
+# Same filter notation as pyarrow: [(column, op, value), ...], all conditions must hold
+FILTER_OPERATORS = {"==": operator.eq, "=": operator.eq, "!=": operator.ne,
+                    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+def _apply_filters(df: pd.DataFrame, filters: list) -> pd.DataFrame:
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        if op == "in":
+            mask &= df[column].isin(value)
+        elif op == "not in":
+            mask &= ~df[column].isin(value)
+        else:
+            mask &= FILTER_OPERATORS[op](df[column], value)
+    return df[mask]
+
+
+def load_job_table(path: Path, columns: list = None, filters: list = None) -> pd.DataFrame:
+    """Loads job data from a Parquet store directory, a SQLite job store, an Arrow file or a semicolon CSV.
+    columns: subset of columns to load. filters: e.g. [("Job_Search_Term", "==", "Data Scientist")]."""
+    path = Path(path)
+    if is_parquet_store(path):
+        return ParquetMasterStore(path).read(columns=columns, filters=filters)
+    if is_sqlite_master(path):
+        with SqliteJobStore(path) as store:
+            return store.read(columns=columns, filters=filters)
+
+    # Columns used by the filters must be loaded as well
+    usecols = None
+    if columns is not None:
+        usecols = list(dict.fromkeys(list(columns) + [column for column, _, _ in (filters or [])]))
+
+    arrow_path = path if is_arrow_file(path) else fresh_arrow_sidecar(path)
+    if arrow_path is not None:
+        df = read_arrow_table(arrow_path, columns=usecols)
+    else:
+        df = pd.read_csv(path, sep=CSV_DELIMITER, usecols=usecols)
+    if filters:
+        df = _apply_filters(df, filters)
+    return df[columns] if columns is not None else df
+
+
+
+def iter_job_table(path: Path, chunk_size: int, columns: list = None, filters: list = None):
+    """Yields the job data as DataFrames of at most chunk_size rows (before filtering), in Job_Index order."""
+    path = Path(path)
+    if is_parquet_store(path):
+        yield from ParquetMasterStore(path).iter_chunks(chunk_size, columns=columns, filters=filters)
+        return
+    if is_sqlite_master(path):
+        with SqliteJobStore(path) as store:
+            yield from store.iter_chunks(chunk_size, columns=columns, filters=filters)
+        return
+
+    usecols = None
+    if columns is not None:
+        usecols = list(dict.fromkeys(list(columns) + [column for column, _, _ in (filters or [])]))
+    with pd.read_csv(path, sep=CSV_DELIMITER, usecols=usecols, chunksize=chunk_size) as reader:
+        for df in reader:
+            if filters:
+                df = _apply_filters(df, filters)
+            yield df[columns] if columns is not None else df
@@ -0,0 +1,269 @@
+# ==========================================================
+# Segmented Parquet Store for the Master Dataset
+# ==========================================================
+# Goal:
+#   Keep the master job data in a columnar, compressed format, so the
+#   downstream stages stop re-parsing one ever-growing semicolon CSV.
+# Key Functionality:
+#   - Every merge writes one immutable Parquet segment (zstd compressed,
+#     dictionary-encoded Company_Name / Job_Location / Job_Search_Term).
+#   - manifest.json lists the segments with row count and Job_Index range;
+#     it is replaced atomically, so readers never see a half-written store.
+#   - Reads with column projection and predicate pushdown (pyarrow filters).
+#   - Compaction merges small segments into larger ones.
+#   - Catches up from the master CSV if merges ran without the store.
+# Execution:
+#   python -m src.storage.parquet_store compact
+#   python -m src.storage.parquet_store sync --master data/raw/jobs_ch_skills_all.csv
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import os
+import pandas as pd
+from .file_lock import file_lock
+
+# pyarrow is optional: without it the pipeline keeps working on the CSV master only
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+CSV_DELIMITER = ';'
+MASTER_COLUMNS = ["Job_Index", "Job_Search_Term", "Job_Title", "Company_Name", "Job_Location", "Tasks", "Skills"]
+# Few distinct values, repeated in many rows
+DICTIONARY_COLUMNS = ["Job_Search_Term", "Company_Name", "Job_Location"]
+COMPRESSION = "zstd"
+MANIFEST_FILE_NAME = "manifest.json"
+SEGMENTS_DIR_NAME = "segments"
+LOCK_FILE_NAME = "store.lock"
+# Segments below this size are merged by compact()
+DEFAULT_COMPACT_TARGET_ROWS = 50_000
+# compact_if_needed() runs a compaction once this many small segments piled up
+DEFAULT_MAX_SMALL_SEGMENTS = 16
+
+
+def is_parquet_store(path: Path) -> bool:
+    return Path(path).is_dir() and (Path(path) / MANIFEST_FILE_NAME).exists()
+
+
+def _segment_schema():
+    return pa.schema([("Job_Index", pa.int64())] + [(column, pa.string()) for column in MASTER_COLUMNS[1:]])
+
+
+class ParquetMasterStore:
+
+    def __init__(self, store_dir: Path):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("The Parquet store needs pyarrow (pip install pyarrow).")
+        self.store_dir = Path(store_dir)
+        self.segments_dir = self.store_dir / SEGMENTS_DIR_NAME
+        self.manifest_path = self.store_dir / MANIFEST_FILE_NAME
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+
+    # --- MANIFEST ---
+    def read_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {"segments": [], "next_segment_id": 1}
+        with open(self.manifest_path, encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+
+    def _write_manifest(self, manifest: dict):
+        manifest["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def lock(self, timeout: float = None):
+        """Exclusive lock for appends and compaction. Yields the wait time in seconds."""
+        return file_lock(self.store_dir / LOCK_FILE_NAME, timeout)
+
+    def row_count(self) -> int:
+        return sum(segment["rows"] for segment in self.read_manifest()["segments"])
+
+    def max_job_index(self) -> int:
+        segments = self.read_manifest()["segments"]
+        return max((segment["max_job_index"] for segment in segments), default=0)
+
+    # --- WRITE ---
+    def _write_segment(self, df: pd.DataFrame, manifest: dict) -> dict:
+        df_segment = df.reindex(columns=MASTER_COLUMNS).copy()
+        df_segment["Job_Index"] = df_segment["Job_Index"].astype("int64")
+        for column in MASTER_COLUMNS[1:]:
+            df_segment[column] = df_segment[column].astype(object).where(df_segment[column].notna(), None)
+            df_segment[column] = df_segment[column].map(lambda value: value if value is None else str(value))
+        table = pa.Table.from_pandas(df_segment, schema=_segment_schema(), preserve_index=False)
+
+        segment_name = f"segment-{manifest['next_segment_id']:06d}.parquet"
+        manifest["next_segment_id"] += 1
+        target = self.segments_dir / segment_name
+        tmp_path = target.with_name(target.name + ".tmp")
+        pq.write_table(table, tmp_path, compression=COMPRESSION, use_dictionary=DICTIONARY_COLUMNS)
+        os.replace(tmp_path, target)
+
+        return {"file": segment_name,
+                "rows": len(df_segment),
+                "min_job_index": int(df_segment["Job_Index"].min()) if len(df_segment) else 0,
+                "max_job_index": int(df_segment["Job_Index"].max()) if len(df_segment) else 0,
+                "bytes": target.stat().st_size}
+
+    def append(self, df: pd.DataFrame) -> dict:
+        """Writes the rows as one new immutable segment and registers it in the manifest."""
+        if df.empty:
+            return None
+        with self.lock():
+            manifest = self.read_manifest()
+            segment = self._write_segment(df, manifest)
+            manifest["segments"].append(segment)
+            self._write_manifest(manifest)
+        return segment
+
+    def sync_from_csv(self, master_file_path: Path) -> int:
+        """Appends the master CSV rows with a Job_Index above the store's maximum. Returns the rows added."""
+        if not master_file_path.exists() or master_file_path.stat().st_size == 0:
+            return 0
+        store_max_index = self.max_job_index()
+        # Text columns stay text: a column of digits like '007' must not come back as '7'
+        df_master = pd.read_csv(master_file_path, sep=CSV_DELIMITER,
+                                dtype={column: str for column in MASTER_COLUMNS[1:]})
+        df_missing = df_master[df_master["Job_Index"] > store_max_index]
+        self.append(df_missing)
+        return len(df_missing)
+
+    # --- READ ---
+    def segment_paths(self) -> list:
+        return [self.segments_dir / segment["file"] for segment in self.read_manifest()["segments"]]
+
+    def read(self, columns: list = None, filters: list = None) -> pd.DataFrame:
+        """Loads the store as a DataFrame.
+        columns: only these columns are read from disk. filters: pyarrow filters,
+        e.g. [("Job_Search_Term", "==", "Data Scientist")], applied per row group before loading."""
+        # A compaction may remove segments between reading the manifest and the files: read the new manifest once
+        for attempt in range(2):
+            paths = [str(path) for path in self.segment_paths()]
+            if not paths:
+                return pd.DataFrame(columns=columns or MASTER_COLUMNS)
+            try:
+                # Dictionary columns are decoded to plain strings: same dtypes as the master CSV
+                # (load_compact_job_table turns them into categoricals where a stage wants that)
+                return pq.read_table(paths, columns=columns, filters=filters).to_pandas()
+            except FileNotFoundError:
+                if attempt == 1:
+                    raise
+
+    def iter_chunks(self, chunk_size: int, columns: list = None, filters: list = None):
+        """Yields the store segment by segment in record batches of at most chunk_size rows."""
+        from .job_table import _apply_filters
+        # Filter columns are needed for the mask, even if not requested
+        read_columns = None
+        if columns is not None:
+            read_columns = list(dict.fromkeys(list(columns) + [column for column, _, _ in (filters or [])]))
+        for path in self.segment_paths():
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=read_columns):
+                df = batch.to_pandas()
+                if filters:
+                    df = _apply_filters(df, filters)
+                yield df[columns] if columns is not None else df
+
+    # --- COMPACTION ---
+    def compact(self, target_rows: int = DEFAULT_COMPACT_TARGET_ROWS) -> int:
+        """Merges runs of neighbouring small segments into segments of up to target_rows. Returns the segments removed."""
+        with self.lock():
+            manifest = self.read_manifest()
+            segments_before = list(manifest["segments"])
+
+            groups, current = [], []
+            for segment in manifest["segments"]:
+                if segment["rows"] >= target_rows:
+                    groups.append([segment])
+                    continue
+                if current and sum(s["rows"] for s in current) + segment["rows"] > target_rows:
+                    groups.append(current)
+                    current = []
+                current.append(segment)
+            if current:
+                groups.append(current)
+
+            new_segments, obsolete_files = [], []
+            for group in groups:
+                if len(group) == 1:
+                    new_segments.append(group[0])
+                    continue
+                paths = [str(self.segments_dir / segment["file"]) for segment in group]
+                df_group = pq.read_table(paths).to_pandas().sort_values("Job_Index")
+                new_segments.append(self._write_segment(df_group, manifest))
+                obsolete_files.extend(segment["file"] for segment in group)
+
+            if not obsolete_files:
+                return 0
+            manifest["segments"] = new_segments
+            self._write_manifest(manifest)
+
+            # Old segments go only after the new manifest is in place
+            for file_name in obsolete_files:
+                try:
+                    (self.segments_dir / file_name).unlink()
+                except FileNotFoundError:
+                    pass
+
+        print(f"Parquet store compacted: {len(obsolete_files)} small segments merged, "
+              f"{len(new_segments)} segment(s) left.")
+        return len(segments_before) - len(new_segments)
+
+    def compact_if_needed(self, max_small_segments: int = DEFAULT_MAX_SMALL_SEGMENTS,
+                          target_rows: int = DEFAULT_COMPACT_TARGET_ROWS) -> int:
+        small_segments = [s for s in self.read_manifest()["segments"] if s["rows"] < target_rows]
+        if len(small_segments) < max_small_segments:
+            return 0
+        return self.compact(target_rows)
+
+    def describe(self) -> str:
+        segments = self.read_manifest()["segments"]
+        total_bytes = sum(segment["bytes"] for segment in segments)
+        return (f"Parquet store {self.store_dir.name}: {sum(s['rows'] for s in segments)} rows in "
+                f"{len(segments)} segment(s), {total_bytes / 1024 / 1024:.1f} MB")
+
+
+# Called by the master merge (which already holds the master lock): append the merged rows,
+# or catch up from the CSV if merges ran without the store in between.
+def append_to_parquet_store(store_dir: Path, df_merged: pd.DataFrame, master_file_path: Path):
+    store = ParquetMasterStore(store_dir)
+    first_new_index = int(df_merged["Job_Index"].min())
+    if store.max_job_index() == first_new_index - 1:
+        store.append(df_merged)
+        added = len(df_merged)
+    else:
+        print(f"Parquet store {store_dir.name} is behind the master CSV. Catching up from {master_file_path.name}...")
+        added = store.sync_from_csv(master_file_path)
+    store.compact_if_needed()
+    print(f"{added} rows written to the Parquet store. {store.describe()}")
+    return added
+
+
+# --- STANDALONE EXECUTION BLOCK ---
+if __name__ == "__main__":
+
+    PROJECT_ROOT_TEST = Path(__file__).resolve().parent.parent.parent
+    RAW_DATA_DIR_TEST = PROJECT_ROOT_TEST / "data" / "raw"
+
+    parser = argparse.ArgumentParser(description="Maintain the Parquet store of the master dataset.")
+    parser.add_argument("command", choices=["compact", "sync", "info"])
+    parser.add_argument("--store-dir", type=Path, default=RAW_DATA_DIR_TEST / "jobs_ch_skills_all_parquet")
+    parser.add_argument("--master", type=Path, default=RAW_DATA_DIR_TEST / "jobs_ch_skills_all.csv",
+                        help="Master CSV used by 'sync'.")
+    parser.add_argument("--target-rows", type=int, default=DEFAULT_COMPACT_TARGET_ROWS,
+                        help="Segments below this size are merged by 'compact'.")
+    args = parser.parse_args()
+
+    store = ParquetMasterStore(args.store_dir)
+    if args.command == "compact":
+        store.compact(args.target_rows)
+    elif args.command == "sync":
+        print(f"{store.sync_from_csv(args.master)} rows added from {args.master.name}.")
+    print(store.describe())
@@ -0,0 +1,255 @@
+# ==========================================================
+# SQLite Job Store (alternative to the master CSV)
+# ==========================================================
+# Goal:
+#   Keep the master dataset in an indexed SQLite table, so merges,
+#   duplicate checks and "what is new" questions no longer need a full
+#   pandas scan of the master CSV.
+# Key Functionality:
+#   - Stable ad ID: hash of the normalized Title | Company | Location.
+#   - Upsert on merge: new ads get the next Job_Index and First_Seen,
+#     known ads only get a new Last_Seen (and the latest Tasks / Skills, unless
+#     the re-scrape only found the "not found" placeholder).
+#   - Indexed lookups: 'Title | Company' membership (used as dedup index
+#     by the scrapers), max Job_Index, new ads since a date, ads per search term.
+#   - Used automatically when the master path ends in .sqlite / .db.
+# Execution:
+#   python -m src.storage.sqlite_store import data/raw/jobs_ch_skills_all.csv
+#   python -m src.storage.sqlite_store new-since 2026-10-01
+#   python -m src.storage.sqlite_store term "Data Scientist"
+# Author: Stefan Dreyfus
+# ==========================================================
+
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import hashlib
+import re
+import sqlite3
+import threading
+import pandas as pd
+
+CSV_DELIMITER = ';'
+SQLITE_SUFFIXES = (".sqlite", ".db")
+# Written by the scrapers when the detail extraction found no list (same text as in jobs_scraping.py)
+MISSING_TASKS_TEXT = "no tasks found on this job ad"
+MISSING_SKILLS_TEXT = "no skills found on this job ad"
+MASTER_COLUMNS = ["Job_Index", "Job_Search_Term", "Job_Title", "Company_Name", "Job_Location", "Tasks", "Skills"]
+STORE_COLUMNS = ["Ad_ID"] + MASTER_COLUMNS + ["First_Seen", "Last_Seen"]
+
+# Filter notation shared with load_job_table / pyarrow: (column, op, value)
+SQL_OPERATORS = {"==": "=", "=": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+
+def is_sqlite_master(path: Path) -> bool:
+    return Path(path).suffix.lower() in SQLITE_SUFFIXES
+
+
+def _normalize(value) -> str:
+    return re.sub(r'\s+', ' ', str(value if value is not None else "")).strip().lower()
+
+
+def _hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def ad_id_of(job_title, company_name, job_location) -> str:
+    return _hash(" | ".join(_normalize(value) for value in (job_title, company_name, job_location)))
+
+
+# Same key as the scrapers' 'Title | Company' unique ID
+def dedup_key_of(unique_id: str) -> str:
+    return _hash(_normalize(unique_id))
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class SqliteJobStore:
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # The worker pool shares one store as dedup index between threads; all access goes through the lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                                  Ad_ID TEXT PRIMARY KEY,
+                                  Dedup_Key TEXT NOT NULL,
+                                  Job_Index INTEGER NOT NULL UNIQUE,
+                                  Job_Search_Term TEXT,
+                                  Job_Title TEXT,
+                                  Company_Name TEXT,
+                                  Job_Location TEXT,
+                                  Tasks TEXT,
+                                  Skills TEXT,
+                                  First_Seen TEXT NOT NULL,
+                                  Last_Seen TEXT NOT NULL)""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedup_key ON jobs (Dedup_Key)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_search_term ON jobs (Job_Search_Term)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_first_seen ON jobs (First_Seen)")
+        self._conn.commit()
+
+    # --- DEDUP INDEX INTERFACE (same as DedupIndex) ---
+    def __contains__(self, unique_id) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM jobs WHERE Dedup_Key = ? LIMIT 1",
+                                     (dedup_key_of(unique_id),)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def max_job_index(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(Job_Index), 0) FROM jobs").fetchone()[0]
+
+    def next_job_index(self) -> int:
+        return self.max_job_index() + 1
+
+    # --- UPSERT ---
+    def upsert(self, df: pd.DataFrame, seen_at: str = None, keep_job_index: bool = False):
+        """Inserts new ads (next Job_Index, First_Seen) and refreshes known ones. Returns (inserted, updated).
+        keep_job_index: new ads keep the Job_Index of the DataFrame instead of the next free one."""
+        seen_at = seen_at or _utc_now()
+        inserted = updated = 0
+
+        with self._lock:
+            next_index = self._conn.execute("SELECT COALESCE(MAX(Job_Index), 0) FROM jobs").fetchone()[0] + 1
+            with self._conn:
+                for row in df.reindex(columns=MASTER_COLUMNS).itertuples(index=False):
+                    values = {column: (None if pd.isna(value) else value) for column, value in zip(MASTER_COLUMNS, row)}
+                    ad_id = ad_id_of(values["Job_Title"], values["Company_Name"], values["Job_Location"])
+
+                    # A placeholder means the re-scrape found no list: keep the stored text, like for NULL
+                    cursor = self._conn.execute(
+                        "UPDATE jobs SET Last_Seen = ?, Tasks = COALESCE(?, Tasks), Skills = COALESCE(?, Skills) "
+                        "WHERE Ad_ID = ?",
+                        (seen_at, None if values["Tasks"] == MISSING_TASKS_TEXT else values["Tasks"],
+                         None if values["Skills"] == MISSING_SKILLS_TEXT else values["Skills"], ad_id))
+                    if cursor.rowcount:
+                        updated += 1
+                        continue
+
+                    job_index = int(values["Job_Index"]) if keep_job_index and values["Job_Index"] is not None else next_index
+                    self._conn.execute(
+                        "INSERT INTO jobs (Ad_ID, Dedup_Key, Job_Index, Job_Search_Term, Job_Title, Company_Name, "
+                        "Job_Location, Tasks, Skills, First_Seen, Last_Seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (ad_id, dedup_key_of(f"{values['Job_Title']} | {values['Company_Name']}"), job_index,
+                         values["Job_Search_Term"], values["Job_Title"], values["Company_Name"],
+                         values["Job_Location"], values["Tasks"], values["Skills"], seen_at, seen_at))
+                    next_index = max(next_index, job_index + 1)
+                    inserted += 1
+
+        return inserted, updated
+
+    def import_csv(self, master_file_path: Path):
+        """One-off migration of an existing master CSV. Its Job_Index values are kept (cleaning excludes jobs by index).
+        Rows with the same ad ID as an earlier row are merged into it; their Job_Index values are printed."""
+        df_master = pd.read_csv(master_file_path, sep=CSV_DELIMITER).sort_values("Job_Index")
+        self._report_merged_job_indices(df_master)
+        return self.upsert(df_master, keep_job_index=True)
+
+    def _report_merged_job_indices(self, df: pd.DataFrame):
+        # Same key and order as upsert: the first row of an ad ID keeps its Job_Index, later ones disappear
+        with self._lock:
+            kept = dict(self._conn.execute("SELECT Ad_ID, Job_Index FROM jobs").fetchall())
+        merged = []
+        for job_index, job_title, company_name, job_location in df[
+                ["Job_Index", "Job_Title", "Company_Name", "Job_Location"]].itertuples(index=False):
+            ad_id = ad_id_of(*(None if pd.isna(value) else value for value in (job_title, company_name, job_location)))
+            if ad_id in kept:
+                merged.append((int(job_index), kept[ad_id]))
+            else:
+                kept[ad_id] = int(job_index)
+
+        if merged:
+            print(f"WARNING: {len(merged)} row(s) have the same Title | Company | Location as an earlier row and are "
+                  f"merged into it. Their Job_Index values no longer exist (check JOB_INDICES_TO_EXCLUDE):")
+            for job_index, kept_index in merged:
+                print(f"  Job_Index {job_index} -> merged into Job_Index {kept_index}")
+        return merged
+
+    # --- QUERIES ---
+    def read(self, columns: list = None, filters: list = None) -> pd.DataFrame:
+        """Loads the table as a DataFrame (master column layout by default), filtered in SQL."""
+        query, params = self._select_query(columns, filters)
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+
+    def iter_chunks(self, chunk_size: int, columns: list = None, filters: list = None):
+        """Same as read(), but yields DataFrames of at most chunk_size rows."""
+        query, params = self._select_query(columns, filters)
+        # Separate connection: the chunks are fetched lazily while other threads may use the store
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield from pd.read_sql_query(query, conn, params=params, chunksize=chunk_size)
+        finally:
+            conn.close()
+
+    def _select_query(self, columns: list = None, filters: list = None):
+        columns = list(columns or MASTER_COLUMNS)
+        conditions, params = [], []
+        for column, op, value in (filters or []):
+            if column not in STORE_COLUMNS:
+                raise ValueError(f"Unknown column in filter: {column}")
+            if op in ("in", "not in"):
+                values = list(value)
+                conditions.append(f"{column} {op.upper()} ({', '.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                conditions.append(f"{column} {SQL_OPERATORS[op]} ?")
+                params.append(value)
+
+        unknown = [column for column in columns if column not in STORE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+        query = f"SELECT {', '.join(columns)} FROM jobs"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY Job_Index"
+        return query, params
+
+    def new_since(self, since: str) -> pd.DataFrame:
+        """Ads first seen on or after 'since' (ISO date or timestamp)."""
+        return self.read(MASTER_COLUMNS + ["First_Seen"], [("First_Seen", ">=", since)])
+
+    def ads_for_term(self, job_search_term: str) -> pd.DataFrame:
+        return self.read(MASTER_COLUMNS + ["First_Seen", "Last_Seen"], [("Job_Search_Term", "==", job_search_term)])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# --- STANDALONE EXECUTION BLOCK ---
+if __name__ == "__main__":
+
+    PROJECT_ROOT_TEST = Path(__file__).resolve().parent.parent.parent
+    RAW_DATA_DIR_TEST = PROJECT_ROOT_TEST / "data" / "raw"
+
+    parser = argparse.ArgumentParser(description="Query or fill the SQLite job store.")
+    parser.add_argument("command", choices=["import", "new-since", "term", "info"])
+    parser.add_argument("value", nargs="?", help="CSV to import, ISO date or search term.")
+    parser.add_argument("--db", type=Path, default=RAW_DATA_DIR_TEST / "jobs_ch_skills_all.sqlite")
+    args = parser.parse_args()
+
+    with SqliteJobStore(args.db) as store:
+        if args.command == "import":
+            source = Path(args.value) if args.value else RAW_DATA_DIR_TEST / "jobs_ch_skills_all.csv"
+            inserted, updated = store.import_csv(source)
+            print(f"Imported {source.name}: {inserted} new ads, {updated} already known.")
+        elif args.command == "new-since":
+            print(store.new_since(args.value).to_string(index=False))
+        elif args.command == "term":
+            print(store.ads_for_term(args.value).to_string(index=False))
+        print(f"{args.db.name}: {len(store)} ads, max Job_Index {store.max_job_index()}.")